@@ -0,0 +1,197 @@
+import grpc
+import sys
+import os
+sys.path.insert(1, './protos')
+sys.path.insert(1, './server')
+import reddit_pb2
+import reddit_pb2_grpc
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent import futures
+from server import RedditService, build_server
+from async_server import build_async_server
+from admission import AdmissionInterceptor
+from stream_bench import percentile
+
+# End-to-end load generator: starts a server in this process on an ephemeral
+# port, seeds it through the bulk ingest RPCs and then drives a weighted mix
+# of RPCs from many concurrent clients for a fixed time. Throughput and
+# latency percentiles per RPC are printed as JSON. Clients and server share
+# one interpreter, so compare runs made with the same settings rather than
+# reading the numbers as absolute capacity. Run from the repository root:
+#   python client/bench.py --clients 32 --seconds 10
+#   python client/bench.py --async --mix GetPost=80,VotePost=20
+
+DEFAULT_MIX = ('GetPost=30,GetComment=10,GetTopComments=10,ExpandCommentBranch=5,ListPosts=2,ListComments=3,'
+               'VotePost=20,VoteComment=10,CreateComment=8,CreatePost=2')
+
+
+class Dataset:
+    """Ids created by the seeding step, shared (and grown) by all clients."""
+
+    def __init__(self, post_ids, comment_ids, reply_ids):
+        self.post_ids = post_ids
+        self.comment_ids = comment_ids
+        self.reply_ids = reply_ids
+
+
+def seed(stub, posts, comments_per_post, replies_per_comment):
+    post_ids = list(stub.BulkCreatePosts(reddit_pb2.CreatePostRequest(title=f"Post {i}", content="Benchmark post body",
+                                                                       subredditId=f"sub{i % 20}", authorId=f"user{i % 500}")
+                                         for i in range(posts)).ids)
+    comment_ids = list(stub.BulkCreateComments(reddit_pb2.CreateCommentRequest(content=f"Comment {i}", postId=post_id,
+                                                                               authorId=f"user{i % 500}")
+                                               for post_id in post_ids for i in range(comments_per_post)).ids)
+    reply_ids = list(stub.BulkCreateComments(reddit_pb2.CreateCommentRequest(content=f"Reply {i}", commentId=comment_id,
+                                                                             authorId=f"user{i % 500}")
+                                             for comment_id in comment_ids for i in range(replies_per_comment)).ids)
+    return Dataset(post_ids, comment_ids, reply_ids)
+
+
+def operations(stub, data, rng):
+    """One callable per RPC name, each issuing a single randomly targeted call."""
+    def vote():
+        return reddit_pb2.UPVOTE if rng.random() < 0.7 else reddit_pb2.DOWNVOTE
+
+    def comment_id():
+        return rng.choice(data.reply_ids) if data.reply_ids and rng.random() < 0.3 else rng.choice(data.comment_ids)
+
+    return {
+        'GetPost': lambda: stub.GetPost(reddit_pb2.GetPostRequest(id=rng.choice(data.post_ids))),
+        'GetComment': lambda: stub.GetComment(reddit_pb2.GetCommentRequest(id=comment_id())),
+        'GetTopComments': lambda: stub.GetTopComments(reddit_pb2.GetTopCommentsRequest(postId=rng.choice(data.post_ids), numberOfComments=5)),
+        'ExpandCommentBranch': lambda: stub.ExpandCommentBranch(reddit_pb2.ExpandCommentBranchRequest(parentCommentId=rng.choice(data.comment_ids), numberOfComments=3)),
+        'ListPosts': lambda: list(stub.ListPosts(reddit_pb2.ListPostsRequest(subredditId=f"sub{rng.randrange(20)}", pageSize=25, postsPerMessage=25))),
+        'GetHotPosts': lambda: stub.GetHotPosts(reddit_pb2.GetHotPostsRequest(subredditId=f"sub{rng.randrange(20)}")),
+        'ListUserActivity': lambda: list(stub.ListUserActivity(reddit_pb2.ListUserActivityRequest(userId=f"user{rng.randrange(500)}"))),
+        'ListComments': lambda: list(stub.ListComments(reddit_pb2.ListCommentsRequest(postId=rng.choice(data.post_ids)))),
+        'VotePost': lambda: stub.VotePost(reddit_pb2.VotePostRequest(postId=rng.choice(data.post_ids), voteType=vote())),
+        'VoteComment': lambda: stub.VoteComment(reddit_pb2.VoteCommentRequest(commentId=comment_id(), voteType=vote())),
+        'CreateComment': lambda: data.comment_ids.append(stub.CreateComment(reddit_pb2.CreateCommentRequest(
+            content="New comment", postId=rng.choice(data.post_ids), authorId=f"user{rng.randrange(500)}")).comment.id),
+        'CreatePost': lambda: data.post_ids.append(stub.CreatePost(reddit_pb2.CreatePostRequest(
+            title="New post", content="Posted during the benchmark", subredditId=f"sub{rng.randrange(20)}")).post.id),
+    }
+
+
+def client(stub, data, mix, deadline, seed_value):
+    """Issue RPCs until the deadline; returns {rpc: ([latencies], errors)}."""
+    rng = random.Random(seed_value)
+    ops = operations(stub, data, rng)
+    names, weights = zip(*mix.items())
+    results = {name: ([], 0) for name in names}
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            ops[name]()
+            results[name][0].append(time.perf_counter() - start)
+        except grpc.RpcError:
+            latencies, errors = results[name]
+            results[name] = (latencies, errors + 1)
+    return results
+
+
+def start_async_server(service):
+    """Run a grpc.aio server on its own event loop thread; returns (port, stop)."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def start():
+        server, port = build_async_server(service, port=0)
+        await server.start()
+        return server, port
+    server, port = asyncio.run_coroutine_threadsafe(start(), loop).result(timeout=10)
+
+    def stop():
+        # The loop keeps running until the server has stopped, then is shut down
+        asyncio.run_coroutine_threadsafe(server.stop(0), loop).result(timeout=10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        loop.close()
+    return port, stop
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed-workload benchmark against an in-process server")
+    parser.add_argument('--clients', type=int, default=32, help="Concurrent client threads")
+    parser.add_argument('--channels', type=int, default=4, help="Connections the clients are spread over")
+    parser.add_argument('--seconds', type=float, default=10, help="Measured run time")
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--comments-per-post', type=int, default=20)
+    parser.add_argument('--replies-per-comment', type=int, default=2)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="Comma separated RPC=weight pairs")
+    parser.add_argument('--workers', type=int, default=32, help="Thread pool size of the server")
+    parser.add_argument('--async', dest='use_async', action='store_true', help="Benchmark the grpc.aio server")
+    parser.add_argument('--shed', action='store_true', help="Shed load by priority on the thread-pool server (failures count as errors)")
+    parser.add_argument('--max-concurrent-rpcs', type=int, default=None, help="Reject RPCs beyond this many queued and running")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    service = RedditService()
+    if args.use_async:
+        port, stop = start_async_server(service)
+    else:
+        server, port = build_server(port=0, max_workers=args.workers, service=service,
+                                    admission=AdmissionInterceptor(args.workers) if args.shed else None,
+                                    maximum_concurrent_rpcs=args.max_concurrent_rpcs)
+        server.start()
+        stop = lambda: server.stop(0)
+
+    channels = [grpc.insecure_channel(f'localhost:{port}', options=[('grpc.use_local_subchannel_pool', 1)])
+                for _ in range(args.channels)]
+    stubs = [reddit_pb2_grpc.RedditServiceStub(channel) for channel in channels]
+    try:
+        data = seed(stubs[0], args.posts, args.comments_per_post, args.replies_per_comment)
+        dataset = {'posts': len(data.post_ids), 'comments': len(data.comment_ids), 'replies': len(data.reply_ids)}
+        start = time.perf_counter()
+        deadline = start + args.seconds
+        with futures.ThreadPoolExecutor(max_workers=args.clients) as pool:
+            runs = list(pool.map(lambda i: client(stubs[i % len(stubs)], data, mix, deadline, args.seed + i),
+                                 range(args.clients)))
+        elapsed = time.perf_counter() - start
+    finally:
+        for channel in channels:
+            channel.close()
+        stop()
+
+    rpcs = {}
+    total = 0
+    for name in mix:
+        latencies = [latency for run in runs for latency in run[name][0]]
+        errors = sum(run[name][1] for run in runs)
+        total += len(latencies)
+        rpcs[name] = {
+            'count': len(latencies),
+            'errors': errors,
+            'per_second': round(len(latencies) / elapsed, 1),
+            **{f'p{p}_ms': round(percentile(latencies, p) * 1000, 3) if latencies else None for p in (50, 95, 99)},
+        }
+    report = {
+        'server': 'async' if args.use_async else 'sync',
+        'shed': args.shed,
+        'clients': args.clients,
+        'seconds': round(elapsed, 3),
+        'dataset': dataset,
+        'total_per_second': round(total / elapsed, 1),
+        'rpcs': rpcs,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+import grpc
+import sys
+import os
+sys.path.insert(1, './protos')
+import reddit_pb2
+import reddit_pb2_grpc
+import argparse
+import itertools
+import json
+import time
+from google.protobuf import json_format
+
+# Loads posts or comments from a JSONL file through the bulk ingest RPCs.
+# Every line is one CreatePostRequest or CreateCommentRequest in protobuf
+# JSON form, for example:
+#   {"title": "Hello", "content": "First post", "subredditId": "python", "authorId": "user1"}
+#   {"content": "Welcome!", "postId": "1", "authorId": "user1"}
+# The file is streamed in calls of --chunk lines, so a huge file never sits
+# in memory and a failure only loses the current chunk. Run from the
+# repository root:
+#   python client/bulk_load.py posts posts.jsonl --ids-out post_ids.txt
+
+KINDS = {
+    'posts': (reddit_pb2.CreatePostRequest, 'BulkCreatePosts'),
+    'comments': (reddit_pb2.CreateCommentRequest, 'BulkCreateComments'),
+}
+
+
+def read_requests(path, request_type):
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json_format.Parse(line, request_type())
+            except json_format.ParseError as e:
+                raise SystemExit(f"{path}:{number}: {e}")
+
+
+def load(stub, kind, path, chunk, ids_out=None):
+    request_type, method = KINDS[kind]
+    requests = read_requests(path, request_type)
+    totals = {'created': 0, 'rejected': 0}
+    start = time.monotonic()
+    while True:
+        # Peek so that an exhausted file does not cost an empty call
+        first = next(requests, None)
+        if first is None:
+            break
+        response = getattr(stub, method)(itertools.chain([first], itertools.islice(requests, chunk - 1)))
+        totals['created'] += response.created
+        totals['rejected'] += response.rejected
+        if ids_out:
+            ids_out.writelines(f"{item_id}\n" for item_id in response.ids)
+    elapsed = time.monotonic() - start
+    totals['seconds'] = round(elapsed, 3)
+    totals['items_per_minute'] = round((totals['created'] + totals['rejected']) / elapsed * 60) if elapsed else 0
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load posts or comments from JSONL")
+    parser.add_argument('kind', choices=KINDS)
+    parser.add_argument('path', help="JSONL file with one create request per line")
+    parser.add_argument('--server', default='localhost:50051')
+    parser.add_argument('--chunk', type=int, default=50000, help="Requests per streaming call")
+    parser.add_argument('--ids-out', default=None, help="Write the assigned ids, one per input line (empty if rejected)")
+    args = parser.parse_args()
+
+    with grpc.insecure_channel(args.server) as channel:
+        stub = reddit_pb2_grpc.RedditServiceStub(channel)
+        if args.ids_out:
+            with open(args.ids_out, 'w') as ids_out:
+                totals = load(stub, args.kind, args.path, args.chunk, ids_out)
+        else:
+            totals = load(stub, args.kind, args.path, args.chunk)
+    print(json.dumps(totals, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,42 +6,35 @@ import reddit_pb2
 import reddit_pb2_grpc
 import threading
 import time
+from reddit_client import RedditClient
 
 def get_most_upvoted_reply_under_top_comment(stub, post_id):
-    # Task 1: Retrieve a post
+    # Retrieve the post, its most upvoted comment and that comment's most
+    # upvoted reply in a single round trip
     try:
-        retrieved_post = stub.GetPost(reddit_pb2.GetPostRequest(id=post_id))
-        print("Post retrieved:", retrieved_post.post.title, "-", retrieved_post.post.content)
+        summary = stub.GetThreadSummary(reddit_pb2.GetThreadSummaryRequest(postId=post_id, numberOfComments=1, numberOfReplies=1))
     except grpc.RpcError as e:
-        print(f"Error retrieving post: {e.code()}: {e.details()}")
+        print(f"Error retrieving thread summary: {e.code()}: {e.details()}")
         return None
+    if not summary.success:
+        print(f"Error retrieving post: {summary.message}")
+        return None
+    print("Post retrieved:", summary.post.title, "-", summary.post.content)
 
-    # Task 2: Retrieve the Most Upvoted Comments Under the Post
-    try:
-        top_comments_response = stub.GetTopComments(reddit_pb2.GetTopCommentsRequest(postId=post_id, numberOfComments=1))
-        if not top_comments_response.comments:
-            print("No comments found for the post.")
-            return None
-        most_upvoted_comment = top_comments_response.comments[0].comment
-        print("Most upvoted comment:", most_upvoted_comment.content, "Score is", most_upvoted_comment.score)
-    except grpc.RpcError as e:
-        print(f"Error retrieving top comments: {e.code()}: {e.details()}")
+    if not summary.comments:
+        print("No comments found for the post.")
         return None
+    most_upvoted_comment = summary.comments[0]
+    print("Most upvoted comment:", most_upvoted_comment.comment.content, "Score is", most_upvoted_comment.comment.score)
 
-    # Task 3: Expand the Most Upvoted Comment
-    try:
-        expanded_comment_response = stub.ExpandCommentBranch(reddit_pb2.ExpandCommentBranchRequest(parentCommentId=most_upvoted_comment.id, numberOfComments=1))
-        if not expanded_comment_response.comments:
-            print("No replies found for the most upvoted comment.")
-            return None
-        most_upvoted_reply = expanded_comment_response.comments[0].replies[0]
-        print("Most upvoted reply:", most_upvoted_reply.comment.content)
-    except grpc.RpcError as e:
-        print(f"Error expanding comment branch: {e.code()}: {e.details()}")
+    if not most_upvoted_comment.replies:
+        print("No replies found for the most upvoted comment.")
         return None
+    most_upvoted_reply = most_upvoted_comment.replies[0]
+    print("Most upvoted reply:", most_upvoted_reply.comment.content)
 
-    # Task 4: Return the Most Upvoted Reply Under the Most Upvoted Comment
-    return most_upvoted_reply if most_upvoted_reply else None
+    # Return the Most Upvoted Reply Under the Most Upvoted Comment
+    return most_upvoted_reply
 
 def run(stub):
         # Create a post
@@ -101,16 +94,15 @@ def monitor_updates(stub):
     listener_thread.join()
 
 if __name__ == '__main__':
-    # Establish a connection to the server
-    channel = grpc.insecure_channel('localhost:50051')
-    stub = reddit_pb2_grpc.RedditServiceStub(channel)
+    # Connect through the pooled client; it takes the same calls as a stub
+    client = RedditClient('localhost:50051')
 
     # Run the main functionality
-    run(stub)
+    run(client)
 
     # Monitor updates based on user input
-    monitor_updates(stub)
+    monitor_updates(client)
 
-    # Close the channel after all operations are done
-    channel.close()
+    # Close the channels after all operations are done
+    client.close()
 
@@ -4,8 +4,12 @@ import os
 sys.path.insert(1, '../protos')
 import reddit_pb2
 import reddit_pb2_grpc
+import asyncio
 import unittest
 from client import get_most_upvoted_reply_under_top_comment
+from reddit_client import AsyncRedditClient, RedditClient
+from near_cache import NearCache
+import time
 
 class TestGetMostUpvotedReplyUnderTopComment(unittest.TestCase):
     def setUp(self):
@@ -33,5 +37,42 @@ class TestGetMostUpvotedReplyUnderTopComment(unittest.TestCase):
     def tearDown(self):
         self.channel.close()
 
+class TestRedditClient(unittest.TestCase):
+    def test_pooled_client(self):
+        with RedditClient('localhost:50051', channels_per_address=3) as client:
+            post_id = client.CreatePost(reddit_pb2.CreatePostRequest(title="Pooled", content="Via the client library")).post.id
+            # Consecutive calls rotate over all channels and see the same data
+            for _ in range(6):
+                self.assertEqual(client.GetPost(reddit_pb2.GetPostRequest(id=post_id)).post.title, "Pooled")
+            with self.assertRaises(AttributeError):
+                client.NoSuchRpc
+            self.assertEqual(get_most_upvoted_reply_under_top_comment(client, post_id), None)
+
+    def test_near_cache_follows_votes(self):
+        with RedditClient('localhost:50051', near_cache=NearCache(max_items=2)) as client:
+            post_ids = [client.CreatePost(reddit_pb2.CreatePostRequest(title=f"Cached {i}")).post.id for i in range(3)]
+            request = reddit_pb2.GetPostRequest(id=post_ids[0])
+            self.assertEqual(client.GetPost(request).post.score, 0)
+            client.VotePost(reddit_pb2.VotePostRequest(postId=post_ids[0], voteType=reddit_pb2.UPVOTE))
+            # The vote reaches the cached copy through the update stream
+            deadline = time.monotonic() + 5
+            while client.GetPost(request).post.score != 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(client.GetPost(request).post.score, 1)
+            for post_id in post_ids[1:]:
+                client.GetPost(reddit_pb2.GetPostRequest(id=post_id))
+            stats = client.near_cache.stats()
+            self.assertEqual(stats['misses'], 3)
+            self.assertGreaterEqual(stats['hits'], 2)
+            self.assertEqual(stats['entries'], 2)
+
+    def test_async_client_runs_calls_concurrently(self):
+        async def run():
+            async with AsyncRedditClient('localhost:50051') as client:
+                post_id = (await client.CreatePost(reddit_pb2.CreatePostRequest(title="Async"))).post.id
+                responses = await asyncio.gather(*(client.GetPost(reddit_pb2.GetPostRequest(id=post_id)) for _ in range(50)))
+                return {response.post.title for response in responses}
+        self.assertEqual(asyncio.new_event_loop().run_until_complete(run()), {"Async"})
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,213 @@
+import grpc
+import sys
+import os
+sys.path.insert(1, './protos')
+import reddit_pb2
+import collections
+import queue
+import threading
+import time
+
+# RPCs served by the near cache and the ScoreUpdate field naming their item
+CACHED_RPCS = {'GetPost': 'postId', 'GetComment': 'commentId'}
+
+
+class _Entry:
+    __slots__ = ('response', 'expires', 'refreshed', 'confirmed')
+
+    def __init__(self, response, expires, refreshed):
+        self.response = response
+        self.expires = expires
+        self.refreshed = refreshed  # Last fetch or pushed score
+        self.confirmed = False      # The update stream has reported on this item
+
+
+class _UpdateStream:
+    """One MonitorUpdates call feeding score changes into the cache."""
+
+    def __init__(self, cache, monitor):
+        self.keys = set()       # Cached items this stream watches
+        self.subscribed = 0     # Everything ever watched; the server has no unsubscribe
+        self._requests = queue.Queue()
+        self._call = monitor(self._request_iterator())
+        threading.Thread(target=self._read, args=(cache,), daemon=True).start()
+
+    def _request_iterator(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            yield request
+
+    def _read(self, cache):
+        try:
+            for update in self._call:
+                kind = update.WhichOneof('item')
+                cache._apply_update((kind, getattr(update, kind)), update.score)
+        except grpc.RpcError:
+            pass
+        cache._stream_ended(self)
+
+    def watch(self, key):
+        self.keys.add(key)
+        self.subscribed += 1
+        self._requests.put(reddit_pb2.MonitorRequest(**{key[0]: key[1]}))
+
+    def close(self):
+        self._requests.put(None)
+        self._call.cancel()
+
+
+class NearCache:
+    """In-process read-through cache for GetPost and GetComment.
+
+    Responses are kept in an LRU of at most `max_items` entries for up to
+    `ttl` seconds. Every cached item is also watched over MonitorUpdates,
+    so its score is patched in place as votes land and hits stay
+    near-real-time without a round trip. One stream watches at most
+    `subscriptions_per_stream` items (the server's per-stream limit);
+    further streams are opened as needed and a stream whose items have all
+    been evicted is closed. If a stream fails, the items it watched are
+    dropped rather than served with scores nobody updates.
+
+    Pass it to RedditClient(near_cache=...) to enable it.
+    """
+
+    def __init__(self, max_items=10000, ttl=30.0, subscriptions_per_stream=1000, age_samples=10000):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.subscriptions_per_stream = subscriptions_per_stream
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.unconfirmed_hits = 0
+        self.updates_applied = 0
+        self.streams_lost = 0
+        self._ages = collections.deque(maxlen=age_samples)
+        self._entries = collections.OrderedDict()
+        self._stream_of = {}
+        self._streams = []
+        self._monitor = None
+        self._lock = threading.Lock()
+
+    def attach(self, monitor):
+        """Use `monitor(request_iterator)` to open MonitorUpdates streams."""
+        self._monitor = monitor
+
+    def wrap(self, name, call):
+        kind = CACHED_RPCS[name]
+
+        def cached_call(request, **kwargs):
+            return self.read((kind, request.id), lambda: call(request, **kwargs))
+        cached_call.__name__ = name
+        return cached_call
+
+    def read(self, key, fetch):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now < entry.expires:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if not entry.confirmed:
+                    self.unconfirmed_hits += 1
+                self._ages.append(now - entry.refreshed)
+                # Callers get their own copy; the cached one is patched by the update stream
+                response = type(entry.response)()
+                response.CopyFrom(entry.response)
+                return response
+            if entry:
+                self.expired += 1
+            else:
+                self.misses += 1
+        response = fetch()
+        item = response.post if key[0] == 'postId' else response.comment
+        if item.id == key[1]:
+            self._store(key, response, now)
+        return response
+
+    def _store(self, key, response, started):
+        cached = type(response)()
+        cached.CopyFrom(response)
+        with self._lock:
+            entry = _Entry(cached, started + self.ttl, started)
+            old = self._entries.get(key)
+            if old and old.refreshed > started:
+                # A score pushed while this fetch was in flight is newer than the fetched one
+                self._item(entry).score = self._item(old).score
+                entry.refreshed, entry.confirmed = old.refreshed, old.confirmed
+            elif old:
+                entry.confirmed = old.confirmed
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if key not in self._stream_of and self._monitor:
+                self._watch(key)
+            while len(self._entries) > self.max_items:
+                evicted, _ = self._entries.popitem(last=False)
+                self._unwatch(evicted)
+
+    @staticmethod
+    def _item(entry):
+        return entry.response.post if entry.response.HasField('post') else entry.response.comment
+
+    def _watch(self, key):
+        stream = self._streams[-1] if self._streams else None
+        if stream is None or stream.subscribed >= self.subscriptions_per_stream:
+            stream = _UpdateStream(self, self._monitor)
+            self._streams.append(stream)
+        stream.watch(key)
+        self._stream_of[key] = stream
+
+    def _unwatch(self, key):
+        stream = self._stream_of.pop(key, None)
+        if stream is None:
+            return
+        stream.keys.discard(key)
+        if not stream.keys and stream.subscribed >= self.subscriptions_per_stream:
+            self._streams.remove(stream)
+            stream.close()
+
+    def _apply_update(self, key, score):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._item(entry).score = score
+                entry.refreshed = time.monotonic()
+                entry.confirmed = True
+                self.updates_applied += 1
+
+    def _stream_ended(self, stream):
+        with self._lock:
+            if stream not in self._streams:
+                return  # Closed on purpose
+            self._streams.remove(stream)
+            self.streams_lost += 1
+            for key in stream.keys:
+                self._entries.pop(key, None)
+                self._stream_of.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.expired
+            ages = sorted(self._ages)
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                # Hits served before the update stream confirmed the item's score
+                'unconfirmed_hits': self.unconfirmed_hits,
+                'updates_applied': self.updates_applied,
+                'streams': len(self._streams),
+                'streams_lost': self.streams_lost,
+                # Time since a served entry was last fetched or had a score pushed
+                'age_at_hit_p50_ms': ages[len(ages) // 2] * 1000 if ages else 0.0,
+                'age_at_hit_p99_ms': ages[min(len(ages) - 1, len(ages) * 99 // 100)] * 1000 if ages else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            streams, self._streams = self._streams, []
+        for stream in streams:
+            stream.close()
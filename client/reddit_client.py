@@ -0,0 +1,125 @@
+import grpc
+import sys
+import os
+sys.path.insert(1, './protos')
+import reddit_pb2
+import reddit_pb2_grpc
+import itertools
+from near_cache import CACHED_RPCS
+
+SERVICE = reddit_pb2.DESCRIPTOR.services_by_name['RedditService']
+
+# Streams that stay open for as long as the caller wants them; a default
+# deadline would cut them off
+LONG_LIVED = frozenset({'MonitorUpdates'})
+
+
+def channel_options(keepalive_ms=30000, keepalive_timeout_ms=10000):
+    return [
+        # Ping idle connections so dead peers and NAT timeouts are noticed
+        ('grpc.keepalive_time_ms', keepalive_ms),
+        ('grpc.keepalive_timeout_ms', keepalive_timeout_ms),
+        ('grpc.keepalive_permit_without_calls', 1),
+        ('grpc.http2.max_pings_without_data', 0),
+        # Every channel gets its own connection instead of sharing one per address
+        ('grpc.use_local_subchannel_pool', 1),
+    ]
+
+
+class _Pool:
+    """Channels to every address, handed out round-robin."""
+
+    def __init__(self, make_channel, addresses, channels_per_address, timeout, keepalive_ms):
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        self.timeout = timeout
+        options = channel_options(keepalive_ms)
+        self.channels = [make_channel(address, options=options)
+                         for address in addresses for _ in range(channels_per_address)]
+        self.stubs = [reddit_pb2_grpc.RedditServiceStub(channel) for channel in self.channels]
+        self._next = itertools.count()
+
+    def method(self, name):
+        if name.startswith('_') or name not in SERVICE.methods_by_name:
+            raise AttributeError(name)
+        default_timeout = None if name in LONG_LIVED else self.timeout
+
+        def call(request, timeout=default_timeout, **kwargs):
+            # next() on a count is atomic, so concurrent callers spread evenly
+            stub = self.stubs[next(self._next) % len(self.stubs)]
+            return getattr(stub, name)(request, timeout=timeout, **kwargs)
+        call.__name__ = name
+        return call
+
+
+class RedditClient:
+    """Blocking client for RedditService with connection reuse built in.
+
+    Every RPC of the service is available as a method with the stub's
+    signature, e.g. client.GetPost(request). Calls rotate over a pool of
+    long-lived channels, `channels_per_address` to each address, and get
+    `timeout` seconds as their deadline unless one is passed (MonitorUpdates
+    has none by default). Create one client per process and share it
+    between threads. With a NearCache, GetPost and GetComment are served
+    from it.
+    """
+
+    def __init__(self, addresses='localhost:50051', channels_per_address=2, timeout=5.0, keepalive_ms=30000, near_cache=None):
+        self._pool = _Pool(grpc.insecure_channel, addresses, channels_per_address, timeout, keepalive_ms)
+        self.near_cache = near_cache
+        if near_cache:
+            near_cache.attach(self._pool.method('MonitorUpdates'))
+
+    def __getattr__(self, name):
+        call = self._pool.method(name)
+        if self.near_cache and name in CACHED_RPCS:
+            call = self.near_cache.wrap(name, call)
+        setattr(self, name, call)
+        return call
+
+    def wait_ready(self, timeout=None):
+        for channel in self._pool.channels:
+            grpc.channel_ready_future(channel).result(timeout=timeout)
+
+    def close(self):
+        if self.near_cache:
+            self.near_cache.close()
+        for channel in self._pool.channels:
+            channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncRedditClient:
+    """grpc.aio counterpart of RedditClient for many concurrent in-flight calls.
+
+    Unary methods return awaitables and streaming methods async iterators,
+    exactly like grpc.aio stubs. Must be created inside the event loop that
+    uses it.
+    """
+
+    def __init__(self, addresses='localhost:50051', channels_per_address=2, timeout=5.0, keepalive_ms=30000):
+        self._pool = _Pool(grpc.aio.insecure_channel, addresses, channels_per_address, timeout, keepalive_ms)
+
+    def __getattr__(self, name):
+        call = self._pool.method(name)
+        setattr(self, name, call)
+        return call
+
+    async def wait_ready(self):
+        for channel in self._pool.channels:
+            await channel.channel_ready()
+
+    async def close(self):
+        for channel in self._pool.channels:
+            await channel.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,178 @@
+import grpc
+import sys
+import os
+sys.path.insert(1, './protos')
+import reddit_pb2
+import reddit_pb2_grpc
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import time
+
+# Compares the thread-pool server with the --async server when many long-lived
+# streams are open at once. Each mode is started as its own server process;
+# the load is generated with grpc.aio so the client side never runs out of
+# threads, spread over several connections so HTTP/2 stream limits on a single
+# connection don't skew the result. Run from the repository root:
+#   python client/stream_bench.py --streams 50 200 1000
+
+STREAMS_PER_CHANNEL = 50
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'server', 'server.py')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, use_async, workers):
+    args = [sys.executable, SERVER, '--port', str(port), '--workers', str(workers)]
+    if use_async:
+        args.append('--async')
+    process = subprocess.Popen(args, cwd=os.path.join(os.path.dirname(SERVER), '..'), stdout=subprocess.DEVNULL)
+    grpc.channel_ready_future(grpc.insecure_channel(f'localhost:{port}')).result(timeout=10)
+    return process
+
+
+def percentile(samples, p):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+async def seed(stub, comments):
+    post_id = (await stub.CreatePost(reddit_pb2.CreatePostRequest(title="Bench", content="Stream benchmark"))).post.id
+    for i in range(comments):
+        await stub.CreateComment(reddit_pb2.CreateCommentRequest(content=f"comment {i}", postId=post_id, authorId="bench"))
+    return post_id
+
+
+async def bench_list_comments(stubs, post_id, streams, timeout):
+    """Run `streams` concurrent ListComments calls; report per-stream latency."""
+    async def one(stub):
+        start = time.perf_counter()
+        async for _ in stub.ListComments(reddit_pb2.ListCommentsRequest(postId=post_id), timeout=timeout):
+            pass
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(stubs[i % len(stubs)]) for i in range(streams)), return_exceptions=True)
+    wall = time.perf_counter() - start
+    latencies = [r for r in results if not isinstance(r, Exception)]
+    return {
+        'completed': len(latencies),
+        'failed': streams - len(latencies),
+        'wall_s': round(wall, 4),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+async def bench_monitor(stubs, post_id, streams, timeout):
+    """Hold `streams` MonitorUpdates open, cast one vote and time its fan-out."""
+    release = asyncio.Event()
+    subscribed = 0
+    all_subscribed = asyncio.Event()
+    vote_sent = [None]
+    fanout = []
+
+    async def requests():
+        yield reddit_pb2.MonitorRequest(postId=post_id)
+        await release.wait()
+
+    async def one(stub):
+        nonlocal subscribed
+        call = stub.MonitorUpdates(requests(), timeout=timeout)
+        first = True
+        try:
+            async for update in call:
+                if first:
+                    first = False
+                    subscribed += 1
+                    if subscribed == streams:
+                        all_subscribed.set()
+                elif vote_sent[0] is not None:
+                    fanout.append(time.perf_counter() - vote_sent[0])
+                    break
+        except grpc.RpcError:
+            pass  # Deadline hit while queued behind a saturated server
+        call.cancel()
+
+    tasks = [asyncio.create_task(one(stubs[i % len(stubs)])) for i in range(streams)]
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(all_subscribed.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    setup = time.perf_counter() - start
+    result = {'subscribed': subscribed, 'setup_s': round(setup, 4)}
+    if subscribed == streams:
+        vote_sent[0] = time.perf_counter()
+        try:
+            await asyncio.wait_for(stubs[0].VotePost(reddit_pb2.VotePostRequest(postId=post_id, voteType=reddit_pb2.UPVOTE)), timeout)
+        except (asyncio.TimeoutError, grpc.RpcError):
+            pass
+        await asyncio.wait(tasks, timeout=timeout)
+        result['fanout_received'] = len(fanout)
+        result['fanout_p50_ms'] = round(percentile(fanout, 50) * 1000, 2) if fanout else None
+        result['fanout_max_ms'] = round(max(fanout) * 1000, 2) if fanout else None
+    release.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.wait(tasks, timeout=timeout)
+    return result
+
+
+async def run_mode(port, stream_counts, comments, timeout, stop_server):
+    # A local subchannel pool gives every channel its own connection
+    channels = [grpc.aio.insecure_channel(f'localhost:{port}', options=[('grpc.use_local_subchannel_pool', 1)])
+                for _ in range(-(-max(stream_counts) // STREAMS_PER_CHANNEL))]
+    stubs = [reddit_pb2_grpc.RedditServiceStub(channel) for channel in channels]
+    post_id = await seed(stubs[0], comments)
+    results = {}
+    for streams in stream_counts:
+        results[streams] = {
+            'list_comments': await bench_list_comments(stubs, post_id, streams, timeout),
+            'monitor_updates': await bench_monitor(stubs, post_id, streams, timeout),
+        }
+    # Streams stuck behind a saturated thread pool never finish on their own;
+    # stopping the server first fails them so the channels can close cleanly
+    stop_server()
+    for channel in channels:
+        await channel.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare thread-pool and asyncio servers under many concurrent streams")
+    parser.add_argument('--streams', type=int, nargs='+', default=[10, 100, 500], help="Concurrent stream counts to test")
+    parser.add_argument('--comments', type=int, default=200, help="Comments streamed by each ListComments call")
+    parser.add_argument('--workers', type=int, default=10, help="Thread pool size for the sync server")
+    parser.add_argument('--timeout', type=float, default=10, help="Per-phase timeout in seconds")
+    args = parser.parse_args()
+
+    report = {}
+    for mode, use_async in (('sync', False), ('async', True)):
+        port = free_port()
+        process = start_server(port, use_async, args.workers)
+
+        def stop_server():
+            process.kill()
+            process.wait()
+
+        try:
+            # A fresh loop per mode; asyncio.run's shutdown can block on
+            # cancelled grpc.aio stream internals, so it is not used here
+            loop = asyncio.new_event_loop()
+            report[mode] = loop.run_until_complete(run_mode(port, args.streams, args.comments, args.timeout, stop_server))
+        finally:
+            stop_server()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
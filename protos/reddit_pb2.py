@@ -14,75 +14,123 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0creddit.proto\x12\x06reddit\"\xc4\x01\n\x04Post\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\r\n\x05score\x18\x04 \x01(\x05\x12 \n\x05state\x18\x05 \x01(\x0e\x32\x11.reddit.PostState\x12\x17\n\x0fpublicationDate\x18\x06 \x01(\t\x12\x13\n\timage_url\x18\x07 \x01(\tH\x00\x12\x13\n\tvideo_url\x18\x08 \x01(\tH\x00\x12\x13\n\x0bsubredditId\x18\t \x01(\tB\x07\n\x05media\"\xb6\x01\n\x07\x43omment\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x10\n\x06postId\x18\x03 \x01(\tH\x00\x12\x13\n\tcommentId\x18\x04 \x01(\tH\x00\x12\x10\n\x08\x61uthorId\x18\x05 \x01(\t\x12\r\n\x05score\x18\x06 \x01(\x05\x12#\n\x05state\x18\x07 \x01(\x0e\x32\x14.reddit.CommentState\x12\x17\n\x0fpublicationDate\x18\x08 \x01(\tB\x08\n\x06rootId\"Z\n\tSubReddit\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12%\n\x05scope\x18\x03 \x01(\x0e\x32\x16.reddit.SubredditScope\x12\x0c\n\x04tags\x18\x04 \x03(\t\"s\n\x04User\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x1b\n\x05posts\x18\x04 \x03(\x0b\x32\x0c.reddit.Post\x12!\n\x08\x63omments\x18\x05 \x03(\x0b\x32\x0f.reddit.Comment\"\x12\n\x10ListPostsRequest\"@\n\x11\x43reateUserRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\"\x1c\n\x0eGetUserRequest\x12\n\n\x02id\x18\x01 \x01(\t\"*\n\x0cUserResponse\x12\x1a\n\x04user\x18\x01 \x01(\x0b\x32\x0c.reddit.User\"\x9d\x01\n\x11\x43reatePostRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x13\n\x0bsubredditId\x18\x03 \x01(\t\x12 \n\x05state\x18\x04 \x01(\x0e\x32\x11.reddit.PostState\x12\x13\n\timage_url\x18\x05 \x01(\tH\x00\x12\x13\n\tvideo_url\x18\x06 \x01(\tH\x00\x42\x07\n\x05media\"\x1c\n\x0eGetPostRequest\x12\n\n\x02id\x18\x01 \x01(\t\"O\n\x0fGetPostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x1a\n\x04post\x18\x03 \x01(\x0b\x32\x0c.reddit.Post\"L\n\x0cPostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x1a\n\x04post\x18\x03 \x01(\x0b\x32\x0c.reddit.Post\"\x8f\x01\n\x14\x43reateCommentRequest\x12\x0f\n\x07\x63ontent\x18\x01 \x01(\t\x12\x10\n\x06postId\x18\x02 \x01(\tH\x00\x12\x13\n\tcommentId\x18\x03 \x01(\tH\x00\x12\x10\n\x08\x61uthorId\x18\x04 \x01(\t\x12#\n\x05state\x18\x05 \x01(\x0e\x32\x14.reddit.CommentStateB\x08\n\x06rootId\"[\n\x15\x43reateCommentResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12 \n\x07\x63omment\x18\x03 \x01(\x0b\x32\x0f.reddit.Comment\"\x1f\n\x11GetCommentRequest\x12\n\n\x02id\x18\x01 \x01(\t\"3\n\x0f\x43ommentResponse\x12 \n\x07\x63omment\x18\x01 \x01(\x0b\x32\x0f.reddit.Comment\"%\n\x13ListCommentsRequest\x12\x0e\n\x06postId\x18\x01 \x01(\t\"E\n\x0fVotePostRequest\x12\x0e\n\x06postId\x18\x01 \x01(\t\x12\"\n\x08voteType\x18\x02 \x01(\x0e\x32\x10.reddit.VoteType\"J\n\x10VotePostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x14\n\x0cupdatedScore\x18\x03 \x01(\x05\"K\n\x12VoteCommentRequest\x12\x11\n\tcommentId\x18\x01 \x01(\t\x12\"\n\x08voteType\x18\x02 \x01(\x0e\x32\x10.reddit.VoteType\"M\n\x13VoteCommentResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x14\n\x0cupdatedScore\x18\x03 \x01(\x05\"A\n\x15GetTopCommentsRequest\x12\x0e\n\x06postId\x18\x01 \x01(\t\x12\x18\n\x10numberOfComments\x18\x02 \x01(\x05\"X\n\x12\x43ommentWithReplies\x12 \n\x07\x63omment\x18\x01 \x01(\x0b\x32\x0f.reddit.Comment\x12 \n\x07replies\x18\x02 \x03(\x0b\x32\x0f.reddit.Comment\"h\n\x16GetTopCommentsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12,\n\x08\x63omments\x18\x03 \x03(\x0b\x32\x1a.reddit.CommentWithReplies\"O\n\x1a\x45xpandCommentBranchRequest\x12\x17\n\x0fparentCommentId\x18\x01 \x01(\t\x12\x18\n\x10numberOfComments\x18\x02 \x01(\x05\"f\n\x1b\x45xpandCommentBranchResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12%\n\x08\x63omments\x18\x03 \x03(\x0b\x32\x13.reddit.CommentTree\"U\n\x0b\x43ommentTree\x12 \n\x07\x63omment\x18\x01 \x01(\x0b\x32\x0f.reddit.Comment\x12$\n\x07replies\x18\x02 \x03(\x0b\x32\x13.reddit.CommentTree*/\n\tPostState\x12\n\n\x06NORMAL\x10\x00\x12\n\n\x06LOCKED\x10\x01\x12\n\n\x06HIDDEN\x10\x02*6\n\x0c\x43ommentState\x12\x12\n\x0e\x43OMMENT_NORMAL\x10\x00\x12\x12\n\x0e\x43OMMENT_HIDDEN\x10\x01*S\n\x0eSubredditScope\x12\x14\n\x10SUBREDDIT_PUBLIC\x10\x00\x12\x15\n\x11SUBREDDIT_PRIVATE\x10\x01\x12\x14\n\x10SUBREDDIT_HIDDEN\x10\x02*$\n\x08VoteType\x12\n\n\x06UPVOTE\x10\x00\x12\x0c\n\x08\x44OWNVOTE\x10\x01\x32\xd1\x06\n\rRedditService\x12=\n\nCreateUser\x12\x19.reddit.CreateUserRequest\x1a\x14.reddit.UserResponse\x12\x37\n\x07GetUser\x12\x16.reddit.GetUserRequest\x1a\x14.reddit.UserResponse\x12=\n\nCreatePost\x12\x19.reddit.CreatePostRequest\x1a\x14.reddit.PostResponse\x12:\n\x07GetPost\x12\x16.reddit.GetPostRequest\x1a\x17.reddit.GetPostResponse\x12=\n\tListPosts\x12\x18.reddit.ListPostsRequest\x1a\x14.reddit.PostResponse0\x01\x12L\n\rCreateComment\x12\x1c.reddit.CreateCommentRequest\x1a\x1d.reddit.CreateCommentResponse\x12@\n\nGetComment\x12\x19.reddit.GetCommentRequest\x1a\x17.reddit.CommentResponse\x12\x46\n\x0cListComments\x12\x1b.reddit.ListCommentsRequest\x1a\x17.reddit.CommentResponse0\x01\x12=\n\x08VotePost\x12\x17.reddit.VotePostRequest\x1a\x18.reddit.VotePostResponse\x12\x46\n\x0bVoteComment\x12\x1a.reddit.VoteCommentRequest\x1a\x1b.reddit.VoteCommentResponse\x12O\n\x0eGetTopComments\x12\x1d.reddit.GetTopCommentsRequest\x1a\x1e.reddit.GetTopCommentsResponse\x12^\n\x13\x45xpandCommentBranch\x12\".reddit.ExpandCommentBranchRequest\x1a#.reddit.ExpandCommentBranchResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0creddit.proto\x12\x06reddit\"\xd6\x01\n\x04Post\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\r\n\x05score\x18\x04 \x01(\x05\x12 \n\x05state\x18\x05 \x01(\x0e\x32\x11.reddit.PostState\x12\x17\n\x0fpublicationDate\x18\x06 \x01(\t\x12\x13\n\timage_url\x18\x07 \x01(\tH\x00\x12\x13\n\tvideo_url\x18\x08 \x01(\tH\x00\x12\x13\n\x0bsubredditId\x18\t \x01(\t\x12\x10\n\x08\x61uthorId\x18\n \x01(\tB\x07\n\x05media\"\xb6\x01\n\x07\x43omment\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x10\n\x06postId\x18\x03 \x01(\tH\x00\x12\x13\n\tcommentId\x18\x04 \x01(\tH\x00\x12\x10\n\x08\x61uthorId\x18\x05 \x01(\t\x12\r\n\x05score\x18\x06 \x01(\x05\x12#\n\x05state\x18\x07 \x01(\x0e\x32\x14.reddit.CommentState\x12\x17\n\x0fpublicationDate\x18\x08 \x01(\tB\x08\n\x06rootId\"Z\n\tSubReddit\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12%\n\x05scope\x18\x03 \x01(\x0e\x32\x16.reddit.SubredditScope\x12\x0c\n\x04tags\x18\x04 \x03(\t\"s\n\x04User\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x1b\n\x05posts\x18\x04 \x03(\x0b\x32\x0c.reddit.Post\x12!\n\x08\x63omments\x18\x05 \x03(\x0b\x32\x0f.reddit.Comment\"\x93\x01\n\x10ListPostsRequest\x12\x13\n\x0bsubredditId\x18\x01 \x01(\t\x12%\n\x05state\x18\x02 \x01(\x0e\x32\x11.reddit.PostStateH\x00\x88\x01\x01\x12\x10\n\x08pageSize\x18\x03 \x01(\x05\x12\x0e\n\x06\x63ursor\x18\x04 \x01(\t\x12\x17\n\x0fpostsPerMessage\x18\x05 \x01(\x05\x42\x08\n\x06_state\"K\n\x17ListUserActivityRequest\x12\x0e\n\x06userId\x18\x01 \x01(\t\x12\x10\n\x08pageSize\x18\x02 \x01(\x05\x12\x0e\n\x06\x63ursor\x18\x03 \x01(\t\"\x7f\n\x0cUserActivity\x12\x1c\n\x04post\x18\x01 \x01(\x0b\x32\x0c.reddit.PostH\x00\x12\"\n\x07\x63omment\x18\x02 \x01(\x0b\x32\x0f.reddit.CommentH\x00\x12\x0e\n\x06\x63ursor\x18\x03 \x01(\t\x12\x15\n\rcreatedMicros\x18\x04 \x01(\x03\x42\x06\n\x04item\"@\n\x11\x43reateUserRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\"\x1c\n\x0eGetUserRequest\x12\n\n\x02id\x18\x01 \x01(\t\"*\n\x0cUserResponse\x12\x1a\n\x04user\x18\x01 \x01(\x0b\x32\x0c.reddit.User\"\xaf\x01\n\x11\x43reatePostRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x13\n\x0bsubredditId\x18\x03 \x01(\t\x12 \n\x05state\x18\x04 \x01(\x0e\x32\x11.reddit.PostState\x12\x13\n\timage_url\x18\x05 \x01(\tH\x00\x12\x13\n\tvideo_url\x18\x06 \x01(\tH\x00\x12\x10\n\x08\x61uthorId\x18\x07 \x01(\tB\x07\n\x05media\"\x1c\n\x0eGetPostRequest\x12\n\n\x02id\x18\x01 \x01(\t\"O\n\x0fGetPostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x1a\n\x04post\x18\x03 \x01(\x0b\x32\x0c.reddit.Post\"}\n\x0cPostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x1a\n\x04post\x18\x03 \x01(\x0b\x32\x0c.reddit.Post\x12\x1b\n\x05posts\x18\x04 \x03(\x0b\x32\x0c.reddit.Post\x12\x12\n\nnextCursor\x18\x05 \x01(\t\"\x8f\x01\n\x14\x43reateCommentRequest\x12\x0f\n\x07\x63ontent\x18\x01 \x01(\t\x12\x10\n\x06postId\x18\x02 \x01(\tH\x00\x12\x13\n\tcommentId\x18\x03 \x01(\tH\x00\x12\x10\n\x08\x61uthorId\x18\x04 \x01(\t\x12#\n\x05state\x18\x05 \x01(\x0e\x32\x14.reddit.CommentStateB\x08\n\x06rootId\"[\n\x15\x43reateCommentResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12 \n\x07\x63omment\x18\x03 \x01(\x0b\x32\x0f.reddit.Comment\"\x1f\n\x11GetCommentRequest\x12\n\n\x02id\x18\x01 \x01(\t\"3\n\x0f\x43ommentResponse\x12 \n\x07\x63omment\x18\x01 \x01(\x0b\x32\x0f.reddit.Comment\"%\n\x13ListCommentsRequest\x12\x0e\n\x06postId\x18\x01 \x01(\t\"E\n\x0fVotePostRequest\x12\x0e\n\x06postId\x18\x01 \x01(\t\x12\"\n\x08voteType\x18\x02 \x01(\x0e\x32\x10.reddit.VoteType\"J\n\x10VotePostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x14\n\x0cupdatedScore\x18\x03 \x01(\x05\"K\n\x12VoteCommentRequest\x12\x11\n\tcommentId\x18\x01 \x01(\t\x12\"\n\x08voteType\x18\x02 \x01(\x0e\x32\x10.reddit.VoteType\"M\n\x13VoteCommentResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x14\n\x0cupdatedScore\x18\x03 \x01(\x05\"g\n\x10VoteBatchRequest\x12\x10\n\x06postId\x18\x01 \x01(\tH\x00\x12\x13\n\tcommentId\x18\x02 \x01(\tH\x00\x12\"\n\x08voteType\x18\x03 \x01(\x0e\x32\x10.reddit.VoteTypeB\x08\n\x06target\"\x86\x01\n\x11VoteBatchResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x14\n\x0cvotesApplied\x18\x03 \x01(\x05\x12\x14\n\x0cvotesSkipped\x18\x04 \x01(\x05\x12#\n\x06scores\x18\x05 \x03(\x0b\x32\x13.reddit.ScoreUpdate\"f\n\x12\x42ulkCreateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0b\n\x03ids\x18\x03 \x03(\t\x12\x0f\n\x07\x63reated\x18\x04 \x01(\x05\x12\x10\n\x08rejected\x18\x05 \x01(\x05\"\\\n\x15GetTopCommentsRequest\x12\x0e\n\x06postId\x18\x01 \x01(\t\x12\x18\n\x10numberOfComments\x18\x02 \x01(\x05\x12\x19\n\x11repliesPerComment\x18\x03 \x01(\x05\"X\n\x12\x43ommentWithReplies\x12 \n\x07\x63omment\x18\x01 \x01(\x0b\x32\x0f.reddit.Comment\x12 \n\x07replies\x18\x02 \x03(\x0b\x32\x0f.reddit.Comment\"h\n\x16GetTopCommentsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12,\n\x08\x63omments\x18\x03 \x03(\x0b\x32\x1a.reddit.CommentWithReplies\"8\n\x12GetHotPostsRequest\x12\x13\n\x0bsubredditId\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x05\"T\n\x13GetHotPostsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x1b\n\x05posts\x18\x03 \x03(\x0b\x32\x0c.reddit.Post\"F\n\x12GetTrendingRequest\x12\x0f\n\x07minutes\x18\x01 \x01(\x05\x12\r\n\x05\x63ount\x18\x02 \x01(\x05\x12\x10\n\x08\x63omments\x18\x03 \x01(\x08\"\x7f\n\x0cTrendingItem\x12\x1c\n\x04post\x18\x01 \x01(\x0b\x32\x0c.reddit.PostH\x00\x12\"\n\x07\x63omment\x18\x02 \x01(\x0b\x32\x0f.reddit.CommentH\x00\x12\r\n\x05votes\x18\x03 \x01(\x05\x12\x16\n\x0evotesPerMinute\x18\x04 \x01(\x01\x42\x06\n\x04item\"\\\n\x13GetTrendingResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12#\n\x05items\x18\x03 \x03(\x0b\x32\x14.reddit.TrendingItem\"@\n\rSearchRequest\x12\r\n\x05query\x18\x01 \x01(\t\x12\x10\n\x08pageSize\x18\x02 \x01(\x05\x12\x0e\n\x06\x63ursor\x18\x03 \x01(\t\"{\n\x13SearchPostsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x1b\n\x05posts\x18\x03 \x03(\x0b\x32\x0c.reddit.Post\x12\x11\n\trelevance\x18\x04 \x03(\x01\x12\x12\n\nnextCursor\x18\x05 \x01(\t\"\x84\x01\n\x16SearchCommentsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12!\n\x08\x63omments\x18\x03 \x03(\x0b\x32\x0f.reddit.Comment\x12\x11\n\trelevance\x18\x04 \x03(\x01\x12\x12\n\nnextCursor\x18\x05 \x01(\t\"s\n\x1a\x45xpandCommentBranchRequest\x12\x17\n\x0fparentCommentId\x18\x01 \x01(\t\x12\x18\n\x10numberOfComments\x18\x02 \x01(\x05\x12\x10\n\x08maxDepth\x18\x03 \x01(\x05\x12\x10\n\x08maxNodes\x18\x04 \x01(\x05\"P\n\x0b\x43ommentNode\x12 \n\x07\x63omment\x18\x01 \x01(\x0b\x32\x0f.reddit.Comment\x12\x10\n\x08parentId\x18\x02 \x01(\t\x12\r\n\x05\x64\x65pth\x18\x03 \x01(\x05\"f\n\x1b\x45xpandCommentBranchResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12%\n\x08\x63omments\x18\x03 \x03(\x0b\x32\x13.reddit.CommentTree\"U\n\x0b\x43ommentTree\x12 \n\x07\x63omment\x18\x01 \x01(\x0b\x32\x0f.reddit.Comment\x12$\n\x07replies\x18\x02 \x03(\x0b\x32\x13.reddit.CommentTree\"\\\n\x17GetThreadSummaryRequest\x12\x0e\n\x06postId\x18\x01 \x01(\t\x12\x18\n\x10numberOfComments\x18\x02 \x01(\x05\x12\x17\n\x0fnumberOfReplies\x18\x03 \x01(\x05\"\x7f\n\x18GetThreadSummaryResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x1a\n\x04post\x18\x03 \x01(\x0b\x32\x0c.reddit.Post\x12%\n\x08\x63omments\x18\x04 \x03(\x0b\x32\x13.reddit.CommentTree\"G\n\x0eMonitorRequest\x12\x10\n\x06postId\x18\x01 \x01(\tH\x00\x12\x13\n\tcommentId\x18\x02 \x01(\tH\x00\x42\x0e\n\x0crequest_type\"K\n\x0bScoreUpdate\x12\x10\n\x06postId\x18\x01 \x01(\tH\x00\x12\x13\n\tcommentId\x18\x02 \x01(\tH\x00\x12\r\n\x05score\x18\x03 \x01(\x05\x42\x06\n\x04item\"\x17\n\x15GetServerStatsRequest\"\x9a\x02\n\x0bMethodStats\x12\x0e\n\x06method\x18\x01 \x01(\t\x12\r\n\x05\x63\x61lls\x18\x02 \x01(\x03\x12\x10\n\x08inFlight\x18\x03 \x01(\x05\x12\x18\n\x10messagesReceived\x18\x04 \x01(\x03\x12\x14\n\x0cmessagesSent\x18\x05 \x01(\x03\x12\x39\n\x0bstatusCodes\x18\x06 \x03(\x0b\x32$.reddit.MethodStats.StatusCodesEntry\x12\x0e\n\x06meanMs\x18\x07 \x01(\x01\x12\r\n\x05p50Ms\x18\x08 \x01(\x01\x12\r\n\x05p95Ms\x18\t \x01(\x01\x12\r\n\x05p99Ms\x18\n \x01(\x01\x1a\x32\n\x10StatusCodesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x03:\x02\x38\x01\"\x8d\x01\n\x12ResponseCacheStats\x12\x0f\n\x07\x65ntries\x18\x01 \x01(\x03\x12\r\n\x05\x62ytes\x18\x02 \x01(\x03\x12\x0c\n\x04hits\x18\x03 \x01(\x03\x12\x0e\n\x06misses\x18\x04 \x01(\x03\x12\x0f\n\x07hitRate\x18\x05 \x01(\x01\x12\x11\n\tevictions\x18\x06 \x01(\x03\x12\x15\n\rinvalidations\x18\x07 \x01(\x03\"\xa2\x01\n\x0bServerStats\x12\x15\n\ruptimeSeconds\x18\x01 \x01(\x01\x12$\n\x07methods\x18\x02 \x03(\x0b\x32\x13.reddit.MethodStats\x12\x31\n\rresponseCache\x18\x03 \x01(\x0b\x32\x1a.reddit.ResponseCacheStats\x12#\n\x06shards\x18\x04 \x03(\x0b\x32\x13.reddit.ServerStats*/\n\tPostState\x12\n\n\x06NORMAL\x10\x00\x12\n\n\x06LOCKED\x10\x01\x12\n\n\x06HIDDEN\x10\x02*6\n\x0c\x43ommentState\x12\x12\n\x0e\x43OMMENT_NORMAL\x10\x00\x12\x12\n\x0e\x43OMMENT_HIDDEN\x10\x01*S\n\x0eSubredditScope\x12\x14\n\x10SUBREDDIT_PUBLIC\x10\x00\x12\x15\n\x11SUBREDDIT_PRIVATE\x10\x01\x12\x14\n\x10SUBREDDIT_HIDDEN\x10\x02*$\n\x08VoteType\x12\n\n\x06UPVOTE\x10\x00\x12\x0c\n\x08\x44OWNVOTE\x10\x01\x32\xa0\x0e\n\rRedditService\x12=\n\nCreateUser\x12\x19.reddit.CreateUserRequest\x1a\x14.reddit.UserResponse\x12\x37\n\x07GetUser\x12\x16.reddit.GetUserRequest\x1a\x14.reddit.UserResponse\x12K\n\x10ListUserActivity\x12\x1f.reddit.ListUserActivityRequest\x1a\x14.reddit.UserActivity0\x01\x12=\n\nCreatePost\x12\x19.reddit.CreatePostRequest\x1a\x14.reddit.PostResponse\x12:\n\x07GetPost\x12\x16.reddit.GetPostRequest\x1a\x17.reddit.GetPostResponse\x12=\n\tListPosts\x12\x18.reddit.ListPostsRequest\x1a\x14.reddit.PostResponse0\x01\x12L\n\rCreateComment\x12\x1c.reddit.CreateCommentRequest\x1a\x1d.reddit.CreateCommentResponse\x12@\n\nGetComment\x12\x19.reddit.GetCommentRequest\x1a\x17.reddit.CommentResponse\x12\x46\n\x0cListComments\x12\x1b.reddit.ListCommentsRequest\x1a\x17.reddit.CommentResponse0\x01\x12J\n\x0f\x42ulkCreatePosts\x12\x19.reddit.CreatePostRequest\x1a\x1a.reddit.BulkCreateResponse(\x01\x12P\n\x12\x42ulkCreateComments\x12\x1c.reddit.CreateCommentRequest\x1a\x1a.reddit.BulkCreateResponse(\x01\x12=\n\x08VotePost\x12\x17.reddit.VotePostRequest\x1a\x18.reddit.VotePostResponse\x12\x46\n\x0bVoteComment\x12\x1a.reddit.VoteCommentRequest\x1a\x1b.reddit.VoteCommentResponse\x12\x42\n\tVoteBatch\x12\x18.reddit.VoteBatchRequest\x1a\x19.reddit.VoteBatchResponse(\x01\x12O\n\x0eGetTopComments\x12\x1d.reddit.GetTopCommentsRequest\x1a\x1e.reddit.GetTopCommentsResponse\x12\x46\n\x0bGetHotPosts\x12\x1a.reddit.GetHotPostsRequest\x1a\x1b.reddit.GetHotPostsResponse\x12\x46\n\x0bGetTrending\x12\x1a.reddit.GetTrendingRequest\x1a\x1b.reddit.GetTrendingResponse\x12\x41\n\x0bSearchPosts\x12\x15.reddit.SearchRequest\x1a\x1b.reddit.SearchPostsResponse\x12G\n\x0eSearchComments\x12\x15.reddit.SearchRequest\x1a\x1e.reddit.SearchCommentsResponse\x12P\n\x11StreamTopComments\x12\x1d.reddit.GetTopCommentsRequest\x1a\x1a.reddit.CommentWithReplies0\x01\x12^\n\x13\x45xpandCommentBranch\x12\".reddit.ExpandCommentBranchRequest\x1a#.reddit.ExpandCommentBranchResponse\x12P\n\x13StreamCommentBranch\x12\".reddit.ExpandCommentBranchRequest\x1a\x13.reddit.CommentNode0\x01\x12U\n\x10GetThreadSummary\x12\x1f.reddit.GetThreadSummaryRequest\x1a .reddit.GetThreadSummaryResponse\x12\x41\n\x0eMonitorUpdates\x12\x16.reddit.MonitorRequest\x1a\x13.reddit.ScoreUpdate(\x01\x30\x01\x12\x44\n\x0eGetServerStats\x12\x1d.reddit.GetServerStatsRequest\x1a\x13.reddit.ServerStatsb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'reddit_pb2', _globals)
 if _descriptor._USE_C_DESCRIPTORS == False:
   DESCRIPTOR._options = None
-  _globals['_POSTSTATE']._serialized_start=2328
-  _globals['_POSTSTATE']._serialized_end=2375
-  _globals['_COMMENTSTATE']._serialized_start=2377
-  _globals['_COMMENTSTATE']._serialized_end=2431
-  _globals['_SUBREDDITSCOPE']._serialized_start=2433
-  _globals['_SUBREDDITSCOPE']._serialized_end=2516
-  _globals['_VOTETYPE']._serialized_start=2518
-  _globals['_VOTETYPE']._serialized_end=2554
+  _globals['_METHODSTATS_STATUSCODESENTRY']._options = None
+  _globals['_METHODSTATS_STATUSCODESENTRY']._serialized_options = b'8\001'
+  _globals['_POSTSTATE']._serialized_start=4997
+  _globals['_POSTSTATE']._serialized_end=5044
+  _globals['_COMMENTSTATE']._serialized_start=5046
+  _globals['_COMMENTSTATE']._serialized_end=5100
+  _globals['_SUBREDDITSCOPE']._serialized_start=5102
+  _globals['_SUBREDDITSCOPE']._serialized_end=5185
+  _globals['_VOTETYPE']._serialized_start=5187
+  _globals['_VOTETYPE']._serialized_end=5223
   _globals['_POST']._serialized_start=25
-  _globals['_POST']._serialized_end=221
-  _globals['_COMMENT']._serialized_start=224
-  _globals['_COMMENT']._serialized_end=406
-  _globals['_SUBREDDIT']._serialized_start=408
-  _globals['_SUBREDDIT']._serialized_end=498
-  _globals['_USER']._serialized_start=500
-  _globals['_USER']._serialized_end=615
-  _globals['_LISTPOSTSREQUEST']._serialized_start=617
-  _globals['_LISTPOSTSREQUEST']._serialized_end=635
-  _globals['_CREATEUSERREQUEST']._serialized_start=637
-  _globals['_CREATEUSERREQUEST']._serialized_end=701
-  _globals['_GETUSERREQUEST']._serialized_start=703
-  _globals['_GETUSERREQUEST']._serialized_end=731
-  _globals['_USERRESPONSE']._serialized_start=733
-  _globals['_USERRESPONSE']._serialized_end=775
-  _globals['_CREATEPOSTREQUEST']._serialized_start=778
-  _globals['_CREATEPOSTREQUEST']._serialized_end=935
-  _globals['_GETPOSTREQUEST']._serialized_start=937
-  _globals['_GETPOSTREQUEST']._serialized_end=965
-  _globals['_GETPOSTRESPONSE']._serialized_start=967
-  _globals['_GETPOSTRESPONSE']._serialized_end=1046
-  _globals['_POSTRESPONSE']._serialized_start=1048
-  _globals['_POSTRESPONSE']._serialized_end=1124
-  _globals['_CREATECOMMENTREQUEST']._serialized_start=1127
-  _globals['_CREATECOMMENTREQUEST']._serialized_end=1270
-  _globals['_CREATECOMMENTRESPONSE']._serialized_start=1272
-  _globals['_CREATECOMMENTRESPONSE']._serialized_end=1363
-  _globals['_GETCOMMENTREQUEST']._serialized_start=1365
-  _globals['_GETCOMMENTREQUEST']._serialized_end=1396
-  _globals['_COMMENTRESPONSE']._serialized_start=1398
-  _globals['_COMMENTRESPONSE']._serialized_end=1449
-  _globals['_LISTCOMMENTSREQUEST']._serialized_start=1451
-  _globals['_LISTCOMMENTSREQUEST']._serialized_end=1488
-  _globals['_VOTEPOSTREQUEST']._serialized_start=1490
-  _globals['_VOTEPOSTREQUEST']._serialized_end=1559
-  _globals['_VOTEPOSTRESPONSE']._serialized_start=1561
-  _globals['_VOTEPOSTRESPONSE']._serialized_end=1635
-  _globals['_VOTECOMMENTREQUEST']._serialized_start=1637
-  _globals['_VOTECOMMENTREQUEST']._serialized_end=1712
-  _globals['_VOTECOMMENTRESPONSE']._serialized_start=1714
-  _globals['_VOTECOMMENTRESPONSE']._serialized_end=1791
-  _globals['_GETTOPCOMMENTSREQUEST']._serialized_start=1793
-  _globals['_GETTOPCOMMENTSREQUEST']._serialized_end=1858
-  _globals['_COMMENTWITHREPLIES']._serialized_start=1860
-  _globals['_COMMENTWITHREPLIES']._serialized_end=1948
-  _globals['_GETTOPCOMMENTSRESPONSE']._serialized_start=1950
-  _globals['_GETTOPCOMMENTSRESPONSE']._serialized_end=2054
-  _globals['_EXPANDCOMMENTBRANCHREQUEST']._serialized_start=2056
-  _globals['_EXPANDCOMMENTBRANCHREQUEST']._serialized_end=2135
-  _globals['_EXPANDCOMMENTBRANCHRESPONSE']._serialized_start=2137
-  _globals['_EXPANDCOMMENTBRANCHRESPONSE']._serialized_end=2239
-  _globals['_COMMENTTREE']._serialized_start=2241
-  _globals['_COMMENTTREE']._serialized_end=2326
-  _globals['_REDDITSERVICE']._serialized_start=2557
-  _globals['_REDDITSERVICE']._serialized_end=3406
+  _globals['_POST']._serialized_end=239
+  _globals['_COMMENT']._serialized_start=242
+  _globals['_COMMENT']._serialized_end=424
+  _globals['_SUBREDDIT']._serialized_start=426
+  _globals['_SUBREDDIT']._serialized_end=516
+  _globals['_USER']._serialized_start=518
+  _globals['_USER']._serialized_end=633
+  _globals['_LISTPOSTSREQUEST']._serialized_start=636
+  _globals['_LISTPOSTSREQUEST']._serialized_end=783
+  _globals['_LISTUSERACTIVITYREQUEST']._serialized_start=785
+  _globals['_LISTUSERACTIVITYREQUEST']._serialized_end=860
+  _globals['_USERACTIVITY']._serialized_start=862
+  _globals['_USERACTIVITY']._serialized_end=989
+  _globals['_CREATEUSERREQUEST']._serialized_start=991
+  _globals['_CREATEUSERREQUEST']._serialized_end=1055
+  _globals['_GETUSERREQUEST']._serialized_start=1057
+  _globals['_GETUSERREQUEST']._serialized_end=1085
+  _globals['_USERRESPONSE']._serialized_start=1087
+  _globals['_USERRESPONSE']._serialized_end=1129
+  _globals['_CREATEPOSTREQUEST']._serialized_start=1132
+  _globals['_CREATEPOSTREQUEST']._serialized_end=1307
+  _globals['_GETPOSTREQUEST']._serialized_start=1309
+  _globals['_GETPOSTREQUEST']._serialized_end=1337
+  _globals['_GETPOSTRESPONSE']._serialized_start=1339
+  _globals['_GETPOSTRESPONSE']._serialized_end=1418
+  _globals['_POSTRESPONSE']._serialized_start=1420
+  _globals['_POSTRESPONSE']._serialized_end=1545
+  _globals['_CREATECOMMENTREQUEST']._serialized_start=1548
+  _globals['_CREATECOMMENTREQUEST']._serialized_end=1691
+  _globals['_CREATECOMMENTRESPONSE']._serialized_start=1693
+  _globals['_CREATECOMMENTRESPONSE']._serialized_end=1784
+  _globals['_GETCOMMENTREQUEST']._serialized_start=1786
+  _globals['_GETCOMMENTREQUEST']._serialized_end=1817
+  _globals['_COMMENTRESPONSE']._serialized_start=1819
+  _globals['_COMMENTRESPONSE']._serialized_end=1870
+  _globals['_LISTCOMMENTSREQUEST']._serialized_start=1872
+  _globals['_LISTCOMMENTSREQUEST']._serialized_end=1909
+  _globals['_VOTEPOSTREQUEST']._serialized_start=1911
+  _globals['_VOTEPOSTREQUEST']._serialized_end=1980
+  _globals['_VOTEPOSTRESPONSE']._serialized_start=1982
+  _globals['_VOTEPOSTRESPONSE']._serialized_end=2056
+  _globals['_VOTECOMMENTREQUEST']._serialized_start=2058
+  _globals['_VOTECOMMENTREQUEST']._serialized_end=2133
+  _globals['_VOTECOMMENTRESPONSE']._serialized_start=2135
+  _globals['_VOTECOMMENTRESPONSE']._serialized_end=2212
+  _globals['_VOTEBATCHREQUEST']._serialized_start=2214
+  _globals['_VOTEBATCHREQUEST']._serialized_end=2317
+  _globals['_VOTEBATCHRESPONSE']._serialized_start=2320
+  _globals['_VOTEBATCHRESPONSE']._serialized_end=2454
+  _globals['_BULKCREATERESPONSE']._serialized_start=2456
+  _globals['_BULKCREATERESPONSE']._serialized_end=2558
+  _globals['_GETTOPCOMMENTSREQUEST']._serialized_start=2560
+  _globals['_GETTOPCOMMENTSREQUEST']._serialized_end=2652
+  _globals['_COMMENTWITHREPLIES']._serialized_start=2654
+  _globals['_COMMENTWITHREPLIES']._serialized_end=2742
+  _globals['_GETTOPCOMMENTSRESPONSE']._serialized_start=2744
+  _globals['_GETTOPCOMMENTSRESPONSE']._serialized_end=2848
+  _globals['_GETHOTPOSTSREQUEST']._serialized_start=2850
+  _globals['_GETHOTPOSTSREQUEST']._serialized_end=2906
+  _globals['_GETHOTPOSTSRESPONSE']._serialized_start=2908
+  _globals['_GETHOTPOSTSRESPONSE']._serialized_end=2992
+  _globals['_GETTRENDINGREQUEST']._serialized_start=2994
+  _globals['_GETTRENDINGREQUEST']._serialized_end=3064
+  _globals['_TRENDINGITEM']._serialized_start=3066
+  _globals['_TRENDINGITEM']._serialized_end=3193
+  _globals['_GETTRENDINGRESPONSE']._serialized_start=3195
+  _globals['_GETTRENDINGRESPONSE']._serialized_end=3287
+  _globals['_SEARCHREQUEST']._serialized_start=3289
+  _globals['_SEARCHREQUEST']._serialized_end=3353
+  _globals['_SEARCHPOSTSRESPONSE']._serialized_start=3355
+  _globals['_SEARCHPOSTSRESPONSE']._serialized_end=3478
+  _globals['_SEARCHCOMMENTSRESPONSE']._serialized_start=3481
+  _globals['_SEARCHCOMMENTSRESPONSE']._serialized_end=3613
+  _globals['_EXPANDCOMMENTBRANCHREQUEST']._serialized_start=3615
+  _globals['_EXPANDCOMMENTBRANCHREQUEST']._serialized_end=3730
+  _globals['_COMMENTNODE']._serialized_start=3732
+  _globals['_COMMENTNODE']._serialized_end=3812
+  _globals['_EXPANDCOMMENTBRANCHRESPONSE']._serialized_start=3814
+  _globals['_EXPANDCOMMENTBRANCHRESPONSE']._serialized_end=3916
+  _globals['_COMMENTTREE']._serialized_start=3918
+  _globals['_COMMENTTREE']._serialized_end=4003
+  _globals['_GETTHREADSUMMARYREQUEST']._serialized_start=4005
+  _globals['_GETTHREADSUMMARYREQUEST']._serialized_end=4097
+  _globals['_GETTHREADSUMMARYRESPONSE']._serialized_start=4099
+  _globals['_GETTHREADSUMMARYRESPONSE']._serialized_end=4226
+  _globals['_MONITORREQUEST']._serialized_start=4228
+  _globals['_MONITORREQUEST']._serialized_end=4299
+  _globals['_SCOREUPDATE']._serialized_start=4301
+  _globals['_SCOREUPDATE']._serialized_end=4376
+  _globals['_GETSERVERSTATSREQUEST']._serialized_start=4378
+  _globals['_GETSERVERSTATSREQUEST']._serialized_end=4401
+  _globals['_METHODSTATS']._serialized_start=4404
+  _globals['_METHODSTATS']._serialized_end=4686
+  _globals['_METHODSTATS_STATUSCODESENTRY']._serialized_start=4636
+  _globals['_METHODSTATS_STATUSCODESENTRY']._serialized_end=4686
+  _globals['_RESPONSECACHESTATS']._serialized_start=4689
+  _globals['_RESPONSECACHESTATS']._serialized_end=4830
+  _globals['_SERVERSTATS']._serialized_start=4833
+  _globals['_SERVERSTATS']._serialized_end=4995
+  _globals['_REDDITSERVICE']._serialized_start=5226
+  _globals['_REDDITSERVICE']._serialized_end=7050
 # @@protoc_insertion_point(module_scope)
@@ -24,6 +24,11 @@ class RedditServiceStub(object):
                 request_serializer=reddit__pb2.GetUserRequest.SerializeToString,
                 response_deserializer=reddit__pb2.UserResponse.FromString,
                 )
+        self.ListUserActivity = channel.unary_stream(
+                '/reddit.RedditService/ListUserActivity',
+                request_serializer=reddit__pb2.ListUserActivityRequest.SerializeToString,
+                response_deserializer=reddit__pb2.UserActivity.FromString,
+                )
         self.CreatePost = channel.unary_unary(
                 '/reddit.RedditService/CreatePost',
                 request_serializer=reddit__pb2.CreatePostRequest.SerializeToString,
@@ -54,6 +59,16 @@ class RedditServiceStub(object):
                 request_serializer=reddit__pb2.ListCommentsRequest.SerializeToString,
                 response_deserializer=reddit__pb2.CommentResponse.FromString,
                 )
+        self.BulkCreatePosts = channel.stream_unary(
+                '/reddit.RedditService/BulkCreatePosts',
+                request_serializer=reddit__pb2.CreatePostRequest.SerializeToString,
+                response_deserializer=reddit__pb2.BulkCreateResponse.FromString,
+                )
+        self.BulkCreateComments = channel.stream_unary(
+                '/reddit.RedditService/BulkCreateComments',
+                request_serializer=reddit__pb2.CreateCommentRequest.SerializeToString,
+                response_deserializer=reddit__pb2.BulkCreateResponse.FromString,
+                )
         self.VotePost = channel.unary_unary(
                 '/reddit.RedditService/VotePost',
                 request_serializer=reddit__pb2.VotePostRequest.SerializeToString,
@@ -64,16 +79,66 @@ class RedditServiceStub(object):
                 request_serializer=reddit__pb2.VoteCommentRequest.SerializeToString,
                 response_deserializer=reddit__pb2.VoteCommentResponse.FromString,
                 )
+        self.VoteBatch = channel.stream_unary(
+                '/reddit.RedditService/VoteBatch',
+                request_serializer=reddit__pb2.VoteBatchRequest.SerializeToString,
+                response_deserializer=reddit__pb2.VoteBatchResponse.FromString,
+                )
         self.GetTopComments = channel.unary_unary(
                 '/reddit.RedditService/GetTopComments',
                 request_serializer=reddit__pb2.GetTopCommentsRequest.SerializeToString,
                 response_deserializer=reddit__pb2.GetTopCommentsResponse.FromString,
                 )
+        self.GetHotPosts = channel.unary_unary(
+                '/reddit.RedditService/GetHotPosts',
+                request_serializer=reddit__pb2.GetHotPostsRequest.SerializeToString,
+                response_deserializer=reddit__pb2.GetHotPostsResponse.FromString,
+                )
+        self.GetTrending = channel.unary_unary(
+                '/reddit.RedditService/GetTrending',
+                request_serializer=reddit__pb2.GetTrendingRequest.SerializeToString,
+                response_deserializer=reddit__pb2.GetTrendingResponse.FromString,
+                )
+        self.SearchPosts = channel.unary_unary(
+                '/reddit.RedditService/SearchPosts',
+                request_serializer=reddit__pb2.SearchRequest.SerializeToString,
+                response_deserializer=reddit__pb2.SearchPostsResponse.FromString,
+                )
+        self.SearchComments = channel.unary_unary(
+                '/reddit.RedditService/SearchComments',
+                request_serializer=reddit__pb2.SearchRequest.SerializeToString,
+                response_deserializer=reddit__pb2.SearchCommentsResponse.FromString,
+                )
+        self.StreamTopComments = channel.unary_stream(
+                '/reddit.RedditService/StreamTopComments',
+                request_serializer=reddit__pb2.GetTopCommentsRequest.SerializeToString,
+                response_deserializer=reddit__pb2.CommentWithReplies.FromString,
+                )
         self.ExpandCommentBranch = channel.unary_unary(
                 '/reddit.RedditService/ExpandCommentBranch',
                 request_serializer=reddit__pb2.ExpandCommentBranchRequest.SerializeToString,
                 response_deserializer=reddit__pb2.ExpandCommentBranchResponse.FromString,
                 )
+        self.StreamCommentBranch = channel.unary_stream(
+                '/reddit.RedditService/StreamCommentBranch',
+                request_serializer=reddit__pb2.ExpandCommentBranchRequest.SerializeToString,
+                response_deserializer=reddit__pb2.CommentNode.FromString,
+                )
+        self.GetThreadSummary = channel.unary_unary(
+                '/reddit.RedditService/GetThreadSummary',
+                request_serializer=reddit__pb2.GetThreadSummaryRequest.SerializeToString,
+                response_deserializer=reddit__pb2.GetThreadSummaryResponse.FromString,
+                )
+        self.MonitorUpdates = channel.stream_stream(
+                '/reddit.RedditService/MonitorUpdates',
+                request_serializer=reddit__pb2.MonitorRequest.SerializeToString,
+                response_deserializer=reddit__pb2.ScoreUpdate.FromString,
+                )
+        self.GetServerStats = channel.unary_unary(
+                '/reddit.RedditService/GetServerStats',
+                request_serializer=reddit__pb2.GetServerStatsRequest.SerializeToString,
+                response_deserializer=reddit__pb2.ServerStats.FromString,
+                )
 
 
 class RedditServiceServicer(object):
@@ -92,6 +157,13 @@ class RedditServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ListUserActivity(self, request, context):
+        """A user's posts and comments, newest first
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def CreatePost(self, request, context):
         """Post related RPCs
         """
@@ -130,6 +202,19 @@ class RedditServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def BulkCreatePosts(self, request_iterator, context):
+        """Bulk ingest: stream many creates, get the assigned ids back in request order
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BulkCreateComments(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def VotePost(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -142,18 +227,85 @@ class RedditServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def VoteBatch(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetTopComments(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetHotPosts(self, request, context):
+        """Front page: the posts of a subreddit (or of all of them) ranked by hot score
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetTrending(self, request, context):
+        """Posts or comments receiving the most votes over the last minutes
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SearchPosts(self, request, context):
+        """Full-text search over post titles and contents, or comment contents
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SearchComments(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamTopComments(self, request, context):
+        """GetTopComments sent as one CommentWithReplies per message
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def ExpandCommentBranch(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamCommentBranch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetThreadSummary(self, request, context):
+        """Post, its top comments and their top replies in one round trip
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def MonitorUpdates(self, request_iterator, context):
+        """Monitor Updates
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetServerStats(self, request, context):
+        """Per-RPC latency, throughput and status counters of the server
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_RedditServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -167,6 +319,11 @@ def add_RedditServiceServicer_to_server(servicer, server):
                     request_deserializer=reddit__pb2.GetUserRequest.FromString,
                     response_serializer=reddit__pb2.UserResponse.SerializeToString,
             ),
+            'ListUserActivity': grpc.unary_stream_rpc_method_handler(
+                    servicer.ListUserActivity,
+                    request_deserializer=reddit__pb2.ListUserActivityRequest.FromString,
+                    response_serializer=reddit__pb2.UserActivity.SerializeToString,
+            ),
             'CreatePost': grpc.unary_unary_rpc_method_handler(
                     servicer.CreatePost,
                     request_deserializer=reddit__pb2.CreatePostRequest.FromString,
@@ -197,6 +354,16 @@ def add_RedditServiceServicer_to_server(servicer, server):
                     request_deserializer=reddit__pb2.ListCommentsRequest.FromString,
                     response_serializer=reddit__pb2.CommentResponse.SerializeToString,
             ),
+            'BulkCreatePosts': grpc.stream_unary_rpc_method_handler(
+                    servicer.BulkCreatePosts,
+                    request_deserializer=reddit__pb2.CreatePostRequest.FromString,
+                    response_serializer=reddit__pb2.BulkCreateResponse.SerializeToString,
+            ),
+            'BulkCreateComments': grpc.stream_unary_rpc_method_handler(
+                    servicer.BulkCreateComments,
+                    request_deserializer=reddit__pb2.CreateCommentRequest.FromString,
+                    response_serializer=reddit__pb2.BulkCreateResponse.SerializeToString,
+            ),
             'VotePost': grpc.unary_unary_rpc_method_handler(
                     servicer.VotePost,
                     request_deserializer=reddit__pb2.VotePostRequest.FromString,
@@ -207,16 +374,66 @@ def add_RedditServiceServicer_to_server(servicer, server):
                     request_deserializer=reddit__pb2.VoteCommentRequest.FromString,
                     response_serializer=reddit__pb2.VoteCommentResponse.SerializeToString,
             ),
+            'VoteBatch': grpc.stream_unary_rpc_method_handler(
+                    servicer.VoteBatch,
+                    request_deserializer=reddit__pb2.VoteBatchRequest.FromString,
+                    response_serializer=reddit__pb2.VoteBatchResponse.SerializeToString,
+            ),
             'GetTopComments': grpc.unary_unary_rpc_method_handler(
                     servicer.GetTopComments,
                     request_deserializer=reddit__pb2.GetTopCommentsRequest.FromString,
                     response_serializer=reddit__pb2.GetTopCommentsResponse.SerializeToString,
             ),
+            'GetHotPosts': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetHotPosts,
+                    request_deserializer=reddit__pb2.GetHotPostsRequest.FromString,
+                    response_serializer=reddit__pb2.GetHotPostsResponse.SerializeToString,
+            ),
+            'GetTrending': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetTrending,
+                    request_deserializer=reddit__pb2.GetTrendingRequest.FromString,
+                    response_serializer=reddit__pb2.GetTrendingResponse.SerializeToString,
+            ),
+            'SearchPosts': grpc.unary_unary_rpc_method_handler(
+                    servicer.SearchPosts,
+                    request_deserializer=reddit__pb2.SearchRequest.FromString,
+                    response_serializer=reddit__pb2.SearchPostsResponse.SerializeToString,
+            ),
+            'SearchComments': grpc.unary_unary_rpc_method_handler(
+                    servicer.SearchComments,
+                    request_deserializer=reddit__pb2.SearchRequest.FromString,
+                    response_serializer=reddit__pb2.SearchCommentsResponse.SerializeToString,
+            ),
+            'StreamTopComments': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamTopComments,
+                    request_deserializer=reddit__pb2.GetTopCommentsRequest.FromString,
+                    response_serializer=reddit__pb2.CommentWithReplies.SerializeToString,
+            ),
             'ExpandCommentBranch': grpc.unary_unary_rpc_method_handler(
                     servicer.ExpandCommentBranch,
                     request_deserializer=reddit__pb2.ExpandCommentBranchRequest.FromString,
                     response_serializer=reddit__pb2.ExpandCommentBranchResponse.SerializeToString,
             ),
+            'StreamCommentBranch': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamCommentBranch,
+                    request_deserializer=reddit__pb2.ExpandCommentBranchRequest.FromString,
+                    response_serializer=reddit__pb2.CommentNode.SerializeToString,
+            ),
+            'GetThreadSummary': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetThreadSummary,
+                    request_deserializer=reddit__pb2.GetThreadSummaryRequest.FromString,
+                    response_serializer=reddit__pb2.GetThreadSummaryResponse.SerializeToString,
+            ),
+            'MonitorUpdates': grpc.stream_stream_rpc_method_handler(
+                    servicer.MonitorUpdates,
+                    request_deserializer=reddit__pb2.MonitorRequest.FromString,
+                    response_serializer=reddit__pb2.ScoreUpdate.SerializeToString,
+            ),
+            'GetServerStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetServerStats,
+                    request_deserializer=reddit__pb2.GetServerStatsRequest.FromString,
+                    response_serializer=reddit__pb2.ServerStats.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'reddit.RedditService', rpc_method_handlers)
@@ -261,6 +478,23 @@ class RedditService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def ListUserActivity(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/reddit.RedditService/ListUserActivity',
+            reddit__pb2.ListUserActivityRequest.SerializeToString,
+            reddit__pb2.UserActivity.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def CreatePost(request,
             target,
@@ -363,6 +597,40 @@ class RedditService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def BulkCreatePosts(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/reddit.RedditService/BulkCreatePosts',
+            reddit__pb2.CreatePostRequest.SerializeToString,
+            reddit__pb2.BulkCreateResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def BulkCreateComments(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/reddit.RedditService/BulkCreateComments',
+            reddit__pb2.CreateCommentRequest.SerializeToString,
+            reddit__pb2.BulkCreateResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def VotePost(request,
             target,
@@ -397,6 +665,23 @@ class RedditService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def VoteBatch(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/reddit.RedditService/VoteBatch',
+            reddit__pb2.VoteBatchRequest.SerializeToString,
+            reddit__pb2.VoteBatchResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def GetTopComments(request,
             target,
@@ -414,6 +699,91 @@ class RedditService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def GetHotPosts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/reddit.RedditService/GetHotPosts',
+            reddit__pb2.GetHotPostsRequest.SerializeToString,
+            reddit__pb2.GetHotPostsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetTrending(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/reddit.RedditService/GetTrending',
+            reddit__pb2.GetTrendingRequest.SerializeToString,
+            reddit__pb2.GetTrendingResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SearchPosts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/reddit.RedditService/SearchPosts',
+            reddit__pb2.SearchRequest.SerializeToString,
+            reddit__pb2.SearchPostsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SearchComments(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/reddit.RedditService/SearchComments',
+            reddit__pb2.SearchRequest.SerializeToString,
+            reddit__pb2.SearchCommentsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamTopComments(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/reddit.RedditService/StreamTopComments',
+            reddit__pb2.GetTopCommentsRequest.SerializeToString,
+            reddit__pb2.CommentWithReplies.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def ExpandCommentBranch(request,
             target,
@@ -430,3 +800,71 @@ class RedditService(object):
             reddit__pb2.ExpandCommentBranchResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamCommentBranch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/reddit.RedditService/StreamCommentBranch',
+            reddit__pb2.ExpandCommentBranchRequest.SerializeToString,
+            reddit__pb2.CommentNode.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetThreadSummary(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/reddit.RedditService/GetThreadSummary',
+            reddit__pb2.GetThreadSummaryRequest.SerializeToString,
+            reddit__pb2.GetThreadSummaryResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def MonitorUpdates(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/reddit.RedditService/MonitorUpdates',
+            reddit__pb2.MonitorRequest.SerializeToString,
+            reddit__pb2.ScoreUpdate.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetServerStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/reddit.RedditService/GetServerStats',
+            reddit__pb2.GetServerStatsRequest.SerializeToString,
+            reddit__pb2.ServerStats.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -0,0 +1,194 @@
+import collections
+import threading
+import time
+import grpc
+
+# Priority classes. Under load the most expensive RPCs are turned away first,
+# so cheap point reads keep being served.
+CHEAP = 0
+NORMAL = 1
+EXPENSIVE = 2
+
+PRIORITIES = {
+    'GetPost': CHEAP, 'GetComment': CHEAP, 'GetUser': CHEAP, 'GetServerStats': CHEAP,
+    'VotePost': NORMAL, 'VoteComment': NORMAL, 'CreateUser': NORMAL, 'CreatePost': NORMAL, 'CreateComment': NORMAL,
+    'GetHotPosts': NORMAL, 'GetTrending': NORMAL,
+    'GetTopComments': EXPENSIVE, 'StreamTopComments': EXPENSIVE, 'GetThreadSummary': EXPENSIVE,
+    'ExpandCommentBranch': EXPENSIVE, 'StreamCommentBranch': EXPENSIVE,
+    'ListPosts': EXPENSIVE, 'ListComments': EXPENSIVE, 'ListUserActivity': EXPENSIVE,
+    'SearchPosts': EXPENSIVE, 'SearchComments': EXPENSIVE,
+    'VoteBatch': EXPENSIVE, 'BulkCreatePosts': EXPENSIVE, 'BulkCreateComments': EXPENSIVE,
+}
+
+# Streams held open for as long as the client likes; limiting how many run
+# at once would lock out every later subscriber. They are never shed, but
+# each holds a worker, so they count against every class's share.
+EXEMPT = frozenset({'MonitorUpdates'})
+
+# Share of the workers that may already be busy when an RPC of the class starts
+DEFAULT_SHARES = {CHEAP: 1.0, NORMAL: 0.9, EXPENSIVE: 0.6}
+# Longest an RPC of the class may wait for a worker before it is not worth running
+DEFAULT_QUEUE_BUDGETS = {CHEAP: None, NORMAL: 1.0, EXPENSIVE: 0.25}
+# Tokens an RPC of the class takes from its client's bucket
+COSTS = {CHEAP: 1, NORMAL: 1, EXPENSIVE: 5}
+
+CLIENT_ID_KEY = 'x-client-id'
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`."""
+
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, burst, now):
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, cost, rate, burst, now):
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+
+class RateLimiter:
+    """Token bucket per client, for the `max_clients` most recently seen clients.
+
+    A bucket left alone long enough is full again, the same as a new one,
+    so forgetting the least recently seen clients loses nothing that matters.
+    """
+
+    def __init__(self, rate, burst=None, max_clients=10000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst or rate
+        self.max_clients = max_clients
+        self.clock = clock
+        self._buckets = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, client, cost=1):
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.burst, now)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+            return bucket.take(cost, self.rate, self.burst, now)
+
+
+def client_key(context):
+    """The caller's x-client-id metadata, or else its address without the port."""
+    for key, value in context.invocation_metadata() or ():
+        if key == CLIENT_ID_KEY:
+            return value
+    return context.peer().rsplit(':', 1)[0]
+
+
+class AdmissionInterceptor(grpc.ServerInterceptor):
+    """Load shedding and per-client rate limiting for the thread-pool server.
+
+    Every RPC is checked as a worker picks it up, before any work is done:
+    - with shedding on, RPCs of a class whose queueing budget ran out are
+      shed, since under overload their callers have likely given up
+      already;
+    - with shedding on, RPCs of a class whose share of the workers is used
+      up are shed, so expensive reads can never occupy the workers cheap
+      reads need. Open EXEMPT streams count as busy workers;
+    - with a rate set, every client has a token bucket, and expensive
+      RPCs take more tokens.
+    All three fail fast with RESOURCE_EXHAUSTED. The hard limit on queued
+    and running RPCs is the server's maximum_concurrent_rpcs.
+    """
+
+    def __init__(self, workers, rate=0, burst=None, shedding=True, shares=DEFAULT_SHARES,
+                 queue_budgets=DEFAULT_QUEUE_BUDGETS, clock=time.monotonic):
+        self.limits = {priority: max(1, int(workers * share)) for priority, share in shares.items()}
+        self.queue_budgets = queue_budgets
+        self.limiter = RateLimiter(rate, burst, clock=clock) if rate else None
+        self.shedding = shedding
+        self.clock = clock
+        self.running = 0     # admitted RPCs in progress
+        self.streaming = 0   # open EXEMPT streams
+        self.shed = collections.Counter()   # reason -> RPCs turned away
+        self._lock = threading.Lock()
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return handler
+        name = handler_call_details.method.rsplit('/', 1)[-1]
+        if name in EXEMPT:
+            enter, leave = self._hold, self._release
+        else:
+            priority = PRIORITIES.get(name, NORMAL)
+            # Interceptors run on the thread accepting the call, so this is
+            # when the RPC arrived rather than when a worker got to it
+            received = self.clock()
+            enter, leave = lambda context: self._admit(priority, received, context), self._finish
+        if handler.unary_unary:
+            wrap, behavior = grpc.unary_unary_rpc_method_handler, self._unary(handler.unary_unary, enter, leave)
+        elif handler.unary_stream:
+            wrap, behavior = grpc.unary_stream_rpc_method_handler, self._unary_stream(handler.unary_stream, enter, leave)
+        elif handler.stream_unary:
+            wrap, behavior = grpc.stream_unary_rpc_method_handler, self._unary(handler.stream_unary, enter, leave)
+        else:
+            wrap, behavior = grpc.stream_stream_rpc_method_handler, self._unary_stream(handler.stream_stream, enter, leave)
+        return wrap(behavior, request_deserializer=handler.request_deserializer,
+                    response_serializer=handler.response_serializer)
+
+    def _refusal(self, priority, received, context):
+        """Why the RPC must be shed, or None after counting it as running."""
+        budget = self.queue_budgets.get(priority)
+        if self.shedding and budget is not None and self.clock() - received > budget:
+            return "queued"
+        if self.limiter and not self.limiter.allow(client_key(context), COSTS[priority]):
+            return "rate limited"
+        with self._lock:
+            if self.shedding and self.running + self.streaming >= self.limits[priority]:
+                return "overloaded"
+            self.running += 1
+        return None
+
+    def _finish(self):
+        with self._lock:
+            self.running -= 1
+
+    def _hold(self, context):
+        with self._lock:
+            self.streaming += 1
+
+    def _release(self):
+        with self._lock:
+            self.streaming -= 1
+
+    def _admit(self, priority, received, context):
+        reason = self._refusal(priority, received, context)
+        if reason:
+            with self._lock:
+                self.shed[reason] += 1
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"Request shed: {reason}")
+
+    @staticmethod
+    def _unary(behavior, enter, leave):
+        def unary(request, context):
+            enter(context)
+            try:
+                return behavior(request, context)
+            finally:
+                leave()
+        return unary
+
+    @staticmethod
+    def _unary_stream(behavior, enter, leave):
+        def unary_stream(request, context):
+            enter(context)
+            try:
+                yield from behavior(request, context)
+            finally:
+                leave()
+        return unary_stream
@@ -0,0 +1,224 @@
+import asyncio
+import grpc
+import reddit_pb2
+import reddit_pb2_grpc
+from updates import AsyncSubscriber
+from response_cache import CachedReadHandler
+from metrics import AsyncMetricsInterceptor
+
+
+class _Abort(Exception):
+    def __init__(self, code, details):
+        super().__init__(details)
+        self.code = code
+        self.details = details
+
+
+class _SyncContext:
+    """Lets the synchronous handlers abort inside the asyncio server.
+
+    grpc.aio's context.abort is a coroutine, so calling it from shared sync
+    code would do nothing. This stand-in raises instead and the async
+    wrapper turns that into a real abort.
+    """
+
+    def __init__(self, context):
+        self._context = context
+
+    def abort(self, code, details):
+        raise _Abort(code, details)
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+class AsyncRedditService(reddit_pb2_grpc.RedditServiceServicer):
+    """asyncio front end over a RedditService.
+
+    All state and business logic stays in the wrapped synchronous service;
+    its handlers never block, so unary calls run inline on the event loop.
+    Streams are driven by coroutines, which means a long-lived ListComments
+    or MonitorUpdates costs a task rather than an OS thread. The exception is
+    mutations on a service with a write-ahead log: they wait for their
+    record to reach disk, so they are moved off the loop onto a thread.
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    async def _unary(self, handler, request, context):
+        try:
+            return handler(request, _SyncContext(context))
+        except _Abort as e:
+            await context.abort(e.code, e.details)
+
+    async def _mutation(self, handler, request, context):
+        if not self.service.wal:
+            return await self._unary(handler, request, context)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, handler, request, _SyncContext(context))
+        except _Abort as e:
+            await context.abort(e.code, e.details)
+
+    async def _stream(self, handler, request, context):
+        try:
+            for response in handler(request, _SyncContext(context)):
+                yield response
+        except _Abort as e:
+            await context.abort(e.code, e.details)
+
+    async def _blocking(self, function, *args):
+        if not self.service.wal:
+            return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    async def CreateUser(self, request, context):
+        return await self._mutation(self.service.CreateUser, request, context)
+
+    async def GetUser(self, request, context):
+        return await self._unary(self.service.GetUser, request, context)
+
+    async def ListUserActivity(self, request, context):
+        async for response in self._stream(self.service.ListUserActivity, request, context):
+            yield response
+
+    async def CreatePost(self, request, context):
+        return await self._mutation(self.service.CreatePost, request, context)
+
+    async def GetPost(self, request, context):
+        return await self._unary(self.service.GetPost, request, context)
+
+    async def ListPosts(self, request, context):
+        async for response in self._stream(self.service.ListPosts, request, context):
+            yield response
+
+    async def CreateComment(self, request, context):
+        return await self._mutation(self.service.CreateComment, request, context)
+
+    async def GetComment(self, request, context):
+        return await self._unary(self.service.GetComment, request, context)
+
+    async def ListComments(self, request, context):
+        async for response in self._stream(self.service.ListComments, request, context):
+            yield response
+
+    async def _bulk(self, create, request_iterator):
+        # Batches are collected on the loop; storing one only blocks when it must reach the log
+        ids = []
+        batch = []
+        async for request in request_iterator:
+            batch.append(request)
+            if len(batch) == self.service.BULK_BATCH_SIZE:
+                ids.extend(await self._blocking(create, batch))
+                batch = []
+        if batch:
+            ids.extend(await self._blocking(create, batch))
+        return self.service.bulk_response(ids)
+
+    async def BulkCreatePosts(self, request_iterator, context):
+        return await self._bulk(self.service.create_posts, request_iterator)
+
+    async def BulkCreateComments(self, request_iterator, context):
+        return await self._bulk(self.service.create_comments, request_iterator)
+
+    async def VotePost(self, request, context):
+        return await self._mutation(self.service.VotePost, request, context)
+
+    async def VoteComment(self, request, context):
+        return await self._mutation(self.service.VoteComment, request, context)
+
+    async def VoteBatch(self, request_iterator, context):
+        deltas = {}
+        async for request in request_iterator:
+            self.service.aggregate_votes((request,), deltas)
+        return await self._blocking(self.service.apply_vote_batch, deltas)
+
+    async def GetTopComments(self, request, context):
+        return await self._unary(self.service.GetTopComments, request, context)
+
+    async def GetHotPosts(self, request, context):
+        return await self._unary(self.service.GetHotPosts, request, context)
+
+    async def GetTrending(self, request, context):
+        return await self._unary(self.service.GetTrending, request, context)
+
+    async def SearchPosts(self, request, context):
+        return await self._unary(self.service.SearchPosts, request, context)
+
+    async def SearchComments(self, request, context):
+        return await self._unary(self.service.SearchComments, request, context)
+
+    async def StreamTopComments(self, request, context):
+        async for response in self._stream(self.service.StreamTopComments, request, context):
+            yield response
+
+    async def ExpandCommentBranch(self, request, context):
+        return await self._unary(self.service.ExpandCommentBranch, request, context)
+
+    async def StreamCommentBranch(self, request, context):
+        async for response in self._stream(self.service.StreamCommentBranch, request, context):
+            yield response
+
+    async def GetThreadSummary(self, request, context):
+        return await self._unary(self.service.GetThreadSummary, request, context)
+
+    async def GetServerStats(self, request, context):
+        return await self._unary(self.service.GetServerStats, request, context)
+
+    async def _read_monitor_requests(self, subscriber, request_iterator):
+        try:
+            async for request in request_iterator:
+                error = self.service.watch(subscriber, request)
+                if error:
+                    subscriber.fail(*error)
+                    return
+        finally:
+            subscriber.close()
+
+    async def MonitorUpdates(self, request_iterator, context):
+        subscriber = AsyncSubscriber(asyncio.get_running_loop(), self.service.max_update_rate)
+        reader = asyncio.create_task(self._read_monitor_requests(subscriber, request_iterator))
+        try:
+            while True:
+                await subscriber.wait()
+                delay = subscriber.next_send_delay()
+                if delay:
+                    await asyncio.sleep(delay)
+                error, closed = subscriber.error, subscriber.closed
+                for (kind, item_id), score in subscriber.drain():
+                    yield reddit_pb2.ScoreUpdate(score=score, **{kind: item_id})
+                subscriber.mark_sent()
+                if error:
+                    await context.abort(*error)
+                if closed:
+                    return
+        finally:
+            reader.cancel()
+            self.service.updates.unsubscribe(subscriber)
+
+
+def build_async_server(service, port=50051, options=()):
+    """Create (but do not start) a grpc.aio server; must run inside an event loop."""
+    server = grpc.aio.server(interceptors=(AsyncMetricsInterceptor(service.metrics),), options=options)
+    if service.response_cache:
+        server.add_generic_rpc_handlers((CachedReadHandler(service, asynchronous=True),))
+    reddit_pb2_grpc.add_RedditServiceServicer_to_server(AsyncRedditService(service), server)
+    bound_port = server.add_insecure_port(f'[::]:{port}')
+    return server, bound_port
+
+
+def serve_async(service, port=50051, options=()):
+    async def run():
+        server, bound_port = build_async_server(service, port, options)
+        await server.start()
+        print(f"Async server started on port {bound_port}")
+        try:
+            await server.wait_for_termination()
+        finally:
+            await server.stop(0)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
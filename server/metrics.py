@@ -0,0 +1,313 @@
+import bisect
+import os
+import threading
+import time
+import grpc
+import reddit_pb2
+
+# Upper bounds of the latency histogram buckets in seconds: 50us doubling up
+# to ~52s, plus an overflow bucket. Fixed buckets keep recording to one
+# bisect and one increment.
+BUCKETS = tuple(50e-6 * 2 ** i for i in range(21))
+
+
+class MethodStats:
+    """Latency histogram and counters of one RPC method."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.in_flight = 0
+        self.received = 0
+        self.sent = 0
+        self.statuses = {}
+        self._lock = threading.Lock()
+
+    def begin(self):
+        with self._lock:
+            self.in_flight += 1
+        return time.perf_counter()
+
+    def end(self, start, code):
+        elapsed = time.perf_counter() - start
+        bucket = bisect.bisect_left(BUCKETS, elapsed)
+        with self._lock:
+            self.in_flight -= 1
+            self.calls += 1
+            self.total_seconds += elapsed
+            self.counts[bucket] += 1
+            self.statuses[code] = self.statuses.get(code, 0) + 1
+
+    def message_received(self):
+        with self._lock:
+            self.received += 1
+
+    def message_sent(self):
+        with self._lock:
+            self.sent += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'in_flight': self.in_flight,
+                'total_seconds': self.total_seconds,
+                'counts': list(self.counts),
+                'received': self.received,
+                'sent': self.sent,
+                'statuses': dict(self.statuses),
+            }
+
+
+def percentile(counts, p):
+    """Latency in seconds at percentile p, interpolated within its bucket."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = total * p / 100
+    seen = 0
+    for bucket, count in enumerate(counts):
+        if count and seen + count >= rank:
+            lower = BUCKETS[bucket - 1] if bucket else 0.0
+            upper = BUCKETS[bucket] if bucket < len(BUCKETS) else BUCKETS[-1]
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return BUCKETS[-1]
+
+
+class ServerMetrics:
+    """Per-method stats for one server, keyed by the method's short name."""
+
+    def __init__(self):
+        self.started = time.time()
+        self._methods = {}
+        self._lock = threading.Lock()
+        self._dumper = None
+
+    def method(self, full_method):
+        name = full_method.rsplit('/', 1)[-1]
+        stats = self._methods.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._methods.setdefault(name, MethodStats())
+        return stats
+
+    def snapshot(self):
+        with self._lock:
+            methods = dict(self._methods)
+        return {name: stats.snapshot() for name, stats in sorted(methods.items())}
+
+    def prometheus_text(self):
+        """All stats in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP reddit_rpc_latency_seconds Time from receiving an RPC to its final status.',
+            '# TYPE reddit_rpc_latency_seconds histogram',
+        ]
+        for name, stats in snapshot.items():
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), stats['counts']):
+                cumulative += count
+                lines.append(f'reddit_rpc_latency_seconds_bucket{{method="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'reddit_rpc_latency_seconds_sum{{method="{name}"}} {stats["total_seconds"]}')
+            lines.append(f'reddit_rpc_latency_seconds_count{{method="{name}"}} {stats["calls"]}')
+        lines += ['# HELP reddit_rpc_in_flight RPCs currently being handled.', '# TYPE reddit_rpc_in_flight gauge']
+        lines += [f'reddit_rpc_in_flight{{method="{name}"}} {stats["in_flight"]}' for name, stats in snapshot.items()]
+        lines += ['# HELP reddit_rpc_status_total Finished RPCs by status code.', '# TYPE reddit_rpc_status_total counter']
+        lines += [f'reddit_rpc_status_total{{method="{name}",code="{code}"}} {count}'
+                  for name, stats in snapshot.items() for code, count in sorted(stats['statuses'].items())]
+        for direction in ('received', 'sent'):
+            lines += [f'# HELP reddit_rpc_messages_{direction}_total Stream messages {direction}.',
+                      f'# TYPE reddit_rpc_messages_{direction}_total counter']
+            lines += [f'reddit_rpc_messages_{direction}_total{{method="{name}"}} {stats[direction]}'
+                      for name, stats in snapshot.items()]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        # Write then rename, so a scraper never reads a half-written file
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(temporary, path)
+
+    def dump_periodically(self, path, interval=10.0):
+        """Rewrite the Prometheus file every `interval` seconds from a daemon thread."""
+        def run():
+            while True:
+                self.write_prometheus(path)
+                time.sleep(interval)
+        self._dumper = threading.Thread(target=run, daemon=True)
+        self._dumper.start()
+
+
+def _status(context, error):
+    code = context.code()
+    if code is None:
+        if error is None:
+            code = grpc.StatusCode.OK
+        elif isinstance(error, (GeneratorExit, grpc.RpcError)):
+            code = grpc.StatusCode.CANCELLED
+        else:
+            code = grpc.StatusCode.UNKNOWN
+    return code.name if isinstance(code, grpc.StatusCode) else str(code)
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """Records latency, in-flight count, stream messages and status of every RPC."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        stats = self.metrics.method(handler_call_details.method)
+        if handler.unary_unary:
+            wrap, behavior = grpc.unary_unary_rpc_method_handler, self._unary(handler.unary_unary, stats)
+        elif handler.unary_stream:
+            wrap, behavior = grpc.unary_stream_rpc_method_handler, self._unary_stream(handler.unary_stream, stats)
+        elif handler.stream_unary:
+            wrap, behavior = grpc.stream_unary_rpc_method_handler, self._stream_unary(handler.stream_unary, stats)
+        else:
+            wrap, behavior = grpc.stream_stream_rpc_method_handler, self._stream_stream(handler.stream_stream, stats)
+        return wrap(behavior, request_deserializer=handler.request_deserializer,
+                    response_serializer=handler.response_serializer)
+
+    @staticmethod
+    def _counted(request_iterator, stats):
+        for request in request_iterator:
+            stats.message_received()
+            yield request
+
+    @staticmethod
+    def _unary(behavior, stats):
+        def unary(request, context):
+            start, error = stats.begin(), None
+            try:
+                return behavior(request, context)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                stats.end(start, _status(context, error))
+        return unary
+
+    @staticmethod
+    def _unary_stream(behavior, stats):
+        def unary_stream(request, context):
+            start, error = stats.begin(), None
+            try:
+                for response in behavior(request, context):
+                    stats.message_sent()
+                    yield response
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                stats.end(start, _status(context, error))
+        return unary_stream
+
+    @classmethod
+    def _stream_unary(cls, behavior, stats):
+        unary = cls._unary(behavior, stats)
+        return lambda request_iterator, context: unary(cls._counted(request_iterator, stats), context)
+
+    @classmethod
+    def _stream_stream(cls, behavior, stats):
+        unary_stream = cls._unary_stream(behavior, stats)
+        return lambda request_iterator, context: unary_stream(cls._counted(request_iterator, stats), context)
+
+
+class AsyncMetricsInterceptor(grpc.aio.ServerInterceptor):
+    """MetricsInterceptor for grpc.aio servers, whose handlers are coroutines."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        stats = self.metrics.method(handler_call_details.method)
+        if handler.unary_unary:
+            wrap, behavior = grpc.unary_unary_rpc_method_handler, self._unary(handler.unary_unary, stats)
+        elif handler.unary_stream:
+            wrap, behavior = grpc.unary_stream_rpc_method_handler, self._unary_stream(handler.unary_stream, stats)
+        elif handler.stream_unary:
+            wrap, behavior = grpc.stream_unary_rpc_method_handler, self._stream_unary(handler.stream_unary, stats)
+        else:
+            wrap, behavior = grpc.stream_stream_rpc_method_handler, self._stream_stream(handler.stream_stream, stats)
+        return wrap(behavior, request_deserializer=handler.request_deserializer,
+                    response_serializer=handler.response_serializer)
+
+    @staticmethod
+    async def _counted(request_iterator, stats):
+        async for request in request_iterator:
+            stats.message_received()
+            yield request
+
+    @staticmethod
+    def _unary(behavior, stats):
+        async def unary(request, context):
+            start, error = stats.begin(), None
+            try:
+                return await behavior(request, context)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                stats.end(start, _status(context, error))
+        return unary
+
+    @staticmethod
+    def _unary_stream(behavior, stats):
+        async def unary_stream(request, context):
+            start, error = stats.begin(), None
+            try:
+                async for response in behavior(request, context):
+                    stats.message_sent()
+                    yield response
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                stats.end(start, _status(context, error))
+        return unary_stream
+
+    @classmethod
+    def _stream_unary(cls, behavior, stats):
+        unary = cls._unary(behavior, stats)
+
+        async def stream_unary(request_iterator, context):
+            return await unary(cls._counted(request_iterator, stats), context)
+        return stream_unary
+
+    @classmethod
+    def _stream_stream(cls, behavior, stats):
+        unary_stream = cls._unary_stream(behavior, stats)
+
+        async def stream_stream(request_iterator, context):
+            async for response in unary_stream(cls._counted(request_iterator, stats), context):
+                yield response
+        return stream_stream
+
+
+def server_stats(metrics, response_cache=None):
+    """ServerStats message for a GetServerStats response."""
+    stats = reddit_pb2.ServerStats(uptimeSeconds=time.time() - metrics.started)
+    for name, method in metrics.snapshot().items():
+        counts = method['counts']
+        stats.methods.add(
+            method=name, calls=method['calls'], inFlight=method['in_flight'],
+            messagesReceived=method['received'], messagesSent=method['sent'], statusCodes=method['statuses'],
+            meanMs=method['total_seconds'] / method['calls'] * 1000 if method['calls'] else 0.0,
+            p50Ms=percentile(counts, 50) * 1000, p95Ms=percentile(counts, 95) * 1000, p99Ms=percentile(counts, 99) * 1000,
+        )
+    if response_cache:
+        cache = response_cache.stats()
+        stats.responseCache.CopyFrom(reddit_pb2.ResponseCacheStats(
+            entries=cache['entries'], bytes=cache['bytes'], hits=cache['hits'], misses=cache['misses'],
+            hitRate=cache['hit_rate'], evictions=cache['evictions'], invalidations=cache['invalidations']))
+    return stats
@@ -0,0 +1,21 @@
+import base64
+import struct
+
+# ListUserActivity page size when none is requested, and the largest one served
+ACTIVITY_DEFAULT_PAGE = 25
+ACTIVITY_PAGE_LIMIT = 100
+
+
+def encode_cursor(*positions):
+    """Pack non-negative integer positions into an opaque, URL-safe cursor."""
+    packed = struct.pack(f'<{len(positions)}I', *positions)
+    return base64.urlsafe_b64encode(packed).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor, count=1):
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+    try:
+        packed = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        return struct.unpack(f'<{count}I', packed)
+    except (TypeError, ValueError, struct.error) as e:
+        raise ValueError(f"Invalid cursor {cursor!r}") from e
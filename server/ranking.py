@@ -0,0 +1,147 @@
+import bisect
+import itertools
+import math
+import threading
+
+# Reddit's hot ranking: the log of the score plus the post's age in units of
+# 12.5 hours, so a post needs ten times the votes to outrank one published
+# 12.5 hours later. The time term depends only on the publication time, never
+# on the current time, so a hot index only changes when votes arrive.
+HOT_EPOCH_SECONDS = 1134028003
+HOT_DECAY_SECONDS = 45000
+
+# GetHotPosts page size when none is requested, and the largest one served
+HOT_POSTS_DEFAULT = 25
+HOT_POSTS_LIMIT = 100
+
+
+def hot_score(score, published_minutes):
+    """Hot score of a post from its score and publication time (minutes since 1970)."""
+    order = math.log10(max(abs(score), 1))
+    sign = (score > 0) - (score < 0)
+    return round(sign * order + (published_minutes * 60 - HOT_EPOCH_SECONDS) / HOT_DECAY_SECONDS, 7)
+
+
+class ScoreIndex:
+    """Keeps the children of one post or comment ordered by score.
+
+    Entries are (-score, seq, id) tuples, so the highest scored items come
+    first and ties keep their insertion order (the same order a stable sort
+    over the creation order would give). They are held in a list of sorted
+    chunks of at most 2 * CHUNK_SIZE entries, next to the last key of each
+    chunk. An add or score change is a binary search over those keys and
+    an insert or delete within one chunk, so its cost does not grow with
+    the number of items, which matters for the all-posts front page. A
+    top-N query walks the first chunks.
+    """
+
+    CHUNK_SIZE = 512
+
+    _seq = itertools.count()
+
+    def __init__(self):
+        self._chunks = []
+        self._maxes = []   # last key of every chunk
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, item_id, score=0):
+        key = (-score, next(self._seq), item_id)
+        with self._lock:
+            self._keys[item_id] = key
+            self._insert(key)
+
+    def extend(self, item_ids, score=0):
+        """Add many items with the same score, merging each chunk with the new items falling into it."""
+        keys = [(-score, next(self._seq), item_id) for item_id in item_ids]
+        if not keys:
+            return
+        # Sequence numbers are taken outside the lock and may interleave with other adds
+        keys.sort()
+        with self._lock:
+            for key in keys:
+                self._keys[key[2]] = key
+            if not self._chunks:
+                self._chunks.append(keys)
+                self._maxes.append(keys[-1])
+                self._split(0)
+                return
+            # The slice of the (sorted) new keys that falls into each chunk
+            groups = []
+            start = chunk = 0
+            last = len(self._chunks) - 1
+            while start < len(keys):
+                chunk = min(bisect.bisect_left(self._maxes, keys[start], chunk), last)
+                end = len(keys) if chunk == last else bisect.bisect_right(keys, self._maxes[chunk], start)
+                groups.append((chunk, keys[start:end]))
+                start = end
+                chunk += 1
+            # Back to front, so splitting a chunk does not shift the ones still to merge
+            for chunk, group in reversed(groups):
+                entries = self._chunks[chunk]
+                if len(group) == 1:
+                    bisect.insort(entries, group[0])
+                else:
+                    # Two sorted runs: the sort is a linear merge, bounded by the chunk size
+                    entries.extend(group)
+                    entries.sort()
+                self._maxes[chunk] = entries[-1]
+                self._split(chunk)
+
+    def update(self, item_id, score):
+        with self._lock:
+            old_key = self._keys.get(item_id)
+            if old_key is None or old_key[0] == -score:
+                return
+            self._remove(old_key)
+            new_key = (-score, old_key[1], item_id)
+            self._keys[item_id] = new_key
+            self._insert(new_key)
+
+    def top(self, n=None):
+        """Return the ids of the n highest scored items (all of them if n is None)."""
+        with self._lock:
+            ids = []
+            for entries in self._chunks:
+                if n is not None:
+                    if len(ids) >= n:
+                        break
+                    entries = entries[:n - len(ids)]
+                ids.extend(item_id for _, _, item_id in entries)
+            return ids
+
+    def _insert(self, key):
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            return
+        chunk = bisect.bisect_left(self._maxes, key)
+        if chunk == len(self._chunks):
+            # Past every entry: append to the last chunk
+            chunk -= 1
+            self._chunks[chunk].append(key)
+            self._maxes[chunk] = key
+        else:
+            bisect.insort(self._chunks[chunk], key)
+        self._split(chunk)
+
+    def _remove(self, key):
+        chunk = bisect.bisect_left(self._maxes, key)
+        entries = self._chunks[chunk]
+        del entries[bisect.bisect_left(entries, key)]
+        if entries:
+            self._maxes[chunk] = entries[-1]
+        else:
+            del self._chunks[chunk]
+            del self._maxes[chunk]
+
+    def _split(self, chunk):
+        entries = self._chunks[chunk]
+        if len(entries) <= 2 * self.CHUNK_SIZE:
+            return
+        pieces = [entries[start:start + self.CHUNK_SIZE] for start in range(0, len(entries), self.CHUNK_SIZE)]
+        self._chunks[chunk:chunk + 1] = pieces
+        self._maxes[chunk:chunk + 1] = [piece[-1] for piece in pieces]
@@ -0,0 +1,115 @@
+import collections
+import threading
+import grpc
+import reddit_pb2
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class ResponseCache:
+    """Size-bounded LRU of serialized responses, with hit/miss counters.
+
+    Keys are the same ('postId' | 'commentId', id) pairs the vote engine
+    locks on. Entries are filled and invalidated while holding that item's
+    vote lock, so a cached response can never carry a score older than the
+    latest vote.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            data = self._entries.pop(key, None)
+            if data is not None:
+                self.size -= len(data)
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+class CachedReadHandler(grpc.GenericRpcHandler):
+    """Serves GetPost and GetComment straight from cached response bytes.
+
+    Registered ahead of the generated servicer handlers, it answers these two
+    methods with a response serializer of None, so a hit skips both message
+    construction and serialization. Every other method falls through to the
+    servicer. With asynchronous=True the handlers are coroutines for
+    grpc.aio servers.
+    """
+
+    _METHODS = {
+        '/reddit.RedditService/GetPost': ('get_post_bytes', reddit_pb2.GetPostRequest),
+        '/reddit.RedditService/GetComment': ('get_comment_bytes', reddit_pb2.GetCommentRequest),
+    }
+
+    def __init__(self, service, asynchronous=False):
+        self._handlers = {}
+        for method, (reader, request_type) in self._METHODS.items():
+            read = getattr(service, reader)
+            behavior = self._async_behavior(read) if asynchronous else self._sync_behavior(read)
+            self._handlers[method] = grpc.unary_unary_rpc_method_handler(
+                behavior, request_deserializer=request_type.FromString, response_serializer=None)
+
+    @staticmethod
+    def _sync_behavior(read):
+        def behavior(request, context):
+            data = read(request.id)
+            if data is None:
+                context.abort(grpc.StatusCode.NOT_FOUND, "Comment not found")
+            return data
+        return behavior
+
+    @staticmethod
+    def _async_behavior(read):
+        async def behavior(request, context):
+            data = read(request.id)
+            if data is None:
+                await context.abort(grpc.StatusCode.NOT_FOUND, "Comment not found")
+            return data
+        return behavior
+
+    def service(self, handler_call_details):
+        return self._handlers.get(handler_call_details.method)
@@ -0,0 +1,416 @@
+import grpc
+import queue
+import threading
+import hashlib
+import heapq
+import itertools
+from concurrent import futures
+import reddit_pb2
+import reddit_pb2_grpc
+from paging import encode_cursor, decode_cursor, ACTIVITY_DEFAULT_PAGE, ACTIVITY_PAGE_LIMIT
+from metrics import ServerMetrics, server_stats
+from ranking import hot_score, HOT_POSTS_DEFAULT, HOT_POSTS_LIMIT
+from trending import TRENDING_DEFAULT_COUNT, TRENDING_LIMIT
+from search import SEARCH_DEFAULT_PAGE, SEARCH_PAGE_LIMIT
+from store import encode_time
+
+# A shard cursor position beyond any index: the shard starts at its newest item
+NEWEST = 0xFFFFFFFF
+
+
+def shard_for_key(key, shard_count):
+    """Shard owning a free-form key such as a user id or subredditId."""
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % shard_count
+
+
+def shard_for_id(item_id, shard_count):
+    """Shard owning a post or comment id.
+
+    Shard k hands out ids k+1, k+1+N, k+1+2N, ... so the owner can be read
+    straight off the id without a lookup table. Ids that are not numbers
+    cannot exist anywhere; they are hashed so the lookup still gets a
+    proper "not found" answer from some shard.
+    """
+    try:
+        return (int(item_id) - 1) % shard_count
+    except ValueError:
+        return shard_for_key(item_id, shard_count)
+
+
+def _timeout(context):
+    """Propagate the caller's deadline; servers report "no deadline" as a huge value."""
+    remaining = context.time_remaining()
+    return remaining if remaining is not None and remaining < 86400 else None
+
+
+class _RequestQueue:
+    """Feeds a blocking request iterator to an upstream stream."""
+
+    _DONE = object()
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def put(self, request):
+        self._queue.put(request)
+
+    def close(self):
+        self._queue.put(self._DONE)
+
+    def __iter__(self):
+        while True:
+            request = self._queue.get()
+            if request is self._DONE:
+                return
+            yield request
+
+
+class RedditRouter(reddit_pb2_grpc.RedditServiceServicer):
+    """Front end that forwards every RPC to the shard owning its data.
+
+    Posts are placed by subredditId and comments always live on the shard of
+    the post (or comment) they answer, so every thread read is served by a
+    single shard. Reads that span subreddits or users (ListPosts and
+    GetHotPosts without a subredditId, GetTrending, the searches and
+    ListUserActivity) visit every shard and merge.
+    """
+
+    def __init__(self, addresses):
+        self.channels = [grpc.insecure_channel(address) for address in addresses]
+        self.stubs = [reddit_pb2_grpc.RedditServiceStub(channel) for channel in self.channels]
+        self.metrics = ServerMetrics()
+
+    def wait_ready(self, timeout=None):
+        for channel in self.channels:
+            grpc.channel_ready_future(channel).result(timeout=timeout)
+
+    def by_key(self, key):
+        return self.stubs[shard_for_key(key, len(self.stubs))]
+
+    def by_id(self, item_id):
+        return self.stubs[shard_for_id(item_id, len(self.stubs))]
+
+    def forward(self, call, request, context):
+        try:
+            return call(request, timeout=_timeout(context))
+        except grpc.RpcError as e:
+            context.abort(e.code(), e.details())
+
+    def forward_stream(self, call, request, context):
+        try:
+            yield from call(request, timeout=_timeout(context))
+        except grpc.RpcError as e:
+            context.abort(e.code(), e.details())
+
+    def CreateUser(self, request, context):
+        return self.forward(self.by_key(request.id).CreateUser, request, context)
+
+    def GetUser(self, request, context):
+        return self.forward(self.by_key(request.id).GetUser, request, context)
+
+    def ListUserActivity(self, request, context):
+        """Merge the shards' activity pages newest first.
+
+        A user's posts follow their subreddits and comments their threads,
+        so any shard may hold some. Router cursors hold every shard's
+        (post, comment) position and are attached to each item, like the
+        shards' own.
+        """
+        shards = len(self.stubs)
+        try:
+            positions = list(decode_cursor(request.cursor, 2 * shards) if request.cursor else [NEWEST] * 2 * shards)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        calls = []
+        for shard, stub in enumerate(self.stubs):
+            upstream = reddit_pb2.ListUserActivityRequest()
+            upstream.CopyFrom(request)
+            upstream.cursor = encode_cursor(*positions[2 * shard:2 * shard + 2])
+            # Streams start on invocation, so the shards work concurrently
+            calls.append(stub.ListUserActivity(upstream, timeout=_timeout(context)) if any(positions[2 * shard:2 * shard + 2]) else ())
+        try:
+            pages = [list(call) for call in calls]
+        except grpc.RpcError as e:
+            context.abort(e.code(), e.details())
+        for shard, page in enumerate(pages):
+            if not page:
+                positions[2 * shard:2 * shard + 2] = (0, 0)
+
+        merged = heapq.merge(*([(shard, activity) for activity in page] for shard, page in enumerate(pages)),
+                             key=lambda entry: -entry[1].createdMicros)
+        for shard, activity in itertools.islice(merged, min(request.pageSize or ACTIVITY_DEFAULT_PAGE, ACTIVITY_PAGE_LIMIT)):
+            positions[2 * shard:2 * shard + 2] = decode_cursor(activity.cursor, 2) if activity.cursor else (0, 0)
+            activity.cursor = encode_cursor(*positions) if any(positions) else ""
+            yield activity
+
+    def CreatePost(self, request, context):
+        return self.forward(self.by_key(request.subredditId).CreatePost, request, context)
+
+    def GetPost(self, request, context):
+        return self.forward(self.by_id(request.id).GetPost, request, context)
+
+    def ListPosts(self, request, context):
+        if request.subredditId:
+            # A subreddit lives on one shard, whose cursors are passed through untouched
+            return self.forward_stream(self.by_key(request.subredditId).ListPosts, request, context)
+        return self.list_all_posts(request, context)
+
+    def list_all_posts(self, request, context):
+        """Page through the shards one after another.
+
+        Router cursors are (shard, row in that shard). A page that ends inside
+        a shard resumes there; one that ends exactly at a shard boundary
+        resumes at the start of the next shard.
+        """
+        try:
+            first, row = decode_cursor(request.cursor, 2) if request.cursor else (0, 0)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        remaining = request.pageSize
+        pending = None
+        for shard in range(first, len(self.stubs)):
+            upstream = reddit_pb2.ListPostsRequest()
+            upstream.CopyFrom(request)
+            upstream.cursor = encode_cursor(row)
+            upstream.pageSize = remaining
+            row = 0
+            for response in self.forward_stream(self.stubs[shard].ListPosts, upstream, context):
+                if pending:
+                    yield pending
+                pending = response
+                if request.pageSize:
+                    remaining -= len(response.posts) or 1
+            if pending and pending.nextCursor:
+                pending.nextCursor = encode_cursor(shard, decode_cursor(pending.nextCursor)[0])
+                break
+            if request.pageSize and not remaining:
+                if shard + 1 < len(self.stubs):
+                    pending.nextCursor = encode_cursor(shard + 1, 0)
+                break
+        if pending:
+            yield pending
+
+    def CreateComment(self, request, context):
+        root_id = request.postId if request.HasField('postId') else request.commentId
+        return self.forward(self.by_id(root_id).CreateComment, request, context)
+
+    def GetComment(self, request, context):
+        return self.forward(self.by_id(request.id).GetComment, request, context)
+
+    def ListComments(self, request, context):
+        return self.forward_stream(self.by_id(request.postId).ListComments, request, context)
+
+    def BulkCreatePosts(self, request_iterator, context):
+        return self.bulk_create('BulkCreatePosts', request_iterator, lambda request: shard_for_key(request.subredditId, len(self.stubs)), context)
+
+    def BulkCreateComments(self, request_iterator, context):
+        def shard_of(request):
+            root_id = request.postId if request.HasField('postId') else request.commentId
+            return shard_for_id(root_id, len(self.stubs))
+        return self.bulk_create('BulkCreateComments', request_iterator, shard_of, context)
+
+    def bulk_create(self, method, request_iterator, shard_of, context):
+        """Stream every request on to its shard and put the returned ids back in request order."""
+        queues = {}
+        positions = {}  # shard -> indexes of its requests in the caller's stream
+        calls = {}
+        count = 0
+        with futures.ThreadPoolExecutor(max_workers=len(self.stubs)) as pool:
+            try:
+                for index, request in enumerate(request_iterator):
+                    shard = shard_of(request)
+                    if shard not in queues:
+                        queues[shard] = _RequestQueue()
+                        positions[shard] = []
+                        calls[shard] = pool.submit(getattr(self.stubs[shard], method), iter(queues[shard]), timeout=_timeout(context))
+                    queues[shard].put(request)
+                    positions[shard].append(index)
+                    count = index + 1
+            finally:
+                for upstream in queues.values():
+                    upstream.close()
+            ids = [""] * count
+            for shard, call in calls.items():
+                try:
+                    part = call.result()
+                except grpc.RpcError as e:
+                    context.abort(e.code(), e.details())
+                for index, item_id in zip(positions[shard], part.ids):
+                    ids[index] = item_id
+        created = sum(1 for item_id in ids if item_id)
+        rejected = count - created
+        return reddit_pb2.BulkCreateResponse(success=not rejected, message=f"Created {created}, rejected {rejected}",
+                                             ids=ids, created=created, rejected=rejected)
+
+    def VotePost(self, request, context):
+        return self.forward(self.by_id(request.postId).VotePost, request, context)
+
+    def VoteComment(self, request, context):
+        return self.forward(self.by_id(request.commentId).VoteComment, request, context)
+
+    def VoteBatch(self, request_iterator, context):
+        # Split the batch per shard and let every shard aggregate its own part
+        batches = {}
+        for request in request_iterator:
+            target = request.WhichOneof('target')
+            if target:
+                shard = shard_for_id(getattr(request, target), len(self.stubs))
+                batches.setdefault(shard, []).append(request)
+        response = reddit_pb2.VoteBatchResponse(success=True, message="Votes applied!")
+        with futures.ThreadPoolExecutor(max_workers=max(len(batches), 1)) as pool:
+            calls = [pool.submit(self.stubs[shard].VoteBatch, iter(batch), timeout=_timeout(context))
+                     for shard, batch in batches.items()]
+            for call in calls:
+                try:
+                    part = call.result()
+                except grpc.RpcError as e:
+                    context.abort(e.code(), e.details())
+                response.votesApplied += part.votesApplied
+                response.votesSkipped += part.votesSkipped
+                response.scores.extend(part.scores)
+        return response
+
+    def GetTopComments(self, request, context):
+        return self.forward(self.by_id(request.postId).GetTopComments, request, context)
+
+    def GetHotPosts(self, request, context):
+        if request.subredditId:
+            return self.forward(self.by_key(request.subredditId).GetHotPosts, request, context)
+        # The overall front page is among the shards' own front pages of the same size
+        calls = [stub.GetHotPosts.future(request, timeout=_timeout(context)) for stub in self.stubs]
+        try:
+            pages = [call.result() for call in calls]
+        except grpc.RpcError as e:
+            context.abort(e.code(), e.details())
+        count = min(request.count or HOT_POSTS_DEFAULT, HOT_POSTS_LIMIT)
+        merged = heapq.merge(*(page.posts for page in pages),
+                             key=lambda post: -hot_score(post.score, encode_time(post.publicationDate)))
+        return reddit_pb2.GetHotPostsResponse(success=True, message=pages[0].message,
+                                              posts=itertools.islice(merged, count))
+
+    def GetTrending(self, request, context):
+        # Every item lives on one shard, so the overall top is among the shards' tops
+        calls = [stub.GetTrending.future(request, timeout=_timeout(context)) for stub in self.stubs]
+        try:
+            pages = [call.result() for call in calls]
+        except grpc.RpcError as e:
+            context.abort(e.code(), e.details())
+        count = min(request.count or TRENDING_DEFAULT_COUNT, TRENDING_LIMIT)
+        items = heapq.nlargest(count, (item for page in pages for item in page.items), key=lambda item: item.votes)
+        return reddit_pb2.GetTrendingResponse(success=True, message=pages[0].message, items=items)
+
+    def SearchPosts(self, request, context):
+        return self.search_shards('SearchPosts', 'posts', request, context)
+
+    def SearchComments(self, request, context):
+        return self.search_shards('SearchComments', 'comments', request, context)
+
+    def search_shards(self, method, field, request, context):
+        """Merge the shards' result pages by relevance.
+
+        Router cursors hold one offset per shard: how many of that shard's
+        results earlier pages used. Each shard computes relevance from its
+        own term statistics, which agree closely when documents are spread
+        evenly over the shards.
+        """
+        try:
+            offsets = list(decode_cursor(request.cursor, len(self.stubs)) if request.cursor else [0] * len(self.stubs))
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        starts = list(offsets)
+        calls = []
+        for stub, offset in zip(self.stubs, offsets):
+            upstream = reddit_pb2.SearchRequest()
+            upstream.CopyFrom(request)
+            upstream.cursor = encode_cursor(offset)
+            calls.append(getattr(stub, method).future(upstream, timeout=_timeout(context)))
+        try:
+            pages = [call.result() for call in calls]
+        except grpc.RpcError as e:
+            context.abort(e.code(), e.details())
+        page_size = min(request.pageSize or SEARCH_DEFAULT_PAGE, SEARCH_PAGE_LIMIT)
+        merged = heapq.merge(*([(shard, item, relevance) for item, relevance in zip(getattr(page, field), page.relevance)]
+                               for shard, page in enumerate(pages)), key=lambda result: -result[2])
+        items, relevances = [], []
+        for shard, item, relevance in itertools.islice(merged, page_size):
+            offsets[shard] += 1
+            items.append(item)
+            relevances.append(relevance)
+        # More pages if any shard has results not yet returned
+        more = any(page.nextCursor or offset - start < len(getattr(page, field))
+                   for page, offset, start in zip(pages, offsets, starts))
+        return type(pages[0])(success=True, message=pages[0].message, relevance=relevances,
+                              nextCursor=encode_cursor(*offsets) if more else "", **{field: items})
+
+    def StreamTopComments(self, request, context):
+        return self.forward_stream(self.by_id(request.postId).StreamTopComments, request, context)
+
+    def ExpandCommentBranch(self, request, context):
+        return self.forward(self.by_id(request.parentCommentId).ExpandCommentBranch, request, context)
+
+    def StreamCommentBranch(self, request, context):
+        return self.forward_stream(self.by_id(request.parentCommentId).StreamCommentBranch, request, context)
+
+    def GetThreadSummary(self, request, context):
+        return self.forward(self.by_id(request.postId).GetThreadSummary, request, context)
+
+    def GetServerStats(self, request, context):
+        """The router's own stats, with every shard's stats nested under `shards`."""
+        stats = server_stats(self.metrics)
+        for stub in self.stubs:
+            stats.shards.append(self.forward(stub.GetServerStats, request, context))
+        return stats
+
+    def MonitorUpdates(self, request_iterator, context):
+        """Fan watch requests out to per-shard streams and merge their updates.
+
+        An upstream stream is opened the first time a shard is needed. Every
+        upstream is drained by its own thread into one queue that this
+        handler yields from; the first upstream error ends the whole stream.
+        """
+        merged = queue.Queue()  # ('update' | 'error' | 'ended' | 'opened', value)
+        upstreams = {}
+
+        def drain(call):
+            try:
+                for update in call:
+                    merged.put(('update', update))
+            except grpc.RpcError as e:
+                merged.put(('error', e))
+            finally:
+                merged.put(('ended', None))
+
+        def pump():
+            try:
+                for request in request_iterator:
+                    kind = request.WhichOneof('request_type')
+                    if kind is None:
+                        continue
+                    shard = shard_for_id(getattr(request, kind), len(self.stubs))
+                    if shard not in upstreams:
+                        upstreams[shard] = _RequestQueue()
+                        call = self.stubs[shard].MonitorUpdates(iter(upstreams[shard]))
+                        context.add_callback(call.cancel)
+                        threading.Thread(target=drain, args=(call,), daemon=True).start()
+                    upstreams[shard].put(request)
+            except grpc.RpcError:
+                pass
+            finally:
+                for upstream in upstreams.values():
+                    upstream.close()
+                merged.put(('opened', len(upstreams)))
+
+        threading.Thread(target=pump, daemon=True).start()
+        opened = None
+        ended = 0
+        while opened is None or ended < opened:
+            kind, value = merged.get()
+            if kind == 'update':
+                yield value
+            elif kind == 'error':
+                context.abort(value.code(), value.details())
+            elif kind == 'ended':
+                ended += 1
+            else:
+                opened = value
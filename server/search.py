@@ -0,0 +1,108 @@
+import collections
+import heapq
+import math
+import re
+import threading
+from array import array
+from operator import itemgetter
+
+# SearchPosts/SearchComments page size when none is requested, and the largest one served
+SEARCH_DEFAULT_PAGE = 10
+SEARCH_PAGE_LIMIT = 100
+
+# BM25 term frequency saturation and document length normalization
+K1 = 1.2
+B = 0.75
+# A title word counts as this many body words
+TITLE_WEIGHT = 2
+# Relevance gained per tenfold score, so among similar matches the better voted one wins
+SCORE_WEIGHT = 0.5
+# Longer tokens are cut, so a pasted blob cannot bloat the vocabulary
+MAX_TOKEN_LENGTH = 32
+
+_TOKEN = re.compile(r"\w+")
+_MAX_TF = 0xFFFF
+
+
+def tokenize(text):
+    """Lowercased word tokens of a text."""
+    return [token[:MAX_TOKEN_LENGTH] for token in _TOKEN.findall(text.casefold())]
+
+
+def post_tokens(post):
+    return tokenize(post.title) * TITLE_WEIGHT + tokenize(post.content)
+
+
+def blend(relevance, score):
+    """BM25 relevance adjusted by the item's vote score on a log scale."""
+    sign = (score > 0) - (score < 0)
+    return relevance + SCORE_WEIGHT * sign * math.log10(max(abs(score), 1))
+
+
+class SearchIndex:
+    """Incremental inverted index over the rows of one table.
+
+    Each term maps to two parallel arrays, the rows containing it and how
+    often, appended to as documents are added; document lengths are an
+    array indexed by row. A posting costs 6 bytes and nothing is kept per
+    document beyond its length. Queries are scored term at a time with
+    BM25, any query term matching, and need no lock: documents are only
+    ever added, and a posting is written after the length it depends on.
+    """
+
+    def __init__(self):
+        self.postings = {}      # term -> (array of rows, array of term frequencies)
+        self.lengths = array('I')
+        self.documents = 0
+        self.total_length = 0
+        self._lock = threading.Lock()
+
+    def add(self, row, tokens):
+        self.extend(((row, tokens),))
+
+    def extend(self, documents):
+        """Index (row, tokens) pairs under one lock acquisition."""
+        counted = [(row, len(tokens), collections.Counter(tokens)) for row, tokens in documents]
+        with self._lock:
+            for row, length, frequencies in counted:
+                if row >= len(self.lengths):
+                    self.lengths.frombytes(bytes(self.lengths.itemsize * (row + 1 - len(self.lengths))))
+                self.lengths[row] = length
+                self.documents += 1
+                self.total_length += length
+                for term, frequency in frequencies.items():
+                    rows, tfs = self.postings.get(term) or self.postings.setdefault(term, (array('i'), array('H')))
+                    rows.append(row)
+                    tfs.append(min(frequency, _MAX_TF))
+
+    def relevance(self, tokens):
+        """BM25 relevance of every row matching any of the tokens, as {row: relevance}."""
+        documents = self.documents
+        if not documents:
+            return {}
+        lengths = self.lengths
+        average = self.total_length / documents or 1
+        base, per_length = K1 * (1 - B), K1 * B / average
+        # Longest posting list first: it fills the accumulator in one dict() call
+        entries = sorted((self.postings[term] for term in set(tokens) if term in self.postings),
+                         key=lambda entry: len(entry[0]), reverse=True)
+        scores = {}
+        for rows, tfs in entries:
+            matches = len(tfs)
+            weight = math.log(1 + (documents - matches + 0.5) / (matches + 0.5)) * (K1 + 1)
+            values = [weight * tf / (tf + base + per_length * lengths[row]) for row, tf in zip(rows, tfs)]
+            if not scores:
+                scores = dict(zip(rows, values))
+                continue
+            get = scores.get
+            for row, value in zip(rows, values):
+                scores[row] = get(row, 0.0) + value
+        return scores
+
+    def search(self, tokens, scores, limit):
+        """The `limit` best (row, ranking) pairs, best first, blending relevance with scores[row]."""
+        def ranked():
+            for row, value in self.relevance(tokens).items():
+                score = scores[row]
+                yield row, blend(value, score) if score else value
+        return heapq.nlargest(limit, ranked(), key=itemgetter(1))
@@ -0,0 +1,95 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from array import array
+from search import SearchIndex, tokenize, SEARCH_DEFAULT_PAGE
+
+# Memory and query latency of the search index. Synthetic documents draw
+# their words from a Zipf-like vocabulary, so a few words are in most
+# documents and most words are rare, as in real text. Memory is the growth
+# of the resident set while indexing. Run from the server directory:
+#   python search_bench.py --documents 1000000
+
+VOCABULARY = 50000
+WORDS_PER_DOCUMENT = 12
+# Queries by how common their words are: the rank of each word in the vocabulary
+QUERIES = {
+    'rare': (20000,),
+    'medium': (500,),
+    'common': (5,),
+    'two_words': (500, 20000),
+    'three_words_common': (5, 50, 500),
+}
+
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def word(rank):
+    return f"w{rank}"
+
+
+def synthetic_documents(count, rng):
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY)]
+    cumulative = list(itertools.accumulate(weights))
+    for row in range(count):
+        ranks = rng.choices(range(VOCABULARY), cum_weights=cumulative, k=WORDS_PER_DOCUMENT)
+        yield row, tokenize(' '.join(word(rank) for rank in ranks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search index memory and query latency")
+    parser.add_argument('--documents', type=int, default=1000000)
+    parser.add_argument('--batch', type=int, default=1000, help="Documents indexed per extend call")
+    parser.add_argument('--repeat', type=int, default=20, help="Runs of every query")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    index = SearchIndex()
+    documents = synthetic_documents(args.documents, rng)
+    before = rss_bytes()
+    start = time.perf_counter()
+    indexing = 0.0
+    while True:
+        batch = [document for _, document in zip(range(args.batch), documents)]
+        if not batch:
+            break
+        begin = time.perf_counter()
+        index.extend(batch)
+        indexing += time.perf_counter() - begin
+    elapsed = time.perf_counter() - start
+    memory = rss_bytes() - before
+    scores = array('i', bytes(4 * args.documents))
+
+    queries = {}
+    for name, ranks in QUERIES.items():
+        tokens = [word(rank) for rank in ranks]
+        latencies = []
+        for _ in range(args.repeat):
+            begin = time.perf_counter()
+            # A first page, as SearchPosts asks for it
+            index.search(tokens, scores, SEARCH_DEFAULT_PAGE + 1)
+            latencies.append(time.perf_counter() - begin)
+        latencies.sort()
+        queries[name] = {
+            'matches': len(index.relevance(tokens)),
+            'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2),
+        }
+    print(json.dumps({
+        'documents': args.documents,
+        'terms': len(index.postings),
+        'postings': sum(len(rows) for rows, _ in index.postings.values()),
+        'index_bytes_per_document': round(memory / args.documents),
+        'indexing_us_per_document': round(indexing / args.documents * 1e6, 1),
+        'build_seconds_with_generation': round(elapsed, 1),
+        'queries': queries,
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
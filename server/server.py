@@ -8,22 +8,138 @@ import reddit_pb2_grpc
 from google.protobuf import timestamp_pb2
 import datetime
 import argparse
+import threading
+import time
+from ranking import ScoreIndex, hot_score, HOT_POSTS_DEFAULT, HOT_POSTS_LIMIT
+from search import SearchIndex, post_tokens, tokenize, SEARCH_DEFAULT_PAGE, SEARCH_PAGE_LIMIT
+from trending import VelocityTracker, TRENDING_DEFAULT_COUNT, TRENDING_DEFAULT_MINUTES, TRENDING_LIMIT, TRENDING_WINDOW_MINUTES
+from votes import VoteEngine, vote_delta
+from updates import ThreadSubscriber, UpdateHub
+from async_server import serve_async
+from router import RedditRouter
+import wal
+from wal import WriteAheadLog, encode_vote, decode_vote, encode_created, decode_created
+import multiprocessing
+import bisect
+import itertools
+from store import CommentTable, PostTable, StringPool, PARENT_POST
+from paging import encode_cursor, decode_cursor, ACTIVITY_DEFAULT_PAGE, ACTIVITY_PAGE_LIMIT
+from metrics import MetricsInterceptor, ServerMetrics, server_stats
+from admission import AdmissionInterceptor
+from response_cache import CachedReadHandler, ResponseCache, DEFAULT_CACHE_BYTES
+
+POST_NOT_FOUND = reddit_pb2.GetPostResponse(success=False,message="Post not found!",post=None)
+POST_NOT_FOUND_BYTES = POST_NOT_FOUND.SerializeToString()
+
+# Nested CommentTrees deeper than this run into protobuf's recursion limit
+# when parsed; deeper branches are served flattened by StreamCommentBranch
+MAX_TREE_DEPTH = 64
+
+def batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 class RedditService(reddit_pb2_grpc.RedditServiceServicer):
 
-    def __init__(self):
+    # Bulk creates are validated, stored and logged this many at a time
+    BULK_BATCH_SIZE = 1000
+
+    def __init__(self, max_update_rate=0, shard_index=0, shard_count=1, write_ahead_log=None, response_cache_bytes=DEFAULT_CACHE_BYTES):
         self.users = {}
-        self.posts = {}
-        self.comments = {}
+        # Posts and comments live in column tables addressed by row number;
+        # protobuf messages are only built when a response needs them. When
+        # running as one shard of several, ids are strided so the router can
+        # find their owner.
+        self.strings = StringPool()
+        self.posts = PostTable(self.strings, shard_count, shard_index)
+        self.comments = CommentTable(self.strings, self.posts, shard_count, shard_index)
+        # Adjacency indexes so thread reads never scan every stored comment
+        self.post_comments = {}     # post row -> top-level comment rows
+        self.comment_replies = {}   # comment row -> reply rows
+        # The same children kept ordered by score for top-N reads
+        self.post_rankings = {}     # post row -> ScoreIndex of top-level comment rows
+        self.reply_rankings = {}    # comment row -> ScoreIndex of reply rows
+        # Front pages, kept ordered by hot score as posts are created and voted on
+        self.hot_posts = ScoreIndex()   # every post row
+        self.hot_by_subreddit = {}      # subreddit code -> ScoreIndex of post rows
+        # Inverted indexes for SearchPosts and SearchComments
+        self.post_search = SearchIndex()
+        self.comment_search = SearchIndex()
+        # Recent votes per post and comment row, for GetTrending
+        self.post_velocity = VelocityTracker()
+        self.comment_velocity = VelocityTracker()
+        self.votes = VoteEngine()
+        # Score changes are pushed to MonitorUpdates streams through the hub
+        self.updates = UpdateHub()
+        self.max_update_rate = max_update_rate
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        # Serialized GetPost/GetComment responses, dropped whenever the item's score changes
+        self.response_cache = ResponseCache(response_cache_bytes) if response_cache_bytes else None
+        # Filled in by the metrics interceptor the server is built with
+        self.metrics = ServerMetrics()
+        # Every mutation is appended to the write-ahead log (if any) before it is acknowledged
+        self.wal = None
+        if write_ahead_log:
+            self.replay(WriteAheadLog.read(write_ahead_log.path))
+            self.wal = write_ahead_log
+
+    def log(self, kind, payload, wait=True):
+        if self.wal:
+            ticket = self.wal.append(kind, payload)
+            if wait:
+                self.wal.wait(ticket)
+
+    def replay(self, records):
+        """Rebuild state from write-ahead log records.
+
+        A create is logged as its id is claimed, under the table's lock,
+        and a reply or a vote only once its target is stored, so the log
+        holds creates in id order and every target ahead of what refers to
+        it. A log out of that order has lost records; replaying past them
+        would hand the lost ids to new items, so it raises ValueError.
+        """
+        for kind, payload in records:
+            if kind == wal.USER:
+                self.insert_user(reddit_pb2.User.FromString(payload))
+            elif kind == wal.POST:
+                created, post = decode_created(payload, reddit_pb2.Post)
+                if post.id != self.posts.next_id():
+                    raise ValueError(f"Write-ahead log is missing post {self.posts.next_id()}, found post {post.id}")
+                self.insert_post(post, created)
+            elif kind == wal.COMMENT:
+                created, comment = decode_created(payload, reddit_pb2.Comment)
+                root = comment.WhichOneof('rootId')
+                if getattr(comment, root) not in (self.posts if root == 'postId' else self.comments):
+                    raise ValueError(f"Write-ahead log is missing {root} {getattr(comment, root)} of comment {comment.id}")
+                if comment.id != self.comments.next_id():
+                    raise ValueError(f"Write-ahead log is missing comment {self.comments.next_id()}, found comment {comment.id}")
+                self.insert_comment(comment, created)
+            elif kind in (wal.POST_VOTE, wal.COMMENT_VOTE):
+                item_id, delta = decode_vote(payload)
+                target, vote = ('postId', self.vote_post) if kind == wal.POST_VOTE else ('commentId', self.vote_comment)
+                # Replayed votes are not recent, so they stay out of the velocity trackers
+                if vote(item_id, delta, votes=0) is None:
+                    raise ValueError(f"Write-ahead log is missing {target} {item_id} of a vote")
 
     def CreateUser(self, request, context):
-        if request.id in self.users:
-            context.abort(grpc.StatusCode.ALREADY_EXISTS, "User already exists")
-
         user = reddit_pb2.User(id=request.id, username=request.username, email=request.email)
-        self.users[user.id] = user
+        # setdefault checks and inserts in one step, so concurrent creates cannot both win
+        if self.insert_user(user) is not user:
+            context.abort(grpc.StatusCode.ALREADY_EXISTS, "User already exists")
+        self.log(wal.USER, user.SerializeToString())
         return reddit_pb2.UserResponse(user=user)
 
+    def insert_user(self, user):
+        """Store the user unless the id is taken; returns the stored user."""
+        return self.users.setdefault(user.id, user)
+
     def GetUser(self, request, context):
         user = self.users.get(request.id)
         if user:
@@ -31,46 +147,211 @@ class RedditService(reddit_pb2_grpc.RedditServiceServicer):
         else:
             context.abort(grpc.StatusCode.NOT_FOUND, "User not found")
     
+    def ListUserActivity(self, request, context):
+        """A user's posts and comments merged newest first.
+
+        Both author indexes are in creation order, so the page is a merge
+        on the tables' shared creation stamps walking backwards from two
+        positions, which are all the cursor holds. Items created after the
+        first page sit beyond those positions and are not repeated on
+        later pages.
+        """
+        if request.pageSize < 0:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "pageSize must not be negative")
+        author = self.strings.code(request.userId) if request.userId else None
+        posts = self.posts.by_author.get(author, ())
+        comments = self.comments.by_author.get(author, ())
+        try:
+            post_end, comment_end = decode_cursor(request.cursor, 2) if request.cursor else (len(posts), len(comments))
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        # Positions past the end (the router starts every shard that way) mean the newest item
+        post_end, comment_end = min(post_end, len(posts)), min(comment_end, len(comments))
+        for _ in range(min(request.pageSize or ACTIVITY_DEFAULT_PAGE, ACTIVITY_PAGE_LIMIT)):
+            if not post_end and not comment_end:
+                return
+            post_row = posts[post_end - 1] if post_end else None
+            comment_row = comments[comment_end - 1] if comment_end else None
+            if comment_row is None or (post_row is not None and self.posts.created[post_row] > self.comments.created[comment_row]):
+                post_end -= 1
+                activity = reddit_pb2.UserActivity(post=self.posts.message(post_row), createdMicros=self.posts.created[post_row])
+            else:
+                comment_end -= 1
+                activity = reddit_pb2.UserActivity(comment=self.comments.message(comment_row), createdMicros=self.comments.created[comment_row])
+            if post_end or comment_end:
+                activity.cursor = encode_cursor(post_end, comment_end)
+            yield activity
+
     def CreatePost(self, request, context):
         current_time = datetime.datetime.now()
         formatted_time = current_time.strftime("%Y-%m-%dT%H:%M")
         try:
-            # print(request)
-            if request.image_url and request.video_url:                
-                raise ValueError("There can't be two medias in the request")
-            if request.image_url == "":
-                post = reddit_pb2.Post(id=str(len(self.posts) + 1), title=request.title, content=request.content, score=0, state=reddit_pb2.NORMAL, publicationDate=formatted_time, video_url=request.video_url, subredditId=request.subredditId)
-            else:
-                post = reddit_pb2.Post(id=str(len(self.posts) + 1), title=request.title, content=request.content, score=0, state=reddit_pb2.NORMAL, publicationDate=formatted_time, image_url=request.image_url, subredditId=request.subredditId)
-
-            self.posts[post.id] = post
+            post = self.new_post(request, formatted_time)
+            # The table assigns the id as it stores the post
+            self.insert_post(post)
+            self.wait_log()
             return reddit_pb2.PostResponse(success=True, message="Post created successfully!", post=post)
         except ValueError as e:
             return reddit_pb2.PostResponse(success=False, message=str(e), post=None)
 
+    def new_post(self, request, formatted_time):
+        if request.image_url and request.video_url:
+            raise ValueError("There can't be two medias in the request")
+        if request.image_url == "":
+            return reddit_pb2.Post(title=request.title, content=request.content, score=0, state=reddit_pb2.NORMAL, publicationDate=formatted_time, video_url=request.video_url, subredditId=request.subredditId, authorId=request.authorId)
+        else:
+            return reddit_pb2.Post(title=request.title, content=request.content, score=0, state=reddit_pb2.NORMAL, publicationDate=formatted_time, image_url=request.image_url, subredditId=request.subredditId, authorId=request.authorId)
+
+    def insert_post(self, post, created=None):
+        row = self.posts.append(post, self.rank_new_posts, self.log_new_posts, created)
+        self.post_search.add(row, post_tokens(post))
+        return row
+
+    def post_hot_score(self, row):
+        return hot_score(self.posts.scores[row], self.posts.published[row])
+
+    def rank_new_posts(self, rows):
+        """Put just stored post rows on the front pages.
+
+        Called by the table before the rows can be found, so a vote never
+        reaches a post that the hot indexes do not hold yet.
+        """
+        # A batch shares one publication time and score, hence one hot score
+        hot = self.post_hot_score(rows[0])
+        self.hot_posts.extend(rows, hot)
+        by_subreddit = {}
+        for row in rows:
+            by_subreddit.setdefault(self.posts.subreddits[row], []).append(row)
+        for code, subreddit_rows in by_subreddit.items():
+            self.hot_by_subreddit.setdefault(code, ScoreIndex()).extend(subreddit_rows, hot)
+
+    def create_posts(self, requests):
+        """Create a batch of posts; returns their ids in request order, "" for rejected ones."""
+        formatted_time = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M")
+        posts = []
+        for request in requests:
+            try:
+                posts.append(self.new_post(request, formatted_time))
+            except ValueError:
+                posts.append(None)
+        created = [post for post in posts if post]
+        rows = self.posts.extend(created, self.rank_new_posts, self.log_new_posts)
+        self.post_search.extend(zip(rows, map(post_tokens, created)))
+        self.wait_log()
+        return [post.id if post else "" for post in posts]
+
+    @staticmethod
+    def bulk_response(ids):
+        created = sum(1 for item_id in ids if item_id)
+        rejected = len(ids) - created
+        return reddit_pb2.BulkCreateResponse(success=not rejected, message=f"Created {created}, rejected {rejected}",
+                                             ids=ids, created=created, rejected=rejected)
+
+    def log_new_posts(self, posts, stamps):
+        # Called by the table as it claims the ids, so the log holds posts in id order
+        self.log_created(wal.POST, posts, stamps)
+
+    def log_new_comments(self, comments, stamps):
+        self.log_created(wal.COMMENT, comments, stamps)
+
+    def log_created(self, kind, messages, stamps):
+        if self.wal:
+            for message, stamp in zip(messages, stamps):
+                self.wal.append(kind, encode_created(stamp, message))
+
+    def wait_log(self):
+        # One durability wait covers every record logged so far, a whole batch included
+        if self.wal:
+            self.wal.wait_all()
+
+    def BulkCreatePosts(self, request_iterator, context):
+        ids = []
+        for batch in batches(request_iterator, self.BULK_BATCH_SIZE):
+            ids.extend(self.create_posts(batch))
+        return self.bulk_response(ids)
 
     def GetPost(self, request, context):
-        post = self.posts.get(request.id)
-        if post:
-            return reddit_pb2.GetPostResponse(success=True,message="Post fetched successfully!",post=post)
+        row = self.posts.row(request.id)
+        if row is not None:
+            return self.post_response(row)
         else:
-            return reddit_pb2.GetPostResponse(success=False,message="Post not found!",post=None)
+            return POST_NOT_FOUND
+
+    def post_response(self, row):
+        return reddit_pb2.GetPostResponse(success=True,message="Post fetched successfully!",post=self.posts.message(row))
+
+    def get_post_bytes(self, post_id):
+        """Serialized GetPostResponse for a post id, served from the response cache."""
+        row = self.posts.row(post_id)
+        if row is None:
+            return POST_NOT_FOUND_BYTES
+        return self.cached_response(('postId', post_id), lambda: self.post_response(row))
 
     def ListPosts(self, request, context):
-        for post_id, post in self.posts.items():
-            yield reddit_pb2.PostResponse(post=post)
+        """Stream one page of posts in creation order.
+
+        Posts can be narrowed to a subreddit and/or a state. With a pageSize
+        the last message carries a nextCursor when more posts match; passing
+        it back resumes right after this page. postsPerMessage > 0 packs that
+        many posts into each message's `posts` instead of one `post` each.
+        """
+        try:
+            start = decode_cursor(request.cursor)[0] if request.cursor else 0
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        if request.pageSize < 0 or request.postsPerMessage < 0:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "pageSize and postsPerMessage must not be negative")
+        rows = self.matching_post_rows(request, start)
+        page = itertools.islice(rows, request.pageSize or None)
+        pending = None
+        while True:
+            batch = list(itertools.islice(page, request.postsPerMessage or 1))
+            if not batch:
+                break
+            if pending:
+                yield pending
+            if request.postsPerMessage:
+                pending = reddit_pb2.PostResponse(posts=[self.posts.message(row) for row in batch])
+            else:
+                pending = reddit_pb2.PostResponse(post=self.posts.message(batch[0]))
+        if pending:
+            next_row = next(rows, None) if request.pageSize else None
+            if next_row is not None:
+                pending.nextCursor = encode_cursor(next_row)
+            yield pending
+
+    def matching_post_rows(self, request, start):
+        """Rows from `start` on that pass the ListPosts filters, in ascending order."""
+        if request.subredditId:
+            # Only the subreddit's own index is walked, never the whole table
+            index = self.posts.by_subreddit.get(self.strings.code(request.subredditId), ())
+            rows = (index[i] for i in range(bisect.bisect_left(index, start), len(index)))
+        else:
+            rows = iter(range(start, len(self.posts)))
+        if request.HasField('state'):
+            states = self.posts.states
+            rows = (row for row in rows if states[row] == request.state)
+        return rows
 
     def CreateComment(self, request, context):
         current_time = datetime.datetime.now()
         formatted_time = current_time.strftime("%Y-%m-%dT%H:%M")
+        comment = self.new_comment(request, formatted_time)
+        if comment is None:
+            return reddit_pb2.CreateCommentResponse(success=False, message="Root not found", comment=None)
+        self.insert_comment(comment)
+        self.wait_log()
+        # Return the response
+        return reddit_pb2.CreateCommentResponse(success=True, message="Comment created successfully", comment=comment)
+
+    def new_comment(self, request, formatted_time):
+        """Comment message for a create request, or None if its root does not exist."""
         # If the comment is under a post or another comment
         root_id = request.postId if request.HasField('postId') else request.commentId
         # Validate if the root (post or comment) exists
         if root_id not in (self.posts if request.HasField('postId') else self.comments):
-            return reddit_pb2.CreateCommentResponse(success=False, message="Root not found", comment=None)
-        # Create a new comment
-        comment = reddit_pb2.Comment(
-            id=str(len(self.comments) + 1),
+            return None
+        return reddit_pb2.Comment(
             content=request.content,
             postId=request.postId if request.HasField('postId') else None,
             commentId=request.commentId if request.HasField('commentId') else None,
@@ -79,152 +360,503 @@ class RedditService(reddit_pb2_grpc.RedditServiceServicer):
             state=request.state,
             publicationDate=formatted_time
         )
-        # Store the comment
-        self.comments[comment.id] = comment
-        # Return the response
-        return reddit_pb2.CreateCommentResponse(success=True, message="Comment created successfully", comment=comment)
+
+    def create_comments(self, requests):
+        """Create a batch of comments; returns their ids in request order, "" for rejected ones."""
+        formatted_time = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M")
+        comments = [self.new_comment(request, formatted_time) for request in requests]
+        created = [comment for comment in comments if comment]
+        self.insert_comments(created)
+        self.wait_log()
+        return [comment.id if comment else "" for comment in comments]
+
+    def insert_comments(self, comments, created=None):
+        """Store new (score 0) comments, linking each parent's children once per batch."""
+        rows = self.comments.extend(comments, self.link_new_comments, self.log_new_comments, created)
+        self.comment_search.extend((row, tokenize(comment.content)) for row, comment in zip(rows, comments))
+        return rows
+
+    def link_new_comments(self, rows):
+        # Called by the table before the rows can be found, like rank_new_posts
+        children = {}
+        for row in rows:
+            parent_kind = self.comments.parent_kinds[row]
+            children.setdefault((parent_kind, self.comments.parents[row]), []).append(row)
+        for (parent_kind, parent), child_rows in children.items():
+            if parent_kind == PARENT_POST:
+                self.post_comments.setdefault(parent, []).extend(child_rows)
+                self.post_rankings.setdefault(parent, ScoreIndex()).extend(child_rows)
+            else:
+                self.comment_replies.setdefault(parent, []).extend(child_rows)
+                self.reply_rankings.setdefault(parent, ScoreIndex()).extend(child_rows)
+
+    def BulkCreateComments(self, request_iterator, context):
+        ids = []
+        for batch in batches(request_iterator, self.BULK_BATCH_SIZE):
+            ids.extend(self.create_comments(batch))
+        return self.bulk_response(ids)
+
+    def insert_comment(self, comment, created=None):
+        # Store the comment and link it under its root
+        return self.insert_comments((comment,), None if created is None else (created,))[0]
 
     def GetComment(self, request, context):
-        comment = self.comments.get(request.id)
-        if comment:
-            return reddit_pb2.CommentResponse(comment=comment)
+        row = self.comments.row(request.id)
+        if row is not None:
+            return reddit_pb2.CommentResponse(comment=self.comments.message(row))
         else:
             context.abort(grpc.StatusCode.NOT_FOUND, "Comment not found")
 
-    
+    def get_comment_bytes(self, comment_id):
+        """Serialized CommentResponse for a comment id, or None if it does not exist."""
+        row = self.comments.row(comment_id)
+        if row is None:
+            return None
+        return self.cached_response(('commentId', comment_id), lambda: reddit_pb2.CommentResponse(comment=self.comments.message(row)))
+
+    def cached_response(self, key, build):
+        data = self.response_cache.get(key)
+        if data is None:
+            # Filled under the vote lock: a vote landing between reading the
+            # score and storing the bytes would otherwise leave a stale entry
+            with self.votes.lock_for(key):
+                data = build().SerializeToString()
+                self.response_cache.put(key, data)
+        return data
 
     def ListComments(self, request, context):
-        for comment_id, comment in self.comments.items():
-            if comment.postId == request.postId:
-                yield reddit_pb2.CommentResponse(comment=comment)
+        for row in self.post_comments.get(self.posts.row(request.postId), []):
+            yield reddit_pb2.CommentResponse(comment=self.comments.message(row))
+
+    def top_comments(self, post_row, n):
+        """Rows of the n highest scored comments directly under a post."""
+        ranking = self.post_rankings.get(post_row)
+        return ranking.top(n) if ranking else []
+
+    def top_replies(self, comment_row, n):
+        """Rows of the n highest scored replies to a comment."""
+        ranking = self.reply_rankings.get(comment_row)
+        return ranking.top(n) if ranking else []
+
+    def parent_ranking(self, comment_row):
+        parent = self.comments.parents[comment_row]
+        if self.comments.parent_kinds[comment_row] == PARENT_POST:
+            return self.post_rankings.get(parent)
+        return self.reply_rankings.get(parent)
+
+    def vote_post(self, post_id, delta, wait=True, votes=1):
+        """Apply delta, the net of `votes` votes, to a post's score; returns the new score or None if missing."""
+        row = self.posts.row(post_id)
+        if row is None:
+            return None
+        score = self.votes.apply(('postId', post_id), self.posts, row, delta, self.on_post_score)
+        if votes:
+            self.post_velocity.record(row, votes)
+        self.log(wal.POST_VOTE, encode_vote(post_id, delta), wait)
+        return score
+
+    def vote_comment(self, comment_id, delta, wait=True, votes=1):
+        """Apply delta, the net of `votes` votes, to a comment's score; returns the new score or None if missing."""
+        row = self.comments.row(comment_id)
+        if row is None:
+            return None
+        score = self.votes.apply(('commentId', comment_id), self.comments, row, delta, self.on_comment_score)
+        if votes:
+            self.comment_velocity.record(row, votes)
+        self.log(wal.COMMENT_VOTE, encode_vote(comment_id, delta), wait)
+        return score
+
+    def on_post_score(self, row, score):
+        hot = self.post_hot_score(row)
+        self.hot_posts.update(row, hot)
+        self.hot_by_subreddit[self.posts.subreddits[row]].update(row, hot)
+        if self.response_cache:
+            self.response_cache.invalidate(('postId', self.posts.id_of(row)))
+        self.updates.publish(('postId', self.posts.id_of(row)), score)
+
+    def on_comment_score(self, row, score):
+        ranking = self.parent_ranking(row)
+        if ranking:
+            ranking.update(row, score)
+        if self.response_cache:
+            self.response_cache.invalidate(('commentId', self.comments.id_of(row)))
+        self.updates.publish(('commentId', self.comments.id_of(row)), score)
 
     def VotePost(self, request, context):
-        # Check if the post exists
-        if request.postId not in self.posts:
-            return reddit_pb2.VotePostResponse(success=False, message="Post not found!", updatedScore=None)
-
-        # Retrieve the post
-        post = self.posts[request.postId]
-
         # Update the score based on the vote type
-        if request.voteType == reddit_pb2.VoteType.UPVOTE:
-            post.score += 1
-        elif request.voteType == reddit_pb2.VoteType.DOWNVOTE:
-            post.score -= 1
-
-        self.posts[request.postId] = post
+        score = self.vote_post(request.postId, vote_delta(request.voteType))
+        if score is None:
+            return reddit_pb2.VotePostResponse(success=False, message="Post not found!", updatedScore=None)
 
-        return reddit_pb2.VotePostResponse(success=True, message="Score updated for the post!",updatedScore=post.score)
+        return reddit_pb2.VotePostResponse(success=True, message="Score updated for the post!",updatedScore=score)
 
     def VoteComment(self, request, context):
-        # Check if the post exists
-        if request.commentId not in self.comments:
-            return reddit_pb2.VoteCommentResponse(success=False, message="Comment not found!", updatedScore=None)
-
-        # Retrieve the post
-        comment = self.comments[request.commentId]
-
         # Update the score based on the vote type
-        if request.voteType == reddit_pb2.VoteType.UPVOTE:
-            comment.score += 1
-        elif request.voteType == reddit_pb2.VoteType.DOWNVOTE:
-            comment.score -= 1
-
-        self.comments[request.commentId] = comment
+        score = self.vote_comment(request.commentId, vote_delta(request.voteType))
+        if score is None:
+            return reddit_pb2.VoteCommentResponse(success=False, message="Comment not found!", updatedScore=None)
 
-        return reddit_pb2.VotePostResponse(success=True, message="Score updated for the comment!",updatedScore=comment.score)
+        return reddit_pb2.VotePostResponse(success=True, message="Score updated for the comment!",updatedScore=score)
+
+    def aggregate_votes(self, requests, deltas=None):
+        """Sum a stream of VoteBatchRequests into [net delta, vote count] per target."""
+        deltas = {} if deltas is None else deltas
+        for request in requests:
+            target = request.WhichOneof('target')
+            if target:
+                totals = deltas.setdefault((target, getattr(request, target)), [0, 0])
+                totals[0] += vote_delta(request.voteType)
+                totals[1] += 1
+        return deltas
+
+    def apply_vote_batch(self, deltas):
+        """Apply aggregated deltas once per target and report the final scores."""
+        scores = []
+        applied = skipped = 0
+        for (target, item_id), (delta, count) in deltas.items():
+            if target == 'postId':
+                score = self.vote_post(item_id, delta, wait=False, votes=count)
+            else:
+                score = self.vote_comment(item_id, delta, wait=False, votes=count)
+            if score is None:
+                skipped += count
+                continue
+            applied += count
+            scores.append(reddit_pb2.ScoreUpdate(score=score, **{target: item_id}))
+        # One durability wait covers the whole batch
+        if self.wal:
+            self.wal.wait_all()
+        return reddit_pb2.VoteBatchResponse(success=True, message="Votes applied!", votesApplied=applied, votesSkipped=skipped, scores=scores)
+
+    def VoteBatch(self, request_iterator, context):
+        return self.apply_vote_batch(self.aggregate_votes(request_iterator))
+
+    def GetHotPosts(self, request, context):
+        if request.count < 0:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "count must not be negative")
+        count = min(request.count or HOT_POSTS_DEFAULT, HOT_POSTS_LIMIT)
+        if request.subredditId:
+            ranking = self.hot_by_subreddit.get(self.strings.code(request.subredditId))
+        else:
+            ranking = self.hot_posts
+        posts = [self.posts.message(row) for row in ranking.top(count)] if ranking else []
+        return reddit_pb2.GetHotPostsResponse(success=True, message="Hot posts fetched successfully!", posts=posts)
+
+    def GetTrending(self, request, context):
+        if not 0 <= request.minutes <= TRENDING_WINDOW_MINUTES or request.count < 0:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"minutes must be 0 to {TRENDING_WINDOW_MINUTES} and count not negative")
+        minutes = request.minutes or TRENDING_DEFAULT_MINUTES
+        count = min(request.count or TRENDING_DEFAULT_COUNT, TRENDING_LIMIT)
+        kind, table, tracker = ('comment', self.comments, self.comment_velocity) if request.comments else ('post', self.posts, self.post_velocity)
+        items = [reddit_pb2.TrendingItem(votes=votes, votesPerMinute=votes / minutes, **{kind: table.message(row)})
+                 for row, votes in tracker.top(count, minutes)]
+        return reddit_pb2.GetTrendingResponse(success=True, message="Trending items fetched successfully!", items=items)
+
+    def search(self, request, context, index, table):
+        """One page of search results as (messages, relevances, next cursor)."""
+        if request.pageSize < 0:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "pageSize must not be negative")
+        page_size = min(request.pageSize or SEARCH_DEFAULT_PAGE, SEARCH_PAGE_LIMIT)
+        try:
+            offset = decode_cursor(request.cursor)[0] if request.cursor else 0
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        # One result past the page tells whether there is a next one
+        ranked = index.search(tokenize(request.query), table.scores, offset + page_size + 1)
+        page = ranked[offset:offset + page_size]
+        next_cursor = encode_cursor(offset + page_size) if len(ranked) > offset + page_size else ""
+        return [table.message(row) for row, _ in page], [relevance for _, relevance in page], next_cursor
+
+    def SearchPosts(self, request, context):
+        posts, relevance, next_cursor = self.search(request, context, self.post_search, self.posts)
+        return reddit_pb2.SearchPostsResponse(success=True, message="Search completed", posts=posts,
+                                              relevance=relevance, nextCursor=next_cursor)
+
+    def SearchComments(self, request, context):
+        comments, relevance, next_cursor = self.search(request, context, self.comment_search, self.comments)
+        return reddit_pb2.SearchCommentsResponse(success=True, message="Search completed", comments=comments,
+                                                 relevance=relevance, nextCursor=next_cursor)
+
+    def comments_with_replies(self, post_row, request):
+        """Yield CommentWithReplies for a post's top comments, replies highest score first."""
+        replies_per_comment = request.repliesPerComment or None
+        for row in self.top_comments(post_row, request.numberOfComments):
+            replies = [self.comments.message(reply_row) for reply_row in self.top_replies(row, replies_per_comment)]
+            yield reddit_pb2.CommentWithReplies(comment=self.comments.message(row), replies=replies)
 
     def GetTopComments(self, request, context):
         # Check if the post exists
         if request.postId not in self.posts:
             return reddit_pb2.GetTopCommentsResponse(success=False, message="Post not found!", comments=None)
 
-        # Filter and sort comments for the given post
-        comments_for_post = [comment for comment_id, comment in self.comments.items() if comment.postId == request.postId]
-        sorted_comments = sorted(comments_for_post, key=lambda c: c.score, reverse=True)
-
-        # Prepare the response
-        response_comments = []
-        for comment in sorted_comments[:request.numberOfComments]:
-            # Fetch replies for each comment
-            replies = [c for c_id, c in self.comments.items() if c.commentId == comment.id]
-            response_comments.append(reddit_pb2.CommentWithReplies(comment=comment, replies=replies))
+        # Prepare the response from the post's score-ordered comments
+        response_comments = list(self.comments_with_replies(self.posts.row(request.postId), request))
 
         # Return the response
         return reddit_pb2.GetTopCommentsResponse(success=True, message="Top comments fetched successfully!",comments=response_comments)
+
+    def StreamTopComments(self, request, context):
+        post_row = self.posts.row(request.postId)
+        if post_row is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, "Post not found!")
+        yield from self.comments_with_replies(post_row, request)
     
-    def fetch_comments(self, comment_id, level, numberOfComments):
-        if level > 2:
-            return None
-        comment = self.comments.get(comment_id)
-        if comment:
-            # Fetch all replies and sort them by score in descending order
-            all_replies = [self.comments[reply_id] for reply_id in self.comments if self.comments[reply_id].commentId == comment_id]
-            sorted_replies = sorted(all_replies, key=lambda x: x.score, reverse=True)
-
-            # Fetch the top N replies based on numberOfComments
-            top_replies = sorted_replies[:numberOfComments]
-
-            # CommentTree for each valid reply
-            replies = []
-            for reply in top_replies:
-                nested_reply_tree = self.fetch_comments(reply.id, level + 1, numberOfComments)
-                if nested_reply_tree:
-                    replies.append(nested_reply_tree)
-
-            # CommentTree object for the current comment
-            comment_tree = reddit_pb2.CommentTree(comment=comment, replies=replies)
-            return comment_tree
-        return None
+    def walk_branch(self, comment_row, request):
+        """Yield (row, parent row, depth) for a comment branch in depth-first order.
+
+        Iterative over the reply rankings: the stack only ever holds row
+        numbers, so arbitrarily deep threads cost neither recursion nor
+        memory for the nodes already emitted.
+        """
+        max_depth = request.maxDepth or 1
+        stack = [(comment_row, None, 0)]
+        emitted = 0
+        while stack and (not request.maxNodes or emitted < request.maxNodes):
+            row, parent, depth = stack.pop()
+            yield row, parent, depth
+            emitted += 1
+            if depth < max_depth:
+                # Reversed so the highest scored reply is popped (emitted) first
+                children = self.top_replies(row, request.numberOfComments)
+                stack.extend((child, row, depth + 1) for child in reversed(children))
+
+    def branch_root(self, request, context):
+        if request.maxDepth < 0 or request.maxNodes < 0:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "maxDepth and maxNodes must not be negative")
+        row = self.comments.row(request.parentCommentId)
+        if row is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, "No comments found")
+        return row
 
     def ExpandCommentBranch(self, request, context):
-        parent_comment_tree = self.fetch_comments(request.parentCommentId, 1, request.numberOfComments)
-
-        if not parent_comment_tree:
-            context.abort(grpc.StatusCode.NOT_FOUND, "No comments found")
+        if request.maxDepth > MAX_TREE_DEPTH:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"maxDepth above {MAX_TREE_DEPTH} is only supported by StreamCommentBranch")
+        trees = {}
+        for row, parent, _ in self.walk_branch(self.branch_root(request, context), request):
+            comment = self.comments.message(row)
+            trees[row] = reddit_pb2.CommentTree(comment=comment) if parent is None else trees[parent].replies.add(comment=comment)
+        parent_comment_tree = next(iter(trees.values()))
 
         return reddit_pb2.ExpandCommentBranchResponse(
             success=True,
             message="Comment branch expanded",
             comments=[parent_comment_tree]
         )
+
+    def StreamCommentBranch(self, request, context):
+        """Flattened ExpandCommentBranch: one CommentNode per comment, sent as the walk reaches it."""
+        for row, parent, depth in self.walk_branch(self.branch_root(request, context), request):
+            parent_id = self.comments.id_of(parent) if parent is not None else ""
+            yield reddit_pb2.CommentNode(comment=self.comments.message(row), parentId=parent_id, depth=depth)
+
+    def GetServerStats(self, request, context):
+        return server_stats(self.metrics, self.response_cache)
+
+    def GetThreadSummary(self, request, context):
+        post_row = self.posts.row(request.postId)
+        if post_row is None:
+            return reddit_pb2.GetThreadSummaryResponse(success=False, message="Post not found!")
+        comments = []
+        for row in self.top_comments(post_row, request.numberOfComments):
+            replies = [reddit_pb2.CommentTree(comment=self.comments.message(reply_row))
+                       for reply_row in self.top_replies(row, request.numberOfReplies)]
+            comments.append(reddit_pb2.CommentTree(comment=self.comments.message(row), replies=replies))
+        return reddit_pb2.GetThreadSummaryResponse(success=True, message="Thread summary fetched successfully!",
+                                                   post=self.posts.message(post_row), comments=comments)
+
+    def watch(self, subscriber, request):
+        """Subscribe to the item in a MonitorRequest and queue its current score.
+
+        Returns a (StatusCode, details) error, or None on success.
+        """
+        kind = request.WhichOneof('request_type')
+        if kind is None:
+            return None
+        item_id = getattr(request, kind)
+        table, label = (self.posts, "Post") if kind == 'postId' else (self.comments, "Comment")
+        row = table.row(item_id)
+        if row is None:
+            return grpc.StatusCode.NOT_FOUND, f"{label} with ID {item_id} not found"
+        key = (kind, item_id)
+        if not self.updates.subscribe(subscriber, key):
+            return grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many items monitored on one stream"
+        # Read under the vote lock so a concurrent vote cannot be overwritten by an older score
+        with self.votes.lock_for(key):
+            subscriber.offer(key, table.scores[row])
+        return None
+
+    def read_monitor_requests(self, subscriber, request_iterator):
+        try:
+            for request in request_iterator:
+                error = self.watch(subscriber, request)
+                if error:
+                    subscriber.fail(*error)
+                    return
+        except grpc.RpcError:
+            pass  # The client went away; the stream is torn down by its callback
+        finally:
+            subscriber.close()
+
     def MonitorUpdates(self, request_iterator, context):
-        for request in request_iterator:
-            if request.HasField('postId'):
-                post_id = request.postId
-                print("post_id")
-                # Logic to get the score of the post
-                if post_id in self.posts:
-                    score = self.posts[post_id].score
-                    yield reddit_pb2.ScoreUpdate(postId=post_id, score=score)
-                else:
-                    context.abort(grpc.StatusCode.NOT_FOUND, f"Post with ID {post_id} not found")
-
-            elif request.HasField('commentId'):
-                comment_id = request.commentId
-                # Logic to get the score of the comment
-                if comment_id in self.comments:
-                    score = self.comments[comment_id].score
-                    yield reddit_pb2.ScoreUpdate(commentId=comment_id, score=score)
-                else:
-                    context.abort(grpc.StatusCode.NOT_FOUND, f"Comment with ID {comment_id} not found")
+        """Push score changes for every item the client asks to monitor.
+
+        Each request adds a post or comment to the stream's watch list and
+        immediately yields its current score; later votes are pushed as they
+        happen, coalesced to the latest score per item and limited to
+        max_update_rate batches per second. The stream ends once the client
+        stops sending requests and pending updates have been flushed.
+        """
+        subscriber = ThreadSubscriber(self.max_update_rate)
+        context.add_callback(subscriber.close)
+        reader = threading.Thread(target=self.read_monitor_requests, args=(subscriber, request_iterator), daemon=True)
+        reader.start()
+        try:
+            while True:
+                subscriber.wait()
+                delay = subscriber.next_send_delay()
+                if delay:
+                    time.sleep(delay)
+                error, closed = subscriber.error, subscriber.closed
+                for (kind, item_id), score in subscriber.drain():
+                    yield reddit_pb2.ScoreUpdate(score=score, **{kind: item_id})
+                subscriber.mark_sent()
+                if error:
+                    context.abort(*error)
+                if closed or not context.is_active():
+                    return
+        finally:
+            self.updates.unsubscribe(subscriber)
+
+# Accept the keepalive pings pooled clients send on idle connections instead
+# of answering them with GOAWAY (too_many_pings)
+SERVER_OPTIONS = [
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.min_ping_interval_without_data_ms', 10000),
+    ('grpc.http2.max_ping_strikes', 0),
+]
+
+def build_server(port=50051, max_workers=10, service=None, max_update_rate=0, admission=None, maximum_concurrent_rpcs=None):
+    """Create (but do not start) a server; returns it with the bound port.
+
+    With an AdmissionInterceptor RPCs are shed by priority under load.
+    Beyond maximum_concurrent_rpcs queued and running RPCs every new one is
+    rejected with RESOURCE_EXHAUSTED before it reaches the thread pool.
+    """
+    service = service or RedditService(max_update_rate)
+    # The metrics interceptor goes first, so it records shed RPCs as well
+    interceptors = (MetricsInterceptor(service.metrics),) + ((admission,) if admission else ())
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers), interceptors=interceptors,
+                         options=SERVER_OPTIONS, maximum_concurrent_rpcs=maximum_concurrent_rpcs)
+    if service.response_cache:
+        # Generic handlers are consulted in registration order, so this one
+        # answers GetPost/GetComment before the generated servicer handlers
+        server.add_generic_rpc_handlers((CachedReadHandler(service),))
+    reddit_pb2_grpc.add_RedditServiceServicer_to_server(service, server)
+    bound_port = server.add_insecure_port(f'[::]:{port}')
+    return server, bound_port
 
 # Command line argument for port, else default      
-def serve(port=50051, max_workers=10):
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
-    reddit_pb2_grpc.add_RedditServiceServicer_to_server(RedditService(), server)
-    server.add_insecure_port(f'[::]:{port}')
+def serve(port=50051, max_workers=10, max_update_rate=0, shard_index=0, shard_count=1, use_async=False, wal_options=None,
+          response_cache_bytes=DEFAULT_CACHE_BYTES, metrics_file=None, metrics_interval=15, maximum_concurrent_rpcs=None,
+          rate_limit=0, rate_burst=None, shed=False):
+    write_ahead_log = WriteAheadLog(**wal_options) if wal_options else None
+    service = RedditService(max_update_rate, shard_index, shard_count, write_ahead_log, response_cache_bytes)
+    if metrics_file:
+        service.metrics.dump_periodically(metrics_file, metrics_interval)
+    if use_async:
+        # Admission control is a thread-pool interceptor, and grpc.aio accepts
+        # maximum_concurrent_rpcs without enforcing it: the CLI rejects those options
+        serve_async(service, port=port, options=SERVER_OPTIONS)
+        return
+    admission = AdmissionInterceptor(max_workers, rate_limit, rate_burst, shedding=shed) if shed or rate_limit else None
+    server, port = build_server(port, max_workers, service=service, admission=admission,
+                                maximum_concurrent_rpcs=maximum_concurrent_rpcs)
     server.start()
     print(f"Server started on port {port}")
     try:
         server.wait_for_termination()
     except KeyboardInterrupt:
         server.stop(0)
+    finally:
+        if write_ahead_log:
+            write_ahead_log.close()
+
+def serve_sharded(port=50051, shards=2, shard_base_port=None, max_workers=10, max_update_rate=0, use_async=False, wal_options=None,
+                  response_cache_bytes=DEFAULT_CACHE_BYTES, metrics_file=None, metrics_interval=15, maximum_concurrent_rpcs=None,
+                  rate_limit=0, rate_burst=None, shed=False):
+    """Run one server process per shard plus a routing front end on `port`.
+
+    Clients only reach the router, so admission control runs there; the
+    shards serve whatever the router lets through, without shedding any.
+    """
+    shard_base_port = shard_base_port or port + 1
+    addresses = [f'localhost:{shard_base_port + i}' for i in range(shards)]
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=serve, kwargs=dict(port=shard_base_port + i, max_workers=max_workers,
+                                                          max_update_rate=max_update_rate, shard_index=i,
+                                                          shard_count=shards, use_async=use_async,
+                                                          wal_options=wal_options and dict(wal_options, path=f"{wal_options['path']}.shard{i}"),
+                                                          response_cache_bytes=response_cache_bytes,
+                                                          metrics_file=metrics_file and f"{metrics_file}.shard{i}",
+                                                          metrics_interval=metrics_interval),
+                               daemon=True)
+               for i in range(shards)]
+    for worker in workers:
+        worker.start()
+    router = RedditRouter(addresses)
+    router.wait_ready(timeout=30)
+    if metrics_file:
+        router.metrics.dump_periodically(metrics_file, metrics_interval)
+    admission = AdmissionInterceptor(max_workers, rate_limit, rate_burst, shedding=shed) if shed or rate_limit else None
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers),
+                         interceptors=(MetricsInterceptor(router.metrics),) + ((admission,) if admission else ()),
+                         options=SERVER_OPTIONS, maximum_concurrent_rpcs=maximum_concurrent_rpcs)
+    reddit_pb2_grpc.add_RedditServiceServicer_to_server(router, server)
+    server.add_insecure_port(f'[::]:{port}')
+    server.start()
+    print(f"Router started on port {port} for {shards} shards on ports {shard_base_port}-{shard_base_port + shards - 1}")
+    try:
+        server.wait_for_termination()
+    except KeyboardInterrupt:
+        server.stop(0)
+    finally:
+        for worker in workers:
+            worker.terminate()
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Reddit gRPC Server")
     parser.add_argument('--port', type=int, default=50051, help="Port to listen on")
     parser.add_argument('--workers', type=int, default=10, help="Number of server workers")
+    parser.add_argument('--monitor-max-rate', type=float, default=0, help="Max score update batches per second per MonitorUpdates stream (0 = unlimited)")
+    parser.add_argument('--async', dest='use_async', action='store_true', help="Serve with grpc.aio on an asyncio event loop instead of a thread pool")
+    parser.add_argument('--shards', type=int, default=1, help="Number of shard processes behind a router (1 = single process)")
+    parser.add_argument('--shard-base-port', type=int, default=None, help="First shard port when --shards > 1 (default: --port + 1)")
+    parser.add_argument('--wal', default=None, help="Path of the write-ahead log; state is replayed from it on startup")
+    parser.add_argument('--wal-sync', choices=wal.SYNC_MODES, default='group', help="fsync policy: group commit, fsync every write, or never fsync")
+    parser.add_argument('--wal-group-ms', type=float, default=0, help="Extra time a group commit waits for more records, in milliseconds (0 = flush as soon as the previous fsync finishes)")
+    parser.add_argument('--wal-group-size', type=int, default=512, help="Records that trigger a group commit early")
+    parser.add_argument('--metrics-file', default=None, help="Periodically write RPC metrics to this file in Prometheus text format")
+    parser.add_argument('--metrics-interval', type=float, default=15, help="Seconds between metrics file rewrites")
+    parser.add_argument('--response-cache-mb', type=float, default=64, help="Size of the serialized GetPost/GetComment response cache in MB (0 = disabled)")
+    parser.add_argument('--max-concurrent-rpcs', type=int, default=0, help="Reject RPCs beyond this many queued and running ones (0 = unlimited; MonitorUpdates streams count too)")
+    parser.add_argument('--rate-limit', type=float, default=0, help="RPCs per second allowed per client, keyed on x-client-id metadata or address (0 = unlimited)")
+    parser.add_argument('--rate-burst', type=float, default=0, help="Token bucket size per client (0 = one second of --rate-limit)")
+    parser.add_argument('--shed', action='store_true', help="Shed load by priority, so expensive RPCs are turned away before cheap ones")
     args = parser.parse_args()
-
-    serve(port=args.port, max_workers=args.workers)
+    if args.use_async and args.shards == 1 and (args.shed or args.rate_limit or args.rate_burst or args.max_concurrent_rpcs):
+        parser.error("--shed, --rate-limit, --rate-burst and --max-concurrent-rpcs need the thread-pool server; "
+                     "drop --async, or add --shards to apply them on the router")
+
+    wal_options = args.wal and dict(path=args.wal, sync=args.wal_sync, group_window=args.wal_group_ms / 1000, group_size=args.wal_group_size)
+    if args.shards > 1:
+        serve_sharded(port=args.port, shards=args.shards, shard_base_port=args.shard_base_port, max_workers=args.workers,
+                      max_update_rate=args.monitor_max_rate, use_async=args.use_async, wal_options=wal_options,
+                      response_cache_bytes=int(args.response_cache_mb * 1024 * 1024), metrics_file=args.metrics_file,
+                      metrics_interval=args.metrics_interval, maximum_concurrent_rpcs=args.max_concurrent_rpcs or None,
+                      rate_limit=args.rate_limit, rate_burst=args.rate_burst or None, shed=args.shed)
+    else:
+        serve(port=args.port, max_workers=args.workers, max_update_rate=args.monitor_max_rate, use_async=args.use_async,
+              wal_options=wal_options, response_cache_bytes=int(args.response_cache_mb * 1024 * 1024),
+              metrics_file=args.metrics_file, metrics_interval=args.metrics_interval,
+              maximum_concurrent_rpcs=args.max_concurrent_rpcs or None, rate_limit=args.rate_limit,
+              rate_burst=args.rate_burst or None, shed=args.shed)
@@ -0,0 +1,944 @@
+import asyncio
+import errno
+import grpc
+import sys
+import os
+sys.path.insert(1, '../protos')
+import reddit_pb2
+import reddit_pb2_grpc
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from concurrent import futures
+from server import RedditService, build_server
+from async_server import build_async_server
+import wal
+from wal import WriteAheadLog
+from router import RedditRouter, shard_for_id, shard_for_key
+from trending import HeavyHitters, VelocityTracker
+from ranking import ScoreIndex
+from admission import AdmissionInterceptor
+import itertools
+
+class ServerTestCase(unittest.TestCase):
+    """An in-process server on an ephemeral port and a stub talking to it."""
+
+    THREADS = 10
+
+    def setUp(self):
+        self.service = self.make_service()
+        self.server, port = build_server(port=0, max_workers=self.THREADS, service=self.service)
+        self.server.start()
+        self.channel = grpc.insecure_channel(f'localhost:{port}')
+        self.stub = reddit_pb2_grpc.RedditServiceStub(self.channel)
+
+    def make_service(self):
+        return RedditService()
+
+    def tearDown(self):
+        self.channel.close()
+        self.server.stop(0)
+
+class ThreadTestCase(ServerTestCase):
+    """A server holding one post with a hot and a quiet comment."""
+
+    def setUp(self):
+        super().setUp()
+        self.post_id = self.stub.CreatePost(reddit_pb2.CreatePostRequest(title="Hot Post", content="Everyone votes here")).post.id
+        self.comment_id = self.stub.CreateComment(reddit_pb2.CreateCommentRequest(content="Hot comment", postId=self.post_id, authorId="test_user")).comment.id
+        self.quiet_id = self.stub.CreateComment(reddit_pb2.CreateCommentRequest(content="Quiet comment", postId=self.post_id, authorId="test_user")).comment.id
+
+class TestConcurrentVotes(ThreadTestCase):
+    THREADS = 16
+    VOTES_PER_THREAD = 200
+
+    def hammer(self, vote):
+        # Every thread sends two upvotes for each downvote
+        def worker(_):
+            for i in range(self.VOTES_PER_THREAD):
+                vote(reddit_pb2.DOWNVOTE if i % 3 == 2 else reddit_pb2.UPVOTE)
+        with futures.ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            list(pool.map(worker, range(self.THREADS)))
+
+    def expected_score(self):
+        downvotes = self.VOTES_PER_THREAD // 3
+        return self.THREADS * (self.VOTES_PER_THREAD - 2 * downvotes)
+
+    def test_hot_post_keeps_every_vote(self):
+        self.hammer(lambda vote_type: self.stub.VotePost(reddit_pb2.VotePostRequest(postId=self.post_id, voteType=vote_type)))
+        post = self.stub.GetPost(reddit_pb2.GetPostRequest(id=self.post_id)).post
+        self.assertEqual(post.score, self.expected_score())
+
+    def test_hot_comment_keeps_every_vote_and_ranking(self):
+        self.hammer(lambda vote_type: self.stub.VoteComment(reddit_pb2.VoteCommentRequest(commentId=self.comment_id, voteType=vote_type)))
+        top = self.stub.GetTopComments(reddit_pb2.GetTopCommentsRequest(postId=self.post_id, numberOfComments=2)).comments
+        self.assertEqual(top[0].comment.id, self.comment_id)
+        self.assertEqual(top[0].comment.score, self.expected_score())
+
+class TestMonitorUpdates(ThreadTestCase):
+    def test_monitor_updates_pushes_latest_score(self):
+        done = threading.Event()
+        subscribed = threading.Event()
+        def requests():
+            yield reddit_pb2.MonitorRequest(postId=self.post_id)
+            subscribed.set()
+            done.wait()
+        updates = []
+        def listen():
+            for update in self.stub.MonitorUpdates(requests()):
+                updates.append(update.score)
+                if update.score == 100:
+                    done.set()
+        listener = threading.Thread(target=listen)
+        listener.start()
+        subscribed.wait()
+        for _ in range(100):
+            self.stub.VotePost(reddit_pb2.VotePostRequest(postId=self.post_id, voteType=reddit_pb2.UPVOTE))
+        listener.join(timeout=10)
+        self.assertEqual(updates[-1], 100)
+        self.assertEqual(updates, sorted(updates))
+
+class TestThreadSummary(ThreadTestCase):
+    def test_thread_summary_orders_comments_and_replies(self):
+        self.stub.VoteComment(reddit_pb2.VoteCommentRequest(commentId=self.quiet_id, voteType=reddit_pb2.UPVOTE))
+        reply_ids = [self.stub.CreateComment(reddit_pb2.CreateCommentRequest(content=f"Reply {i}", commentId=self.quiet_id)).comment.id for i in range(3)]
+        self.stub.VoteComment(reddit_pb2.VoteCommentRequest(commentId=reply_ids[2], voteType=reddit_pb2.UPVOTE))
+        summary = self.stub.GetThreadSummary(reddit_pb2.GetThreadSummaryRequest(postId=self.post_id, numberOfComments=1, numberOfReplies=2))
+        self.assertEqual(summary.post.id, self.post_id)
+        self.assertEqual([tree.comment.id for tree in summary.comments], [self.quiet_id])
+        self.assertEqual([reply.comment.id for reply in summary.comments[0].replies], [reply_ids[2], reply_ids[0]])
+        self.assertFalse(self.stub.GetThreadSummary(reddit_pb2.GetThreadSummaryRequest(postId="missing")).success)
+
+class TestTopComments(ThreadTestCase):
+    def test_top_comments_bound_and_order_replies(self):
+        reply_ids = [self.stub.CreateComment(reddit_pb2.CreateCommentRequest(content=f"Reply {i}", commentId=self.comment_id)).comment.id for i in range(4)]
+        self.stub.VoteComment(reddit_pb2.VoteCommentRequest(commentId=reply_ids[3], voteType=reddit_pb2.UPVOTE))
+        self.stub.VoteComment(reddit_pb2.VoteCommentRequest(commentId=reply_ids[0], voteType=reddit_pb2.DOWNVOTE))
+        request = reddit_pb2.GetTopCommentsRequest(postId=self.post_id, numberOfComments=2, repliesPerComment=2)
+        top = self.stub.GetTopComments(request).comments
+        self.assertEqual([reply.id for reply in top[0].replies], [reply_ids[3], reply_ids[1]])
+        self.assertEqual(list(self.stub.StreamTopComments(request)), list(top))
+        # Zero keeps attaching every reply, now highest score first
+        request.repliesPerComment = 0
+        replies = self.stub.GetTopComments(request).comments[0].replies
+        self.assertEqual([reply.id for reply in replies], [reply_ids[3], reply_ids[1], reply_ids[2], reply_ids[0]])
+        with self.assertRaises(grpc.RpcError) as error:
+            list(self.stub.StreamTopComments(reddit_pb2.GetTopCommentsRequest(postId="missing")))
+        self.assertEqual(error.exception.code(), grpc.StatusCode.NOT_FOUND)
+
+class TestVoteBatch(ThreadTestCase):
+    def test_vote_batch_aggregates_votes(self):
+        votes = [reddit_pb2.VoteBatchRequest(postId=self.post_id, voteType=reddit_pb2.UPVOTE) for _ in range(1000)]
+        votes += [reddit_pb2.VoteBatchRequest(commentId=self.comment_id, voteType=reddit_pb2.DOWNVOTE) for _ in range(10)]
+        votes.append(reddit_pb2.VoteBatchRequest(postId="missing", voteType=reddit_pb2.UPVOTE))
+        response = self.stub.VoteBatch(iter(votes))
+        self.assertEqual(response.votesApplied, 1010)
+        self.assertEqual(response.votesSkipped, 1)
+        scores = {update.WhichOneof('item'): update.score for update in response.scores}
+        self.assertEqual(scores, {'postId': 1000, 'commentId': -10})
+
+class TestIdAllocation(ServerTestCase):
+    THREADS = 16
+    CREATES_PER_THREAD = 50
+
+    def test_concurrent_creates_get_distinct_ids(self):
+        stub = self.stub
+        post_id = stub.CreatePost(reddit_pb2.CreatePostRequest(title="Root")).post.id
+
+        def worker(thread):
+            created = []
+            for i in range(self.CREATES_PER_THREAD):
+                title = f"{thread}-{i}"
+                created.append((stub.CreatePost(reddit_pb2.CreatePostRequest(title=title)).post.id, title))
+                created.append((stub.CreateComment(reddit_pb2.CreateCommentRequest(content=title, postId=post_id)).comment.id, title))
+            return created
+        with futures.ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            created = [item for items in pool.map(worker, range(self.THREADS)) for item in items]
+
+        post_ids, comment_ids = created[0::2], created[1::2]
+        self.assertEqual(len({item_id for item_id, _ in post_ids}), len(post_ids))
+        self.assertEqual(len({item_id for item_id, _ in comment_ids}), len(comment_ids))
+        for item_id, title in post_ids:
+            self.assertEqual(stub.GetPost(reddit_pb2.GetPostRequest(id=item_id)).post.title, title)
+        for item_id, content in comment_ids:
+            self.assertEqual(stub.GetComment(reddit_pb2.GetCommentRequest(id=item_id)).comment.content, content)
+
+    def test_non_canonical_ids_are_not_found(self):
+        service = RedditService(shard_index=1, shard_count=2)
+        post_id = service.posts.message(service.insert_post(reddit_pb2.Post(title="Only"))).id
+        self.assertEqual(post_id, "2")
+        for item_id in ("02", " 2", "1", "4", "x", ""):
+            self.assertIsNone(service.posts.row(item_id))
+
+class TestBulkCreate(ServerTestCase):
+    def test_ids_come_back_in_request_order(self):
+        posts = [reddit_pb2.CreatePostRequest(title=f"Post {i}", subredditId=f"sub{i % 3}") for i in range(2500)]
+        response = self.stub.BulkCreatePosts(iter(posts))
+        self.assertEqual((response.created, response.rejected), (2500, 0))
+        for i in (0, 999, 1000, 2499):
+            self.assertEqual(self.stub.GetPost(reddit_pb2.GetPostRequest(id=response.ids[i])).post.title, f"Post {i}")
+
+        post_id = response.ids[0]
+        comments = [reddit_pb2.CreateCommentRequest(content=f"Comment {i}", postId=post_id) for i in range(3)]
+        comments.insert(1, reddit_pb2.CreateCommentRequest(content="Orphan", postId="missing"))
+        response = self.stub.BulkCreateComments(iter(comments))
+        self.assertEqual((response.created, response.rejected), (3, 1))
+        self.assertEqual(response.ids[1], "")
+        listed = [r.comment.id for r in self.stub.ListComments(reddit_pb2.ListCommentsRequest(postId=post_id))]
+        self.assertEqual(listed, [response.ids[0]] + list(response.ids[2:]))
+        top = self.stub.GetTopComments(reddit_pb2.GetTopCommentsRequest(postId=post_id, numberOfComments=5)).comments
+        self.assertEqual(len(top), 3)
+
+class TestCommentBranch(ServerTestCase):
+    DEPTH = 3000
+
+    def make_service(self):
+        # A single chain of replies far deeper than any recursion limit, plus one side reply
+        service = RedditService()
+        post = service.posts.message(service.insert_post(reddit_pb2.Post(title="Deep")))
+        parent = reddit_pb2.Comment(postId=post.id, content="Root")
+        service.insert_comment(parent)
+        self.chain = [parent.id]
+        for i in range(self.DEPTH):
+            reply = reddit_pb2.Comment(commentId=self.chain[-1], content=f"Level {i + 1}")
+            service.insert_comment(reply)
+            self.chain.append(reply.id)
+        side = reddit_pb2.Comment(commentId=self.chain[0], content="Side")
+        service.insert_comment(side)
+        self.side_id = side.id
+        return service
+
+    def test_stream_walks_the_whole_chain(self):
+        nodes = list(self.stub.StreamCommentBranch(reddit_pb2.ExpandCommentBranchRequest(
+            parentCommentId=self.chain[0], numberOfComments=2, maxDepth=self.DEPTH)))
+        self.assertEqual([node.comment.id for node in nodes], self.chain + [self.side_id])
+        self.assertEqual([node.depth for node in nodes[:3]], [0, 1, 2])
+        self.assertEqual(nodes[-1].depth, 1)
+        self.assertEqual(nodes[2].parentId, self.chain[1])
+        self.assertEqual(nodes[0].parentId, "")
+
+    def test_limits(self):
+        request = reddit_pb2.ExpandCommentBranchRequest(parentCommentId=self.chain[0], numberOfComments=2, maxDepth=3, maxNodes=3)
+        self.assertEqual([node.comment.id for node in self.stub.StreamCommentBranch(request)], self.chain[:3])
+        # Defaults keep the original shape: the comment and one level of replies
+        tree = self.stub.ExpandCommentBranch(reddit_pb2.ExpandCommentBranchRequest(parentCommentId=self.chain[0], numberOfComments=5)).comments[0]
+        self.assertEqual([reply.comment.id for reply in tree.replies], [self.chain[1], self.side_id])
+        self.assertFalse(tree.replies[0].replies)
+        tree = self.stub.ExpandCommentBranch(reddit_pb2.ExpandCommentBranchRequest(parentCommentId=self.chain[0], numberOfComments=1, maxDepth=50)).comments[0]
+        for expected in self.chain[1:51]:
+            tree = tree.replies[0]
+            self.assertEqual(tree.comment.id, expected)
+        self.assertFalse(tree.replies)
+        with self.assertRaises(grpc.RpcError) as error:
+            self.stub.ExpandCommentBranch(reddit_pb2.ExpandCommentBranchRequest(parentCommentId=self.chain[0], maxDepth=1000))
+        self.assertEqual(error.exception.code(), grpc.StatusCode.INVALID_ARGUMENT)
+
+class TestResponseCache(ServerTestCase):
+    def test_votes_invalidate_cached_responses(self):
+        post_id = self.stub.CreatePost(reddit_pb2.CreatePostRequest(title="Cached", content="Read often")).post.id
+        comment_id = self.stub.CreateComment(reddit_pb2.CreateCommentRequest(content="Also cached", postId=post_id, authorId="test_user")).comment.id
+        for score in range(3):
+            for _ in range(2):
+                self.assertEqual(self.stub.GetPost(reddit_pb2.GetPostRequest(id=post_id)).post.score, score)
+                self.assertEqual(self.stub.GetComment(reddit_pb2.GetCommentRequest(id=comment_id)).comment.score, -score)
+            self.stub.VotePost(reddit_pb2.VotePostRequest(postId=post_id, voteType=reddit_pb2.UPVOTE))
+            self.stub.VoteComment(reddit_pb2.VoteCommentRequest(commentId=comment_id, voteType=reddit_pb2.DOWNVOTE))
+        stats = self.service.response_cache.stats()
+        self.assertEqual(stats['hits'], 6)
+        self.assertEqual(stats['misses'], 6)
+        self.assertEqual(stats['invalidations'], 6)
+
+    def test_missing_items(self):
+        self.assertFalse(self.stub.GetPost(reddit_pb2.GetPostRequest(id="missing")).success)
+        with self.assertRaises(grpc.RpcError) as error:
+            self.stub.GetComment(reddit_pb2.GetCommentRequest(id="missing"))
+        self.assertEqual(error.exception.code(), grpc.StatusCode.NOT_FOUND)
+
+class ServedTestCase(unittest.TestCase):
+    """Serves RedditServices in process, alone or as two shards behind a router."""
+
+    def setUp(self):
+        self.servers = []
+        self.channels = []
+        self.logs = []
+
+    def start(self, service):
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+        reddit_pb2_grpc.add_RedditServiceServicer_to_server(service, server)
+        port = server.add_insecure_port('localhost:0')
+        server.start()
+        self.servers.append(server)
+        self.channels.append(grpc.insecure_channel(f'localhost:{port}'))
+        return f'localhost:{port}', reddit_pb2_grpc.RedditServiceStub(self.channels[-1])
+
+    def single_server(self):
+        return self.start(RedditService())[1]
+
+    def router(self, shards=2, log_paths=None):
+        """A router stub; with log_paths every shard keeps a write-ahead log at its path."""
+        if log_paths:
+            self.logs = [WriteAheadLog(path, sync='none') for path in log_paths]
+        addresses = [self.start(RedditService(shard_index=i, shard_count=shards, write_ahead_log=self.logs[i] if self.logs else None))[0]
+                     for i in range(shards)]
+        router = RedditRouter(addresses)
+        self.channels.extend(router.channels)
+        return self.start(router)[1]
+
+    def populate(self, stub):
+        for i in range(20):
+            stub.CreatePost(reddit_pb2.CreatePostRequest(title=f"Post {i}", subredditId=f"sub{i % 2}"))
+
+    def post_id(self, stub, title):
+        return next(r.post.id for r in stub.ListPosts(reddit_pb2.ListPostsRequest()) if r.post.title == title)
+
+    def stop(self):
+        for channel in self.channels:
+            channel.close()
+        for server in self.servers:
+            server.stop(0)
+        for log in self.logs:
+            log.close()
+        self.servers, self.channels, self.logs = [], [], []
+
+    def tearDown(self):
+        self.stop()
+
+class TestListPosts(ServedTestCase):
+    def read_all(self, stub, **filters):
+        # Follow nextCursor page by page and collect post titles
+        titles, cursor, pages = [], "", 0
+        while True:
+            responses = list(stub.ListPosts(reddit_pb2.ListPostsRequest(cursor=cursor, **filters)))
+            pages += 1
+            for response in responses:
+                titles.extend(post.title for post in response.posts or [response.post])
+            cursor = responses[-1].nextCursor if responses else ""
+            if not cursor:
+                return titles, pages
+
+    def check_pagination(self, stub):
+        everything = [post.title for post in (r.post for r in stub.ListPosts(reddit_pb2.ListPostsRequest()))]
+        self.assertEqual(len(everything), 20)
+        titles, pages = self.read_all(stub, pageSize=3, postsPerMessage=2)
+        self.assertEqual(titles, everything)
+        self.assertEqual(pages, 7)
+        titles, _ = self.read_all(stub, subredditId="sub1", state=reddit_pb2.NORMAL, pageSize=2)
+        self.assertEqual(titles, [f"Post {i}" for i in range(1, 20, 2)])
+        # New posts are always NORMAL
+        self.assertEqual(self.read_all(stub, state=reddit_pb2.LOCKED, pageSize=4), ([], 1))
+        with self.assertRaises(grpc.RpcError) as error:
+            list(stub.ListPosts(reddit_pb2.ListPostsRequest(cursor="not a cursor")))
+        self.assertEqual(error.exception.code(), grpc.StatusCode.INVALID_ARGUMENT)
+
+    def test_single_server(self):
+        stub = self.single_server()
+        self.populate(stub)
+        self.check_pagination(stub)
+
+    def test_router_pages_across_shards(self):
+        stub = self.router()
+        self.populate(stub)
+        self.check_pagination(stub)
+
+class TestSearch(ServedTestCase):
+    def check_search(self, stub):
+        self.populate(stub)
+        for _ in range(3):
+            stub.VotePost(reddit_pb2.VotePostRequest(postId=self.post_id(stub, "Post 4"), voteType=reddit_pb2.UPVOTE))
+            stub.VotePost(reddit_pb2.VotePostRequest(postId=self.post_id(stub, "Post 7"), voteType=reddit_pb2.DOWNVOTE))
+        titles, cursor = [], ""
+        while True:
+            page = stub.SearchPosts(reddit_pb2.SearchRequest(query="POST", pageSize=3, cursor=cursor))
+            titles += [post.title for post in page.posts]
+            cursor = page.nextCursor
+            if not cursor:
+                break
+        self.assertEqual(sorted(titles), sorted(f"Post {i}" for i in range(20)))
+        # Every title matches equally well, so votes decide
+        self.assertEqual((titles[0], titles[-1]), ("Post 4", "Post 7"))
+        page = stub.SearchPosts(reddit_pb2.SearchRequest(query="post 13"))
+        self.assertEqual((page.posts[0].title, len(page.posts)), ("Post 13", 10))
+        self.assertTrue(page.nextCursor)
+        self.assertFalse(stub.SearchPosts(reddit_pb2.SearchRequest(query="nothing")).posts)
+
+        post_id = self.post_id(stub, "Post 1")
+        for content in ("Great thread", "Gravity is great, gravity is everything", "Unrelated"):
+            stub.CreateComment(reddit_pb2.CreateCommentRequest(content=content, postId=post_id))
+        page = stub.SearchComments(reddit_pb2.SearchRequest(query="gravity great"))
+        self.assertEqual([comment.content for comment in page.comments], ["Gravity is great, gravity is everything", "Great thread"])
+        self.assertGreater(page.relevance[0], page.relevance[1])
+        with self.assertRaises(grpc.RpcError) as error:
+            stub.SearchComments(reddit_pb2.SearchRequest(query="great", cursor="not a cursor"))
+        self.assertEqual(error.exception.code(), grpc.StatusCode.INVALID_ARGUMENT)
+
+    def test_single_server(self):
+        self.check_search(self.single_server())
+
+    def test_router_merges_shards(self):
+        self.check_search(self.router())
+
+class TestUserActivity(ServedTestCase):
+    def check_activity(self, stub):
+        created = []
+        for i in range(4):
+            post = stub.CreatePost(reddit_pb2.CreatePostRequest(title=f"Mine {i}", subredditId=f"sub{i}", authorId="alice")).post
+            created.append(('post', post.id))
+            for j in range(2):
+                comment = stub.CreateComment(reddit_pb2.CreateCommentRequest(content=f"Reply {i}.{j}", postId=post.id, authorId="alice")).comment
+                created.append(('comment', comment.id))
+        stub.CreateComment(reddit_pb2.CreateCommentRequest(content="Not mine", postId=post.id, authorId="bob"))
+        seen, cursor, pages = [], "", 0
+        while True:
+            page = list(stub.ListUserActivity(reddit_pb2.ListUserActivityRequest(userId="alice", pageSize=5, cursor=cursor)))
+            seen += page
+            pages += 1
+            cursor = page[-1].cursor if page else ""
+            if not cursor:
+                break
+        self.assertEqual(pages, 3)
+        items = [(activity.WhichOneof('item'), getattr(activity, activity.WhichOneof('item')).id) for activity in seen]
+        self.assertTrue(all(getattr(activity, activity.WhichOneof('item')).authorId == "alice" for activity in seen))
+        # Newest first across both kinds, finer than the publication minute
+        self.assertEqual(items, created[::-1])
+        self.assertFalse(list(stub.ListUserActivity(reddit_pb2.ListUserActivityRequest(userId="nobody"))))
+
+    def test_single_server(self):
+        self.check_activity(self.single_server())
+
+    def test_router_merges_shards(self):
+        self.check_activity(self.router())
+
+    def test_router_order_survives_restart(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        log_paths = [os.path.join(directory.name, f'shard{i}.wal') for i in range(2)]
+        stub = self.router(log_paths=log_paths)
+        for i in range(4):
+            stub.CreatePost(reddit_pb2.CreatePostRequest(title=f"Mine {i}", subredditId=f"sub{i}", authorId="alice"))
+        request = reddit_pb2.ListUserActivityRequest(userId="alice")
+        before = [(activity.post.title, activity.createdMicros) for activity in stub.ListUserActivity(request)]
+        self.assertEqual([title for title, _ in before], [f"Mine {i}" for i in reversed(range(4))])
+        self.stop()
+        # Replayed items keep their stamps, so the shards still merge newest first
+        stub = self.router(log_paths=log_paths)
+        self.assertEqual([(activity.post.title, activity.createdMicros) for activity in stub.ListUserActivity(request)], before)
+
+class TestHotPosts(ServedTestCase):
+    def check_front_pages(self, stub):
+        self.populate(stub)
+        for _ in range(10):
+            stub.VotePost(reddit_pb2.VotePostRequest(postId=self.post_id(stub, "Post 4"), voteType=reddit_pb2.UPVOTE))
+            stub.VotePost(reddit_pb2.VotePostRequest(postId=self.post_id(stub, "Post 7"), voteType=reddit_pb2.DOWNVOTE))
+        hot = [post.title for post in stub.GetHotPosts(reddit_pb2.GetHotPostsRequest()).posts]
+        self.assertEqual(len(hot), 20)
+        self.assertEqual((hot[0], hot[-1]), ("Post 4", "Post 7"))
+        hot = [post.title for post in stub.GetHotPosts(reddit_pb2.GetHotPostsRequest(subredditId="sub1", count=3)).posts]
+        self.assertEqual(len(hot), 3)
+        self.assertNotIn("Post 7", hot)
+        self.assertTrue(all(int(title.split()[1]) % 2 for title in hot))
+        self.assertEqual(stub.GetHotPosts(reddit_pb2.GetHotPostsRequest(subredditId="sub0", count=1)).posts[0].title, "Post 4")
+        self.assertFalse(stub.GetHotPosts(reddit_pb2.GetHotPostsRequest(subredditId="nothing")).posts)
+
+    def test_single_server(self):
+        self.check_front_pages(self.single_server())
+
+    def test_router_merges_shards(self):
+        self.check_front_pages(self.router())
+
+    def test_posts_are_ranked_before_votes_can_find_them(self):
+        service = RedditService()
+        rank_new_posts = service.rank_new_posts
+        seen = []
+        def rank_and_vote(rows):
+            # A vote racing the create: the post is not found yet, rather than half indexed
+            seen.append(service.vote_post(service.posts.id_of(rows[0]), 1))
+            rank_new_posts(rows)
+        service.rank_new_posts = rank_and_vote
+        post_id = service.posts.id_of(service.insert_post(reddit_pb2.Post(title="First", subredditId="new")))
+        service.create_posts([reddit_pb2.CreatePostRequest(title="Bulk", subredditId="other")] * 3)
+        self.assertEqual(seen, [None, None])
+        self.assertEqual(service.vote_post(post_id, 1), 1)
+        self.assertEqual(service.hot_by_subreddit[service.strings.code("new")].top(), [0])
+
+    def test_hot_indexes_follow_concurrent_votes(self):
+        service = RedditService()
+        done = threading.Event()
+        def vote():
+            # Keep voting on the id the next post will get
+            while not done.is_set():
+                service.vote_post(service.posts.next_id(), 1)
+        voters = [threading.Thread(target=vote) for _ in range(4)]
+        for voter in voters:
+            voter.start()
+        for i in range(300):
+            if i % 3:
+                service.insert_post(reddit_pb2.Post(title=f"Post {i}", subredditId=f"sub{i % 5}", publicationDate="2024-01-01T00:00"))
+            else:
+                service.create_posts([reddit_pb2.CreatePostRequest(title=f"Post {i}", subredditId=f"sub{i % 5}")] * 2)
+        done.set()
+        for voter in voters:
+            voter.join()
+        rows = range(len(service.posts))
+        self.assertTrue(any(service.posts.scores[row] for row in rows))
+        expected = sorted(rows, key=lambda row: -service.post_hot_score(row))
+        ranked = service.hot_posts.top()
+        self.assertEqual([service.post_hot_score(row) for row in ranked], [service.post_hot_score(row) for row in expected])
+        for code, ranking in service.hot_by_subreddit.items():
+            scores = [service.post_hot_score(row) for row in ranking.top()]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+            self.assertEqual(sorted(ranking.top()), [row for row in rows if service.posts.subreddits[row] == code])
+
+    def test_score_index_keeps_order_across_chunks(self):
+        class SmallChunks(ScoreIndex):
+            CHUNK_SIZE = 4
+        index = SmallChunks()
+        scores = {}
+        for start in range(0, 60, 15):
+            index.extend(range(start, start + 15), start % 4)
+            scores.update(dict.fromkeys(range(start, start + 15), start % 4))
+        for item_id in range(0, 60, 7):
+            index.add(100 + item_id, item_id % 5)
+            scores[100 + item_id] = item_id % 5
+        for item_id in range(0, 60, 4):
+            index.update(item_id, -item_id)
+            scores[item_id] = -item_id
+        ranked = index.top()
+        self.assertEqual(len(ranked), len(scores))
+        self.assertEqual([scores[item_id] for item_id in ranked], sorted(scores.values(), reverse=True))
+        self.assertEqual(index.top(10), ranked[:10])
+        self.assertTrue(all(len(chunk) <= 8 for chunk in index._chunks))
+
+class TestRouter(ServedTestCase):
+    SHARDS = 2
+
+    def setUp(self):
+        super().setUp()
+        self.shards = [self.start(RedditService(shard_index=i, shard_count=self.SHARDS)) for i in range(self.SHARDS)]
+        self.router = RedditRouter([address for address, _ in self.shards])
+        self.channels.extend(self.router.channels)
+        _, self.stub = self.start(self.router)
+        # One subreddit placed on each shard
+        names = (f"sub{i}" for i in itertools.count())
+        self.subreddits = [next(name for name in names if shard_for_key(name, self.SHARDS) == shard) for shard in range(self.SHARDS)]
+
+    def create_posts(self):
+        return [self.stub.CreatePost(reddit_pb2.CreatePostRequest(title=f"On {subreddit}", subredditId=subreddit)).post.id
+                for subreddit in self.subreddits]
+
+    def test_posts_and_replies_stay_on_their_shard(self):
+        post_ids = self.create_posts()
+        self.assertEqual([shard_for_id(post_id, self.SHARDS) for post_id in post_ids], list(range(self.SHARDS)))
+        for shard, post_id in enumerate(post_ids):
+            comment_id = self.stub.CreateComment(reddit_pb2.CreateCommentRequest(content="Top", postId=post_id)).comment.id
+            # Replies are routed by the comment they answer, which lives with its post
+            reply = self.stub.CreateComment(reddit_pb2.CreateCommentRequest(content="Reply", commentId=comment_id)).comment
+            self.assertEqual(shard_for_id(reply.id, self.SHARDS), shard)
+            shard_stub = self.shards[shard][1]
+            self.assertEqual(shard_stub.GetComment(reddit_pb2.GetCommentRequest(id=reply.id)).comment.commentId, comment_id)
+            branch = self.stub.ExpandCommentBranch(reddit_pb2.ExpandCommentBranchRequest(parentCommentId=comment_id, numberOfComments=5))
+            self.assertEqual([tree.comment.id for tree in branch.comments[0].replies], [reply.id])
+
+    def test_vote_batch_is_split_per_shard(self):
+        post_ids = self.create_posts()
+        votes = [reddit_pb2.VoteBatchRequest(postId=post_ids[0], voteType=reddit_pb2.UPVOTE)] * 3
+        votes += [reddit_pb2.VoteBatchRequest(postId=post_ids[1], voteType=reddit_pb2.DOWNVOTE)] * 2
+        votes.append(reddit_pb2.VoteBatchRequest(postId="999", voteType=reddit_pb2.UPVOTE))
+        response = self.stub.VoteBatch(iter(votes))
+        self.assertEqual((response.votesApplied, response.votesSkipped), (5, 1))
+        self.assertEqual({update.postId: update.score for update in response.scores}, {post_ids[0]: 3, post_ids[1]: -2})
+        for (_, shard_stub), post_id, score in zip(self.shards, post_ids, (3, -2)):
+            self.assertEqual(shard_stub.GetPost(reddit_pb2.GetPostRequest(id=post_id)).post.score, score)
+
+    def test_bulk_create_puts_ids_back_in_request_order(self):
+        requests = [reddit_pb2.CreatePostRequest(title=f"Post {i}", subredditId=self.subreddits[i % 3 % self.SHARDS]) for i in range(30)]
+        response = self.stub.BulkCreatePosts(iter(requests))
+        self.assertEqual((response.created, response.rejected), (30, 0))
+        for i, post_id in enumerate(response.ids):
+            self.assertEqual(shard_for_id(post_id, self.SHARDS), i % 3 % self.SHARDS)
+            self.assertEqual(self.stub.GetPost(reddit_pb2.GetPostRequest(id=post_id)).post.title, f"Post {i}")
+        comments = [reddit_pb2.CreateCommentRequest(content=f"Comment {i}", postId=response.ids[i]) for i in range(4)]
+        comments.insert(2, reddit_pb2.CreateCommentRequest(content="Orphan", postId="999"))
+        response = self.stub.BulkCreateComments(iter(comments))
+        self.assertEqual((response.created, response.rejected), (4, 1))
+        self.assertEqual(response.ids[2], "")
+        contents = [self.stub.GetComment(reddit_pb2.GetCommentRequest(id=comment_id)).comment.content for comment_id in response.ids if comment_id]
+        self.assertEqual(contents, [f"Comment {i}" for i in range(4)])
+
+    def test_monitor_updates_merges_shards(self):
+        post_ids = self.create_posts()
+        done = threading.Event()
+        subscribed = threading.Event()
+        def requests():
+            for post_id in post_ids:
+                yield reddit_pb2.MonitorRequest(postId=post_id)
+            subscribed.set()
+            done.wait(10)
+        latest = {}
+        def listen():
+            for update in self.stub.MonitorUpdates(requests()):
+                latest[update.postId] = update.score
+                if latest == {post_id: 2 for post_id in post_ids}:
+                    done.set()
+        listener = threading.Thread(target=listen)
+        listener.start()
+        subscribed.wait(10)
+        for post_id in post_ids:
+            for _ in range(2):
+                self.stub.VotePost(reddit_pb2.VotePostRequest(postId=post_id, voteType=reddit_pb2.UPVOTE))
+        listener.join(timeout=10)
+        self.assertEqual(latest, {post_id: 2 for post_id in post_ids})
+
+    def test_errors_pass_through(self):
+        cases = [
+            (grpc.StatusCode.NOT_FOUND, lambda: self.stub.GetComment(reddit_pb2.GetCommentRequest(id="999"))),
+            (grpc.StatusCode.NOT_FOUND, lambda: self.stub.GetUser(reddit_pb2.GetUserRequest(id="nobody"))),
+            (grpc.StatusCode.INVALID_ARGUMENT, lambda: list(self.stub.ListPosts(reddit_pb2.ListPostsRequest(subredditId=self.subreddits[1], cursor="not a cursor")))),
+            (grpc.StatusCode.INVALID_ARGUMENT, lambda: self.stub.GetTrending(reddit_pb2.GetTrendingRequest(minutes=61))),
+            (grpc.StatusCode.NOT_FOUND, lambda: list(self.stub.MonitorUpdates(iter([reddit_pb2.MonitorRequest(postId="999")])))),
+        ]
+        for code, call in cases:
+            with self.assertRaises(grpc.RpcError) as error:
+                call()
+            self.assertEqual(error.exception.code(), code)
+        self.stub.CreateUser(reddit_pb2.CreateUserRequest(id="user1", username="alice"))
+        with self.assertRaises(grpc.RpcError) as error:
+            self.stub.CreateUser(reddit_pb2.CreateUserRequest(id="user1", username="alice"))
+        self.assertEqual(error.exception.code(), grpc.StatusCode.ALREADY_EXISTS)
+
+class TestTrending(unittest.TestCase):
+    def test_heavy_hitters_keep_frequent_keys(self):
+        summary = HeavyHitters(capacity=10)
+        for i in range(10000):
+            summary.add("hot" if i % 4 == 0 else f"cold{i}")
+        self.assertLessEqual(len(summary.counts), 10)
+        # Never overcounted, and short by at most total / (capacity + 1)
+        self.assertLessEqual(summary.counts["hot"], 2500)
+        self.assertGreaterEqual(summary.counts["hot"], 2500 - 10000 // 11)
+
+    def test_window_rolls_over(self):
+        now = [0.0]
+        tracker = VelocityTracker(buckets=5, capacity=10, clock=lambda: now[0])
+        tracker.record("a", 3)
+        now[0] = 60
+        tracker.record("b", 2)
+        tracker.record("a")
+        self.assertEqual(tracker.top(5, 2), [("a", 4), ("b", 2)])
+        self.assertEqual(tracker.top(5, 1), [("b", 2), ("a", 1)])
+        now[0] = 120
+        tracker.record("b", 5)
+        self.assertEqual(tracker.top(1, 2), [("b", 7)])
+        # Five minutes on, the slot of minute 0 is reused and its votes are gone
+        now[0] = 300
+        tracker.record("c")
+        self.assertEqual(dict(tracker.top(5, 5)), {"b": 7, "a": 1, "c": 1})
+
+    def test_cached_windows_are_bounded(self):
+        now = [120.0]
+        tracker = VelocityTracker(capacity=10, cached_windows=2, clock=lambda: now[0])
+        tracker.record("a", 2)
+        for minutes in range(1, 61):
+            tracker.top(5, minutes)
+        self.assertEqual(list(tracker._closed), [59, 60])
+        # The most recently asked length stays cached, the least recent is dropped
+        tracker.top(5, 59)
+        tracker.top(5, 3)
+        self.assertEqual(list(tracker._closed), [59, 3])
+        self.assertEqual(tracker.top(5, 3), [("a", 2)])
+
+    def test_get_trending(self):
+        server, port = build_server(port=0)
+        server.start()
+        with grpc.insecure_channel(f'localhost:{port}') as channel:
+            stub = reddit_pb2_grpc.RedditServiceStub(channel)
+            post_ids = [stub.CreatePost(reddit_pb2.CreatePostRequest(title=f"Post {i}")).post.id for i in range(3)]
+            comment_id = stub.CreateComment(reddit_pb2.CreateCommentRequest(content="Comment", postId=post_ids[0])).comment.id
+            stub.VoteBatch(iter([reddit_pb2.VoteBatchRequest(postId=post_ids[2], voteType=reddit_pb2.DOWNVOTE)] * 5))
+            stub.VotePost(reddit_pb2.VotePostRequest(postId=post_ids[1], voteType=reddit_pb2.UPVOTE))
+            stub.VoteComment(reddit_pb2.VoteCommentRequest(commentId=comment_id, voteType=reddit_pb2.UPVOTE))
+            items = stub.GetTrending(reddit_pb2.GetTrendingRequest(minutes=5)).items
+            self.assertEqual([(item.post.id, item.votes) for item in items], [(post_ids[2], 5), (post_ids[1], 1)])
+            self.assertAlmostEqual(items[0].votesPerMinute, 1.0)
+            items = stub.GetTrending(reddit_pb2.GetTrendingRequest(comments=True)).items
+            self.assertEqual([item.comment.id for item in items], [comment_id])
+            with self.assertRaises(grpc.RpcError) as error:
+                stub.GetTrending(reddit_pb2.GetTrendingRequest(minutes=61))
+            self.assertEqual(error.exception.code(), grpc.StatusCode.INVALID_ARGUMENT)
+        server.stop(0)
+
+class TestAdmission(unittest.TestCase):
+    def start(self, admission):
+        self.server, port = build_server(port=0, max_workers=4, admission=admission)
+        self.server.start()
+        self.channel = grpc.insecure_channel(f'localhost:{port}')
+        self.stub = reddit_pb2_grpc.RedditServiceStub(self.channel)
+
+    def assertShed(self, call, *args, **kwargs):
+        with self.assertRaises(grpc.RpcError) as error:
+            call(*args, **kwargs)
+        self.assertEqual(error.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+
+    def test_token_bucket_per_client(self):
+        now = [0.0]
+        self.start(AdmissionInterceptor(4, rate=1, burst=3, clock=lambda: now[0]))
+        request = reddit_pb2.GetPostRequest(id="1")
+        for _ in range(3):
+            self.stub.GetPost(request)
+        self.assertShed(self.stub.GetPost, request)
+        # Another client has its own bucket, and expensive RPCs cost more than one token
+        self.stub.GetPost(request, metadata=(('x-client-id', 'other'),))
+        self.assertShed(lambda: list(self.stub.ListPosts(reddit_pb2.ListPostsRequest(), metadata=(('x-client-id', 'other'),))))
+        now[0] += 1
+        self.stub.GetPost(request)
+
+    def test_expensive_rpcs_are_shed_first(self):
+        admission = AdmissionInterceptor(4)
+        self.start(admission)
+        post_id = self.stub.CreatePost(reddit_pb2.CreatePostRequest(title="Busy")).post.id
+        # As if two of the four workers were busy: the expensive share is used up, the others are not
+        admission.running = 2
+        self.assertShed(self.stub.GetTopComments, reddit_pb2.GetTopCommentsRequest(postId=post_id))
+        self.assertShed(lambda: list(self.stub.ListPosts(reddit_pb2.ListPostsRequest())))
+        self.assertTrue(self.stub.GetPost(reddit_pb2.GetPostRequest(id=post_id)).success)
+        self.assertTrue(self.stub.VotePost(reddit_pb2.VotePostRequest(postId=post_id, voteType=reddit_pb2.UPVOTE)).success)
+        admission.running = 0
+        self.assertTrue(self.stub.GetTopComments(reddit_pb2.GetTopCommentsRequest(postId=post_id)).success)
+        self.assertEqual(admission.running, 0)
+        self.assertEqual(admission.shed['overloaded'], 2)
+
+    def test_open_monitor_streams_count_as_busy_workers(self):
+        admission = AdmissionInterceptor(4)
+        self.start(admission)
+        post_id = self.stub.CreatePost(reddit_pb2.CreatePostRequest(title="Watched")).post.id
+        done = threading.Event()
+        def requests():
+            yield reddit_pb2.MonitorRequest(postId=post_id)
+            done.wait()
+        streams = [self.stub.MonitorUpdates(requests()) for _ in range(2)]
+        while admission.streaming < 2:
+            time.sleep(0.01)
+        # The two streams hold two of the four workers: the expensive share is used up
+        self.assertShed(self.stub.GetTopComments, reddit_pb2.GetTopCommentsRequest(postId=post_id))
+        self.assertTrue(self.stub.GetPost(reddit_pb2.GetPostRequest(id=post_id)).success)
+        done.set()
+        for stream in streams:
+            list(stream)
+        while admission.streaming:
+            time.sleep(0.01)
+        self.assertTrue(self.stub.GetTopComments(reddit_pb2.GetTopCommentsRequest(postId=post_id)).success)
+        self.assertEqual(admission.shed['overloaded'], 1)
+
+    def test_rate_limit_alone_does_not_shed(self):
+        admission = AdmissionInterceptor(4, rate=100, shedding=False, clock=itertools.count().__next__)
+        self.start(admission)
+        post_id = self.stub.CreatePost(reddit_pb2.CreatePostRequest(title="Busy")).post.id
+        # Busy workers and long queueing are both ignored when only rate limiting
+        admission.running = 4
+        self.assertTrue(self.stub.GetTopComments(reddit_pb2.GetTopCommentsRequest(postId=post_id)).success)
+        self.assertEqual(list(self.stub.ListPosts(reddit_pb2.ListPostsRequest()))[0].post.id, post_id)
+        self.assertEqual(admission.running, 4)
+        self.assertEqual(dict(admission.shed), {})
+
+    def test_rpcs_queued_past_their_budget_are_shed(self):
+        # Every clock reading is a second later, so each RPC looks queued for a second
+        admission = AdmissionInterceptor(4, clock=itertools.count().__next__)
+        self.start(admission)
+        self.assertShed(lambda: list(self.stub.ListPosts(reddit_pb2.ListPostsRequest())))
+        self.assertTrue(self.stub.CreatePost(reddit_pb2.CreatePostRequest(title="Within budget")).success)
+        self.assertEqual(dict(admission.shed), {'queued': 1})
+
+    def tearDown(self):
+        self.channel.close()
+        self.server.stop(0)
+
+class TestServerStats(ServerTestCase):
+    def test_interceptor_records_calls(self):
+        stub = self.stub
+        post_id = stub.CreatePost(reddit_pb2.CreatePostRequest(title="Measured")).post.id
+        for _ in range(3):
+            stub.GetPost(reddit_pb2.GetPostRequest(id=post_id))
+        with self.assertRaises(grpc.RpcError):
+            stub.GetComment(reddit_pb2.GetCommentRequest(id="missing"))
+        stub.VoteBatch(iter([reddit_pb2.VoteBatchRequest(postId=post_id, voteType=reddit_pb2.UPVOTE)] * 4))
+        list(stub.ListPosts(reddit_pb2.ListPostsRequest()))
+
+        stats = stub.GetServerStats(reddit_pb2.GetServerStatsRequest())
+        methods = {method.method: method for method in stats.methods}
+        self.assertEqual(methods['GetPost'].calls, 3)
+        self.assertEqual(dict(methods['GetPost'].statusCodes), {'OK': 3})
+        self.assertGreater(methods['GetPost'].p99Ms, 0)
+        self.assertEqual(dict(methods['GetComment'].statusCodes), {'NOT_FOUND': 1})
+        self.assertEqual(methods['VoteBatch'].messagesReceived, 4)
+        self.assertEqual(methods['ListPosts'].messagesSent, 1)
+        # The stats call itself is still in flight
+        self.assertEqual(methods['GetServerStats'].inFlight, 1)
+        self.assertEqual(stats.responseCache.hits, 2)
+        self.assertIn('reddit_rpc_latency_seconds_count{method="GetPost"} 3', self.service.metrics.prometheus_text())
+
+class TestAsyncServer(unittest.TestCase):
+    def setUp(self):
+        # The grpc.aio server runs on its own event loop thread; the test talks to it with a sync stub
+        self.directory = tempfile.TemporaryDirectory()
+        self.wal = WriteAheadLog(os.path.join(self.directory.name, 'reddit.wal'), sync='group')
+        self.service = RedditService(write_ahead_log=self.wal)
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.loop_thread.start()
+
+        async def start():
+            server, port = build_async_server(self.service, port=0)
+            await server.start()
+            return server, port
+        self.server, port = asyncio.run_coroutine_threadsafe(start(), self.loop).result(timeout=10)
+        self.channel = grpc.insecure_channel(f'localhost:{port}')
+        self.stub = reddit_pb2_grpc.RedditServiceStub(self.channel)
+
+    def assertStatus(self, code, call, *args):
+        with self.assertRaises(grpc.RpcError) as error:
+            call(*args)
+        self.assertEqual(error.exception.code(), code)
+
+    def test_aborts_reach_the_client(self):
+        user = reddit_pb2.CreateUserRequest(id="user1", username="alice")
+        self.stub.CreateUser(user)
+        # A mutation run off the loop because of the write-ahead log
+        self.assertStatus(grpc.StatusCode.ALREADY_EXISTS, self.stub.CreateUser, user)
+        self.assertStatus(grpc.StatusCode.NOT_FOUND, self.stub.GetUser, reddit_pb2.GetUserRequest(id="nobody"))
+        self.assertStatus(grpc.StatusCode.INVALID_ARGUMENT, lambda: list(self.stub.ListPosts(reddit_pb2.ListPostsRequest(cursor="not a cursor"))))
+        self.assertStatus(grpc.StatusCode.NOT_FOUND, self.stub.GetComment, reddit_pb2.GetCommentRequest(id="missing"))
+        self.assertEqual(len(list(WriteAheadLog.read(self.wal.path))), 1)
+
+    def test_cached_reads_and_metrics(self):
+        post_id = self.stub.CreatePost(reddit_pb2.CreatePostRequest(title="Async", content="On the loop")).post.id
+        comment_id = self.stub.CreateComment(reddit_pb2.CreateCommentRequest(content="Cached", postId=post_id)).comment.id
+        for _ in range(2):
+            self.assertEqual(self.stub.GetPost(reddit_pb2.GetPostRequest(id=post_id)).post.title, "Async")
+            self.assertEqual(self.stub.GetComment(reddit_pb2.GetCommentRequest(id=comment_id)).comment.content, "Cached")
+        self.stub.VotePost(reddit_pb2.VotePostRequest(postId=post_id, voteType=reddit_pb2.UPVOTE))
+        self.assertEqual(self.stub.GetPost(reddit_pb2.GetPostRequest(id=post_id)).post.score, 1)
+        stats = self.stub.GetServerStats(reddit_pb2.GetServerStatsRequest())
+        self.assertEqual((stats.responseCache.hits, stats.responseCache.misses, stats.responseCache.invalidations), (2, 3, 1))
+        methods = {method.method: method for method in stats.methods}
+        self.assertEqual(methods['GetPost'].calls, 3)
+        self.assertEqual(dict(methods['CreatePost'].statusCodes), {'OK': 1})
+
+    def test_monitored_vote_is_pushed(self):
+        post_id = self.stub.CreatePost(reddit_pb2.CreatePostRequest(title="Watched")).post.id
+        done = threading.Event()
+        subscribed = threading.Event()
+        def requests():
+            yield reddit_pb2.MonitorRequest(postId=post_id)
+            subscribed.set()
+            done.wait(10)
+        updates = []
+        def listen():
+            for update in self.stub.MonitorUpdates(requests()):
+                updates.append((update.postId, update.score))
+                if update.score == 2:
+                    done.set()
+        listener = threading.Thread(target=listen)
+        listener.start()
+        subscribed.wait(10)
+        for _ in range(2):
+            self.stub.VotePost(reddit_pb2.VotePostRequest(postId=post_id, voteType=reddit_pb2.UPVOTE))
+        listener.join(timeout=10)
+        self.assertEqual(updates[0], (post_id, 0))
+        self.assertEqual(updates[-1], (post_id, 2))
+        self.assertStatus(grpc.StatusCode.NOT_FOUND, lambda: list(self.stub.MonitorUpdates(iter([reddit_pb2.MonitorRequest(postId="missing")]))))
+
+    def tearDown(self):
+        self.channel.close()
+        asyncio.run_coroutine_threadsafe(self.server.stop(0), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join()
+        self.loop.close()
+        self.wal.close()
+        self.directory.cleanup()
+
+class TestWriteAheadLogRecovery(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'reddit.wal')
+
+    def start(self):
+        self.wal = WriteAheadLog(self.path, sync='group')
+        self.server, port = build_server(port=0, service=RedditService(write_ahead_log=self.wal))
+        self.server.start()
+        self.channel = grpc.insecure_channel(f'localhost:{port}')
+        return reddit_pb2_grpc.RedditServiceStub(self.channel)
+
+    def stop(self):
+        self.channel.close()
+        self.server.stop(0)
+        self.wal.close()
+
+    def test_state_survives_restart(self):
+        stub = self.start()
+        stub.CreateUser(reddit_pb2.CreateUserRequest(id="user1", username="alice", email="alice@example.com"))
+        post_id = stub.CreatePost(reddit_pb2.CreatePostRequest(title="Durable", content="Still here")).post.id
+        comment_id = stub.CreateComment(reddit_pb2.CreateCommentRequest(content="First", postId=post_id, authorId="user1")).comment.id
+        reply_id = stub.CreateComment(reddit_pb2.CreateCommentRequest(content="Reply", commentId=comment_id, authorId="user1")).comment.id
+        for _ in range(3):
+            stub.VotePost(reddit_pb2.VotePostRequest(postId=post_id, voteType=reddit_pb2.UPVOTE))
+        stub.VoteComment(reddit_pb2.VoteCommentRequest(commentId=reply_id, voteType=reddit_pb2.DOWNVOTE))
+        stub.VoteBatch(iter([reddit_pb2.VoteBatchRequest(commentId=comment_id, voteType=reddit_pb2.UPVOTE)] * 5))
+        self.stop()
+
+        stub = self.start()
+        self.assertEqual(stub.GetUser(reddit_pb2.GetUserRequest(id="user1")).user.username, "alice")
+        self.assertEqual(stub.GetPost(reddit_pb2.GetPostRequest(id=post_id)).post.score, 3)
+        branch = stub.ExpandCommentBranch(reddit_pb2.ExpandCommentBranchRequest(parentCommentId=comment_id, numberOfComments=5)).comments[0]
+        self.assertEqual(branch.comment.score, 5)
+        self.assertEqual(branch.replies[0].comment.id, reply_id)
+        self.assertEqual(branch.replies[0].comment.score, -1)
+        # New ids continue after the replayed ones
+        self.assertNotEqual(stub.CreatePost(reddit_pb2.CreatePostRequest(title="Next")).post.id, post_id)
+        self.stop()
+
+    def test_concurrent_creates_replay_in_full(self):
+        stub = self.start()
+        def create(i):
+            post_id = stub.CreatePost(reddit_pb2.CreatePostRequest(title=f"Post {i}")).post.id
+            stub.CreateComment(reddit_pb2.CreateCommentRequest(content=f"Comment {i}", postId=post_id))
+            return post_id
+        with futures.ThreadPoolExecutor(max_workers=8) as pool:
+            post_ids = list(pool.map(create, range(200)))
+        self.stop()
+
+        stub = self.start()
+        for i, post_id in enumerate(post_ids):
+            self.assertEqual(stub.GetPost(reddit_pb2.GetPostRequest(id=post_id)).post.title, f"Post {i}")
+            comments = list(stub.ListComments(reddit_pb2.ListCommentsRequest(postId=post_id)))
+            self.assertEqual([response.comment.content for response in comments], [f"Comment {i}"])
+        self.stop()
+
+    def test_gap_in_ids_fails_replay(self):
+        # Post "1" never reached the log, but post "2" and everything under it did
+        log = WriteAheadLog(self.path, sync='always')
+        log.log(wal.POST, reddit_pb2.Post(id="2", title="After the gap").SerializeToString())
+        log.log(wal.COMMENT, reddit_pb2.Comment(id="1", postId="2", content="Under it").SerializeToString())
+        log.log(wal.POST_VOTE, wal.encode_vote("2", 1))
+        log.close()
+        with self.assertRaisesRegex(ValueError, "missing post 1"):
+            RedditService(write_ahead_log=WriteAheadLog(self.path, sync='none'))
+
+    def test_failed_fsync_fails_mutations(self):
+        stub = self.start()
+        post_id = stub.CreatePost(reddit_pb2.CreatePostRequest(title="Before")).post.id
+        with mock.patch.object(wal.os, 'fsync', side_effect=OSError(errno.ENOSPC, "No space left on device")):
+            with self.assertRaises(grpc.RpcError) as error:
+                stub.VotePost(reddit_pb2.VotePostRequest(postId=post_id, voteType=reddit_pb2.UPVOTE), timeout=10)
+        self.assertEqual(error.exception.code(), grpc.StatusCode.UNKNOWN)
+        # Every later mutation fails fast instead of waiting for a writer that is gone
+        with self.assertRaises(grpc.RpcError) as error:
+            stub.CreatePost(reddit_pb2.CreatePostRequest(title="After"), timeout=10)
+        self.assertEqual(error.exception.code(), grpc.StatusCode.UNKNOWN)
+        self.assertTrue(stub.GetPost(reddit_pb2.GetPostRequest(id=post_id)).success)
+        self.stop()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+if __name__ == '__main__':
+    unittest.main()
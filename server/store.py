@@ -0,0 +1,285 @@
+import datetime
+import functools
+import threading
+import time
+from array import array
+import reddit_pb2
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M"
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MINUTE = datetime.timedelta(minutes=1)
+
+# Where a comment hangs: directly under a post or under another comment
+PARENT_POST = 0
+PARENT_COMMENT = 1
+
+MEDIA_NONE = 0
+MEDIA_IMAGE = 1
+MEDIA_VIDEO = 2
+
+
+def encode_time(text):
+    """Publication date string -> minutes since the (naive) epoch, -1 if unset."""
+    if not text:
+        return -1
+    return (datetime.datetime.strptime(text, TIME_FORMAT) - _EPOCH) // _MINUTE
+
+
+@functools.lru_cache(maxsize=4096)
+def decode_time(minutes):
+    if minutes < 0:
+        return ""
+    return (_EPOCH + minutes * _MINUTE).strftime(TIME_FORMAT)
+
+
+class StringPool:
+    """Interns repeated strings (authors, subreddits) as small integers."""
+
+    def __init__(self):
+        self._index = {}
+        self._strings = []
+        self._lock = threading.Lock()
+
+    def intern(self, text):
+        code = self._index.get(text)
+        if code is None:
+            with self._lock:
+                code = self._index.get(text)
+                if code is None:
+                    code = len(self._strings)
+                    self._strings.append(text)
+                    self._index[text] = code
+        return code
+
+    def code(self, text):
+        """Code of an already interned string, or None."""
+        return self._index.get(text)
+
+    def __getitem__(self, code):
+        return self._strings[code]
+
+
+class CreationClock:
+    """Creation stamps in microseconds since the epoch, strictly increasing.
+
+    Publication dates only have minute precision. The tables of one
+    service share a clock, so posts and comments can be put in the exact
+    order they were stored. Stamps are logged with the items, and replayed
+    items keep theirs, so stamps stay comparable across restarts and
+    across the shards of a deployment.
+    """
+
+    def __init__(self):
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def stamp(self, at=None):
+        """A new stamp, or `at` (a replayed one) after moving the clock past it."""
+        with self._lock:
+            if at is not None:
+                self._last = max(at, self._last)
+                return at
+            self._last = max(time.time_ns() // 1000, self._last + 1)
+            return self._last
+
+
+class Table:
+    """Rows addressed by a dense integer index, one array per column.
+
+    Rows are only ever appended and a row's id is computed from its number:
+    row r has id r * stride + offset + 1. Shards share the stride and differ
+    in offset, so their ids never collide, and no id -> row map is kept.
+    The id is handed out in the same critical section that appends the row,
+    which makes allocation atomic under concurrent creates. Ids are strings
+    only on the wire. len() counts only rows whose columns are all filled,
+    so scanning range(len(table)) never meets a half-written row.
+    """
+
+    def __init__(self, stride=1, offset=0, clock=None):
+        self.stride = stride
+        self.offset = offset
+        self.clock = clock or CreationClock()
+        self.scores = array('i')
+        self.created = array('q')   # creation stamps, ascending with the row
+        self._committed = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._committed
+
+    def __contains__(self, item_id):
+        return self.row(item_id) is not None
+
+    def id_of(self, row):
+        return str(row * self.stride + self.offset + 1)
+
+    def next_id(self):
+        """Id the next appended row will get."""
+        return self.id_of(len(self.scores))
+
+    def row(self, item_id):
+        """Row holding the wire id, or None."""
+        try:
+            row, misaligned = divmod(int(item_id) - self.offset - 1, self.stride)
+        except ValueError:
+            return None
+        if misaligned or not 0 <= row < self._committed or self.id_of(row) != item_id:
+            return None  # Not ours, not written yet, or not in canonical form ("01")
+        return row
+
+    def _claim(self, messages):
+        """Assign the ids of the next rows to the messages that have none."""
+        for row, message in enumerate(messages, len(self.scores)):
+            if not message.id:
+                message.id = self.id_of(row)
+            elif message.id != self.id_of(row):
+                raise ValueError(f"Expected id {self.id_of(row)}, got {message.id}")
+
+    def _append(self, message, stamp):
+        row = len(self.scores)
+        self.scores.append(message.score)
+        self.created.append(stamp)
+        return row
+
+    def append(self, message, on_store=None, on_claim=None, created=None):
+        """Store one message, assigning its id if unset; returns its row."""
+        return self.extend((message,), on_store, on_claim, None if created is None else (created,))[0]
+
+    def extend(self, messages, on_store=None, on_claim=None, created=None):
+        """Store several messages under one lock acquisition; returns their rows.
+
+        Messages are stamped from the clock unless `created` holds their
+        (replayed) stamps. on_claim(messages, stamps) runs once every
+        message has its id and stamp and before any is stored, so it sees
+        the ids in order and nothing is stored if it raises. on_store(rows)
+        runs before any of the rows can be found, so indexes it fills are
+        never behind a reader (or a vote) that found a row.
+        """
+        rows = []
+        with self._lock:
+            self._claim(messages)
+            if created is None:
+                stamps = [self.clock.stamp() for _ in messages]
+            else:
+                stamps = [self.clock.stamp(at) for at in created]
+            if on_claim:
+                on_claim(messages, stamps)
+            try:
+                for message, stamp in zip(messages, stamps):
+                    rows.append(self._store(message, stamp))
+            finally:
+                if rows:
+                    if on_store:
+                        on_store(rows)
+                    self._register(rows[-1])
+        return rows
+
+    def _register(self, row):
+        # Only once every column is filled may readers find the row
+        self._committed = row + 1
+
+
+class PostTable(Table):
+
+    def __init__(self, strings, stride=1, offset=0, clock=None):
+        super().__init__(stride, offset, clock)
+        self.strings = strings
+        self.titles = []
+        self.contents = []
+        self.states = array('b')
+        self.published = array('i')
+        self.subreddits = array('i')
+        self.authors = array('i')
+        self.media_kinds = array('b')
+        self.media_urls = {}     # row -> url, only for posts that have media
+        self.by_subreddit = {}   # subreddit code -> rows of its posts in ascending order
+        self.by_author = {}      # author code -> rows of their posts in ascending order
+
+    def _store(self, post, stamp):
+        row = self._append(post, stamp)
+        self.titles.append(post.title)
+        self.contents.append(post.content)
+        self.states.append(post.state)
+        self.published.append(encode_time(post.publicationDate))
+        self.subreddits.append(self.strings.intern(post.subredditId))
+        self.authors.append(self.strings.intern(post.authorId))
+        media = post.WhichOneof('media')
+        if media == 'image_url':
+            self.media_kinds.append(MEDIA_IMAGE)
+            self.media_urls[row] = post.image_url
+        elif media == 'video_url':
+            self.media_kinds.append(MEDIA_VIDEO)
+            self.media_urls[row] = post.video_url
+        else:
+            self.media_kinds.append(MEDIA_NONE)
+        self.by_subreddit.setdefault(self.subreddits[row], array('i')).append(row)
+        if post.authorId:
+            self.by_author.setdefault(self.authors[row], array('i')).append(row)
+        return row
+
+    def message(self, row):
+        """Materialize the row as a Post message."""
+        post = reddit_pb2.Post(
+            id=self.id_of(row),
+            title=self.titles[row],
+            content=self.contents[row],
+            score=self.scores[row],
+            state=self.states[row],
+            publicationDate=decode_time(self.published[row]),
+            subredditId=self.strings[self.subreddits[row]],
+            authorId=self.strings[self.authors[row]],
+        )
+        media = self.media_kinds[row]
+        if media == MEDIA_IMAGE:
+            post.image_url = self.media_urls[row]
+        elif media == MEDIA_VIDEO:
+            post.video_url = self.media_urls[row]
+        return post
+
+
+class CommentTable(Table):
+
+    def __init__(self, strings, posts, stride=1, offset=0):
+        super().__init__(stride, offset, posts.clock)
+        self.strings = strings
+        self.posts = posts
+        self.contents = []
+        self.parent_kinds = array('b')
+        self.parents = array('i')   # row in the posts or comments table
+        self.authors = array('i')
+        self.states = array('b')
+        self.published = array('i')
+        self.by_author = {}      # author code -> rows of their comments in ascending order
+
+    def _store(self, comment, stamp):
+        # The parent must already be stored, not merely earlier in the same batch
+        if comment.HasField('postId'):
+            parent_kind, parent = PARENT_POST, self.posts.row(comment.postId)
+        else:
+            parent_kind, parent = PARENT_COMMENT, self.row(comment.commentId)
+        row = self._append(comment, stamp)
+        self.contents.append(comment.content)
+        self.parent_kinds.append(parent_kind)
+        self.parents.append(parent)
+        self.authors.append(self.strings.intern(comment.authorId))
+        self.states.append(comment.state)
+        self.published.append(encode_time(comment.publicationDate))
+        if comment.authorId:
+            self.by_author.setdefault(self.authors[row], array('i')).append(row)
+        return row
+
+    def message(self, row):
+        """Materialize the row as a Comment message."""
+        comment = reddit_pb2.Comment(
+            id=self.id_of(row),
+            content=self.contents[row],
+            authorId=self.strings[self.authors[row]],
+            score=self.scores[row],
+            state=self.states[row],
+            publicationDate=decode_time(self.published[row]),
+        )
+        if self.parent_kinds[row] == PARENT_POST:
+            comment.postId = self.posts.id_of(self.parents[row])
+        else:
+            comment.commentId = self.id_of(self.parents[row])
+        return comment
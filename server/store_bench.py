@@ -0,0 +1,72 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+sys.path.insert(1, '../protos')
+import reddit_pb2
+from store import CommentTable, PostTable, StringPool
+
+# Memory per stored comment for the old layout (a dict of Comment messages)
+# and the column tables. Each layout is built in a fresh process and measured
+# by resident set size, since protobuf messages live outside the Python heap.
+# Run from the server directory:
+#   python store_bench.py --comments 1000000
+
+POSTS = 1000
+AUTHORS = 5000
+
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def synthetic_comments(count):
+    for i in range(count):
+        comment = reddit_pb2.Comment(id=str(i + 1), content=f"Synthetic comment body number {i}",
+                                     authorId=f"user{i % AUTHORS}", score=i % 50,
+                                     publicationDate="2024-03-01T12:00")
+        # Every third comment is a reply to an earlier one, the rest hang off posts
+        if i % 3 == 2:
+            comment.commentId = str(i)
+        else:
+            comment.postId = str(i % POSTS + 1)
+        yield comment
+
+
+def build(layout, count):
+    posts = PostTable(StringPool())
+    for i in range(POSTS):
+        posts.append(reddit_pb2.Post(id=str(i + 1), title=f"Post {i}", publicationDate="2024-03-01T12:00"))
+    before = rss_bytes()
+    if layout == 'messages':
+        store = {}
+        for comment in synthetic_comments(count):
+            store[comment.id] = comment
+    else:
+        store = CommentTable(posts.strings, posts)
+        for comment in synthetic_comments(count):
+            store.append(comment)
+    return (rss_bytes() - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per comment: protobuf messages vs column tables")
+    parser.add_argument('--comments', type=int, default=1000000)
+    parser.add_argument('--layout', choices=('messages', 'columns'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.layout:
+        print(build(args.layout, args.comments))
+        return
+    report = {}
+    for layout in ('messages', 'columns'):
+        output = subprocess.run([sys.executable, __file__, '--comments', str(args.comments), '--layout', layout],
+                                capture_output=True, text=True, check=True).stdout
+        report[layout] = round(float(output))
+    print(json.dumps({'comments': args.comments, 'bytes_per_comment': report}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+import collections
+import heapq
+import threading
+import time
+
+# GetTrending windows are whole buckets of the tracker, one minute each
+TRENDING_WINDOW_MINUTES = 60
+TRENDING_DEFAULT_MINUTES = 15
+# Items returned when none are requested, and the most ever returned
+TRENDING_DEFAULT_COUNT = 25
+TRENDING_LIMIT = 100
+
+
+class HeavyHitters:
+    """Misra-Gries summary: approximate vote counts of the busiest keys.
+
+    At most `capacity` counters are kept. When a key that is not tracked
+    arrives at a full summary, every counter is reduced by the smallest one
+    and the counters reaching zero are dropped. Each reduction removes at
+    least capacity + 1 votes, so it is rare and adds stay amortized O(1).
+    Counts are lower bounds, short by at most total / (capacity + 1), and
+    every key with more votes than that is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.total = 0
+
+    def add(self, key, weight=1):
+        self.total += weight
+        counts = self.counts
+        counts[key] = counts.get(key, 0) + weight
+        if len(counts) > self.capacity:
+            smallest = min(counts.values())
+            self.counts = {key: count - smallest for key, count in counts.items() if count > smallest}
+
+
+class VelocityTracker:
+    """Votes per item over the last `buckets` minutes.
+
+    Votes are counted in a ring of one-minute buckets indexed by minute
+    number. A bucket whose slot is reused by a later minute is simply
+    replaced, so nothing is ever swept, and each bucket is a HeavyHitters
+    summary: memory stays at buckets * capacity counters however many items
+    are voted on. The sum over the finished minutes of a window only
+    changes when a minute ends, so it is merged and sorted once per minute
+    and window length; a query then only combines that with the current
+    minute. Only the `cached_windows` most recently asked window lengths
+    keep their sums, so clients cycling through lengths cannot grow them.
+    """
+
+    def __init__(self, bucket_seconds=60, buckets=TRENDING_WINDOW_MINUTES, capacity=1000, cached_windows=4,
+                 clock=time.monotonic):
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.cached_windows = cached_windows
+        self.clock = clock
+        self._slots = [(-1, None)] * buckets
+        # window length -> (minute, summed counts of its finished minutes, same highest first), least recent first
+        self._closed = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _minute(self):
+        return int(self.clock() // self.bucket_seconds)
+
+    def record(self, key, votes=1):
+        minute = self._minute()
+        slot = minute % len(self._slots)
+        with self._lock:
+            index, summary = self._slots[slot]
+            if index != minute:
+                summary = HeavyHitters(self.capacity)
+                self._slots[slot] = (minute, summary)
+            summary.add(key, votes)
+
+    def _summary(self, minute):
+        index, summary = self._slots[minute % len(self._slots)]
+        return summary if index == minute else None
+
+    def top(self, n, minutes):
+        """(key, votes) of the n keys with most votes in the last `minutes` minutes, the current one included."""
+        minute = self._minute()
+        with self._lock:
+            cached = self._closed.get(minutes)
+            if cached is None or cached[0] != minute:
+                closed = {}
+                for earlier in range(minute - minutes + 1, minute):
+                    summary = self._summary(earlier)
+                    for key, count in summary.counts.items() if summary else ():
+                        closed[key] = closed.get(key, 0) + count
+                ranked = sorted(closed.items(), key=lambda item: item[1], reverse=True)
+                self._closed[minutes] = cached = (minute, closed, ranked)
+                if len(self._closed) > self.cached_windows:
+                    self._closed.popitem(last=False)
+            self._closed.move_to_end(minutes)
+            current = self._summary(minute)
+            current = dict(current.counts) if current else {}
+        _, closed, ranked = cached
+        totals = {key: closed.get(key, 0) + count for key, count in current.items()}
+        # Only keys voted on this minute can have moved up, so the rest of
+        # the top n is within this many of the best finished-minute totals
+        for key, count in ranked[:n + len(totals)]:
+            totals.setdefault(key, count)
+        return heapq.nlargest(n, totals.items(), key=lambda item: item[1])
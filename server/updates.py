@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+
+
+class Subscriber:
+    """One MonitorUpdates stream's view of the hub.
+
+    Pending updates are kept in a dict keyed by item, so a burst of votes on
+    the same post collapses into its latest score and the backlog can never
+    grow past the number of items watched. Offering an update only takes a
+    short lock and never blocks on the consumer, so a slow stream cannot
+    hold up voting.
+    """
+
+    def __init__(self, max_rate=0, max_subscriptions=1000):
+        self.keys = set()
+        self.max_subscriptions = max_subscriptions
+        self.min_interval = 1.0 / max_rate if max_rate else 0.0
+        self.last_sent = 0.0
+        self.error = None      # (StatusCode, details) to abort the stream with
+        self.closed = False    # no more requests will arrive
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def offer(self, key, score):
+        with self._lock:
+            self._pending.pop(key, None)
+            self._pending[key] = score
+        self.wakeup()
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending.items()
+
+    def fail(self, code, details):
+        self.error = (code, details)
+        self.wakeup()
+
+    def close(self):
+        self.closed = True
+        self.wakeup()
+
+    def next_send_delay(self):
+        """Seconds to wait before the next batch to respect max_rate."""
+        if not self.min_interval:
+            return 0.0
+        return max(0.0, self.last_sent + self.min_interval - time.monotonic())
+
+    def mark_sent(self):
+        self.last_sent = time.monotonic()
+
+    def wakeup(self):
+        raise NotImplementedError
+
+
+class ThreadSubscriber(Subscriber):
+    """Subscriber consumed by a blocking handler thread."""
+
+    def __init__(self, max_rate=0, max_subscriptions=1000):
+        super().__init__(max_rate, max_subscriptions)
+        self._event = threading.Event()
+
+    def wakeup(self):
+        self._event.set()
+
+    def wait(self, timeout=None):
+        self._event.wait(timeout)
+        self._event.clear()
+
+
+class UpdateHub:
+    """Routes score changes to the subscribers watching each item.
+
+    Keys are ('postId', id) or ('commentId', id), matching the ScoreUpdate
+    oneof. Publishing to an item nobody watches is a single dict lookup.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, subscriber, key):
+        """Register subscriber for key; returns False if it is at its limit."""
+        with self._lock:
+            if key in subscriber.keys:
+                return True
+            if len(subscriber.keys) >= subscriber.max_subscriptions:
+                return False
+            subscriber.keys.add(key)
+            self._subscribers.setdefault(key, set()).add(subscriber)
+            return True
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            for key in subscriber.keys:
+                watchers = self._subscribers.get(key)
+                if watchers is not None:
+                    watchers.discard(subscriber)
+                    if not watchers:
+                        del self._subscribers[key]
+            subscriber.keys.clear()
+
+    def publish(self, key, score):
+        watchers = self._subscribers.get(key)
+        if not watchers:
+            return
+        with self._lock:
+            watchers = tuple(watchers)
+        for subscriber in watchers:
+            subscriber.offer(key, score)
+
+
+class AsyncSubscriber(Subscriber):
+    """Subscriber consumed by a coroutine on an asyncio event loop.
+
+    Votes publish from whichever thread applied them, so wakeups are handed
+    to the loop with call_soon_threadsafe instead of setting the event
+    directly. No thread is held while the stream waits.
+    """
+
+    def __init__(self, loop, max_rate=0, max_subscriptions=1000):
+        super().__init__(max_rate, max_subscriptions)
+        self._loop = loop
+        self._event = asyncio.Event()
+
+    def wakeup(self):
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._event.set)
+
+    async def wait(self):
+        await self._event.wait()
+        self._event.clear()
@@ -0,0 +1,42 @@
+import threading
+import reddit_pb2
+
+VOTE_DELTAS = {
+    reddit_pb2.VoteType.UPVOTE: 1,
+    reddit_pb2.VoteType.DOWNVOTE: -1,
+}
+
+
+def vote_delta(vote_type):
+    return VOTE_DELTAS.get(vote_type, 0)
+
+
+class VoteEngine:
+    """Applies score changes to posts and comments from many threads.
+
+    Scores live in shared score columns, so every read-modify-write has to
+    be serialized per item. Instead of one global lock the engine keeps a
+    fixed set of lock stripes and maps each (kind, id) key onto one of them:
+    votes on different items almost never contend, while votes on the same
+    hot item are applied one at a time and never lost.
+    """
+
+    def __init__(self, stripes=64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def lock_for(self, key):
+        return self._locks[hash(key) % len(self._locks)]
+
+    def apply(self, key, table, row, delta, on_change=None):
+        """Add delta to table.scores[row] and return the new score.
+
+        on_change(row, score) runs under the item's lock so that derived
+        structures (rankings, subscribers) see score changes in the order
+        they happened.
+        """
+        with self.lock_for(key):
+            score = table.scores[row] + delta
+            table.scores[row] = score
+            if on_change:
+                on_change(row, score)
+            return score
@@ -0,0 +1,188 @@
+import os
+import struct
+import threading
+import time
+
+# Record kinds
+USER = 1
+POST = 2
+COMMENT = 3
+POST_VOTE = 4
+COMMENT_VOTE = 5
+
+_HEADER = struct.Struct('<BI')   # kind, payload length
+_DELTA = struct.Struct('<i')
+_STAMP = struct.Struct('<q')
+
+SYNC_MODES = ('group', 'always', 'none')
+
+
+def encode_vote(item_id, delta):
+    return _DELTA.pack(delta) + item_id.encode()
+
+
+def decode_vote(payload):
+    return payload[_DELTA.size:].decode(), _DELTA.unpack_from(payload)[0]
+
+
+def encode_created(stamp, message):
+    return _STAMP.pack(stamp) + message.SerializeToString()
+
+
+def decode_created(payload, message_class):
+    """(creation stamp, message) of a logged post or comment."""
+    return _STAMP.unpack_from(payload)[0], message_class.FromString(payload[_STAMP.size:])
+
+
+class WriteAheadLog:
+    """Append-only log of every state change, replayed on startup.
+
+    Each record is a (kind, length) header followed by the payload: the
+    serialized User, the packed creation stamp plus serialized Post/Comment,
+    or a packed delta plus id for votes. Three sync modes trade durability for throughput:
+
+    * always - every append is written and fsynced before it returns.
+    * group  - appends are buffered and a background thread writes and
+               fsyncs everything pending in one go. Records that arrive
+               while an fsync is in flight form the next group, so groups
+               grow with load on their own; `group_window` optionally holds
+               a group open a little longer (until `group_size` records).
+               Callers still block until their record is on disk, but one
+               fsync covers the whole group.
+    * none   - records are written to the OS without fsync.
+    """
+
+    def __init__(self, path, sync='group', group_window=0.0, group_size=512):
+        if sync not in SYNC_MODES:
+            raise ValueError(f"Unknown WAL sync mode {sync!r}")
+        self.path = path
+        self.sync = sync
+        self.group_window = group_window
+        self.group_size = group_size
+        self._truncate_torn_tail()
+        self._file = open(path, 'ab')
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._pending = []
+        self._appended = 0   # sequence number of the last appended record
+        self._durable = 0    # sequence number of the last record on disk
+        self._closed = False
+        self._error = None   # OSError that stopped the group writer
+        self._writer = None
+        if sync == 'group':
+            self._writer = threading.Thread(target=self._group_writer, daemon=True)
+            self._writer.start()
+
+    def _truncate_torn_tail(self):
+        if not os.path.exists(self.path):
+            return
+        valid = sum(_HEADER.size + len(payload) for _, payload in self.read(self.path))
+        if valid < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid)
+
+    def append(self, kind, payload):
+        """Queue a record; returns a ticket to pass to wait()."""
+        record = _HEADER.pack(kind, len(payload)) + payload
+        with self._lock:
+            if self._closed:
+                raise ValueError("Write-ahead log is closed")
+            self._check()
+            self._appended += 1
+            if self.sync == 'group':
+                self._pending.append(record)
+                if len(self._pending) == 1 or len(self._pending) >= self.group_size:
+                    self._cond.notify_all()
+            else:
+                self._file.write(record)
+                self._file.flush()
+                if self.sync == 'always':
+                    os.fsync(self._file.fileno())
+                self._durable = self._appended
+            return self._appended
+
+    def wait(self, ticket):
+        """Block until the record with this ticket is durable.
+
+        Raises OSError if the group writer failed before getting there.
+        """
+        if self.sync != 'group':
+            return
+        with self._lock:
+            while self._durable < ticket:
+                self._check()
+                self._cond.wait()
+
+    def _check(self):
+        # A new exception per caller: many threads raise it at once
+        if self._error:
+            raise OSError(self._error.errno, f"Write-ahead log failed: {self._error.strerror or self._error}")
+
+    def log(self, kind, payload):
+        self.wait(self.append(kind, payload))
+
+    def wait_all(self):
+        """Block until everything appended so far is durable."""
+        self.wait(self._appended)
+
+    def _group_writer(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+                # Optionally give concurrent writers a short window to join this group
+                deadline = time.monotonic() + self.group_window
+                while len(self._pending) < self.group_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, []
+                last = self._appended
+            try:
+                self._file.write(b''.join(batch))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                # Nothing appended from now on can become durable: fail every waiter
+                with self._lock:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+            with self._lock:
+                self._durable = last
+                self._cond.notify_all()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._cond.notify_all()
+        if self._writer:
+            self._writer.join()
+        try:
+            self._file.close()
+        except OSError:
+            # Flushing what the failed writer left buffered; already reported to its waiters
+            if not self._error:
+                raise
+
+    @staticmethod
+    def read(path):
+        """Yield (kind, payload) for every complete record in the log.
+
+        A torn record at the end (from a crash mid-write) is ignored.
+        """
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            kind, length = _HEADER.unpack_from(data, offset)
+            start = offset + _HEADER.size
+            if start + length > len(data):
+                break
+            yield kind, data[start:start + length]
+            offset = start + length
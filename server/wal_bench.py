@@ -0,0 +1,52 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import wal
+from wal import WriteAheadLog, encode_vote
+
+# Measures acknowledged writes per second for each WAL sync mode with several
+# concurrent writers, the way the thread-pool server drives it. Run from the
+# server directory:
+#   python wal_bench.py --threads 1 16 64 --seconds 2
+
+
+def run(mode, threads, seconds, directory):
+    log = WriteAheadLog(os.path.join(directory, f'{mode}-{threads}.wal'), sync=mode)
+    payload = encode_vote('12345', 1)
+    counts = [0] * threads
+    stop = time.monotonic() + seconds
+
+    def writer(index):
+        while time.monotonic() < stop:
+            log.log(wal.POST_VOTE, payload)
+            counts[index] += 1
+
+    workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+    start = time.monotonic()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - start
+    log.close()
+    return round(sum(counts) / elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write-ahead log throughput per sync mode")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--seconds', type=float, default=2)
+    parser.add_argument('--dir', default=None, help="Directory for the log files (default: a temp dir)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        report = {mode: {threads: run(mode, threads, args.seconds, directory) for threads in args.threads}
+                  for mode in ('always', 'group', 'none')}
+    print(json.dumps({'writes_per_second': report}, indent=2))
+
+
+if __name__ == '__main__':
+    main()